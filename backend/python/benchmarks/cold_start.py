@@ -0,0 +1,123 @@
+"""Cold-start benchmark for the Python backend.
+
+Measures, in fresh interpreters:
+  * import time of the main module, and
+  * time from launching uvicorn until the first successful GET /health.
+
+Each measurement is repeated and the median is compared against a budget;
+the script exits non-zero when either budget is exceeded, so it can gate CI.
+On failure the slowest imports (from python -X importtime) are listed.
+
+    python benchmarks/cold_start.py --import-budget 1.0 --health-budget 3.0
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+SRC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+def _env():
+    env = os.environ.copy()
+    env['PYTHONPATH'] = SRC_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    # Measure the server itself, not the background problem-bank refill
+    env.setdefault('PROBLEM_BANK_ENABLED', '0')
+    return env
+
+def measure_import(module: str = 'main') -> float:
+    """Seconds to import module in a fresh interpreter (interpreter startup excluded)."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    out = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, env=_env(),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def measure_first_health(timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until /health first answers 200."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=SRC_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited early:\n{server.stderr.read().decode()}")
+            try:
+                with urllib.request.urlopen(url, timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.005)
+        raise TimeoutError(f"/health did not respond within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def slowest_imports(module: str = 'main', top: int = 15):
+    """(cumulative seconds, module name) of the slowest imports, from -X importtime."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                         cwd=SRC_DIR, env=_env(), capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|').split('|')]
+        rows.append((int(cumulative_us) / 1e6, name))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--import-budget', type=float, default=float(os.getenv('COLD_START_IMPORT_BUDGET', 1.0)),
+                        help="Max median seconds to import main")
+    parser.add_argument('--health-budget', type=float, default=float(os.getenv('COLD_START_HEALTH_BUDGET', 2.5)),
+                        help="Max median seconds from launch to first /health")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.repeats)]
+    healths = [measure_first_health() for _ in range(args.repeats)]
+    results = {
+        'import_seconds': statistics.median(imports),
+        'first_health_seconds': statistics.median(healths),
+        'import_budget': args.import_budget,
+        'health_budget': args.health_budget,
+        'repeats': args.repeats
+    }
+    failed = []
+    if results['import_seconds'] > args.import_budget:
+        failed.append('import')
+    if results['first_health_seconds'] > args.health_budget:
+        failed.append('first /health')
+    results['passed'] = not failed
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import main:     {results['import_seconds']:.3f}s (budget {args.import_budget:.3f}s)")
+        print(f"first /health:   {results['first_health_seconds']:.3f}s (budget {args.health_budget:.3f}s)")
+    if failed:
+        print(f"\nCold start over budget: {', '.join(failed)}. Slowest imports:", file=sys.stderr)
+        for seconds, name in slowest_imports():
+            print(f"  {seconds * 1000:8.1f} ms  {name}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
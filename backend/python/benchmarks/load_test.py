@@ -0,0 +1,305 @@
+"""Load test: concurrent mental-math and problem-generator sessions.
+
+Simulated users follow two scripts:
+  * mental math: a timed session (120 s by default) over the
+    /ws/mental-math WebSocket the UI uses, answering a problem every few
+    hundred milliseconds, and
+  * generator: mixed /problems/generate calls with random type and
+    difficulty (some with a seed, as when a user reopens a problem), with
+    a longer think time.
+
+Concurrency ramps up in stages. For each stage, per endpoint, the report
+gives p50/p95/p99 latency, throughput and error rate (non-2xx responses,
+transport errors and bodies with status=error). Mental-math sessions are
+reported as "/ws/mental-math connect" (opening the socket until the first
+problems arrive) and "/ws/mental-math answer" (an answer until its result).
+
+    # In-process, no network (client and server share one event loop)
+    python benchmarks/load_test.py --stages 10,50,100 --stage-duration 20
+    # Against a server that is already running
+    python benchmarks/load_test.py --url http://127.0.0.1:8000
+    # Launch a local uvicorn for the run
+    python benchmarks/load_test.py --spawn --workers 2
+
+Requires httpx (see requirements-dev.txt) and websockets.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+import websockets
+
+SRC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+PROBLEM_TYPES = ['option_pricing', 'portfolio_optimization', 'probability', 'statistics', 'stochastic_processes']
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, latency: float, ok: bool):
+        self.latencies.append(latency)
+        if not ok:
+            self.errors += 1
+
+    def summary(self, duration: float) -> Dict[str, float]:
+        n = len(self.latencies)
+        p50, p95, p99 = np.percentile(self.latencies, [50, 95, 99]) if n else (float('nan'),) * 3
+        return {
+            'requests': n,
+            'throughput_rps': n / duration if duration > 0 else 0.0,
+            'error_rate': self.errors / n if n else 0.0,
+            'p50_ms': float(p50) * 1000,
+            'p95_ms': float(p95) * 1000,
+            'p99_ms': float(p99) * 1000
+        }
+
+@dataclass
+class Options:
+    session_seconds: float = 120.0
+    mental_math_share: float = 0.7
+    mental_math_think: tuple = (0.2, 0.8)
+    generator_think: tuple = (1.0, 4.0)
+    seeded_share: float = 0.2
+
+async def _request(client: httpx.AsyncClient, stats: Dict[str, EndpointStats], endpoint: str,
+                   params: Optional[dict] = None):
+    start = time.perf_counter()
+    ok = False
+    try:
+        response = await client.get(endpoint, params=params)
+        ok = response.is_success and response.json().get('status') != 'error'
+    except (httpx.HTTPError, ValueError):
+        pass
+    stats.setdefault(endpoint, EndpointStats()).record(time.perf_counter() - start, ok)
+
+SOCKET_ERRORS = (OSError, ValueError, KeyError, IndexError, websockets.WebSocketException)
+
+async def _mental_math_session(connect, stats: Dict[str, EndpointStats], session_end: float,
+                               options: Options, rng: random.Random):
+    """One session: open the socket, then answer the oldest problem after each think time.
+
+    Answers are random numbers; scoring costs the server the same either way.
+    """
+    endpoint = '/ws/mental-math connect'
+    start = time.perf_counter()
+    try:
+        async with connect('/ws/mental-math') as socket:
+            message = json.loads(await socket.recv())
+            while message['type'] != 'problems':
+                message = json.loads(await socket.recv())
+            problems = message['problems']
+            stats.setdefault(endpoint, EndpointStats()).record(time.perf_counter() - start, True)
+
+            endpoint = '/ws/mental-math answer'
+            while time.perf_counter() < session_end:
+                await asyncio.sleep(rng.uniform(*options.mental_math_think))
+                start = time.perf_counter()
+                await socket.send(json.dumps({'type': 'answer', 'id': problems[0]['id'],
+                                              'answer': rng.randrange(1000)}))
+                message = json.loads(await socket.recv())
+                if message['type'] == 'end':
+                    return
+                ok = message['type'] == 'result'
+                stats.setdefault(endpoint, EndpointStats()).record(time.perf_counter() - start, ok)
+                if ok:
+                    problems = problems[1:] + message['problems']
+    except SOCKET_ERRORS:
+        stats.setdefault(endpoint, EndpointStats()).record(time.perf_counter() - start, False)
+
+async def mental_math_user(client, connect, stats, deadline: float, options: Options, rng: random.Random):
+    """Back-to-back mental-math sessions until the stage ends."""
+    while time.perf_counter() < deadline:
+        session_end = min(deadline, time.perf_counter() + options.session_seconds)
+        await _mental_math_session(connect, stats, session_end, options, rng)
+
+async def generator_user(client, connect, stats, deadline: float, options: Options, rng: random.Random):
+    """Mixed /problems/generate calls with think time, until the stage ends."""
+    while time.perf_counter() < deadline:
+        params = {}
+        if rng.random() < 0.8:
+            params['problem_type'] = rng.choice(PROBLEM_TYPES)
+        if rng.random() < 0.8:
+            params['difficulty'] = rng.choice(DIFFICULTIES)
+        if rng.random() < options.seeded_share:
+            # A small seed space makes reopened problems realistic cache hits
+            params['seed'] = rng.randrange(1000)
+        await _request(client, stats, '/problems/generate', params)
+        await asyncio.sleep(rng.uniform(*options.generator_think))
+
+async def run_stage(client: httpx.AsyncClient, connect, users: int, duration: float, options: Options,
+                    seed: int) -> Dict[str, Dict[str, float]]:
+    stats: Dict[str, EndpointStats] = {}
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + duration
+    tasks = []
+    for _ in range(users):
+        user = mental_math_user if rng.random() < options.mental_math_share else generator_user
+        # Stagger arrivals over the first second so users do not fire in lockstep
+        tasks.append(asyncio.create_task(_delayed(rng.uniform(0, 1.0), user, client, connect, stats, deadline, options,
+                                                  random.Random(rng.getrandbits(64)))))
+    # Users stop at the deadline; anything still in flight or thinking is cancelled
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {endpoint: s.summary(duration) for endpoint, s in sorted(stats.items())}
+
+async def _delayed(delay, user, *args):
+    await asyncio.sleep(delay)
+    await user(*args)
+
+class ASGIWebSocket:
+    """In-process WebSocket client for an ASGI app (httpx's ASGITransport only speaks HTTP).
+
+    Offers the send/recv subset of a websockets connection used here.
+    """
+
+    def __init__(self, app, path: str):
+        self._app = app
+        self._scope = {
+            'type': 'websocket', 'asgi': {'version': '3.0'}, 'scheme': 'ws', 'path': path,
+            'raw_path': path.encode(), 'root_path': '', 'query_string': b'', 'subprotocols': [],
+            'headers': [(b'host', b'load-test')], 'client': ('127.0.0.1', 0), 'server': ('load-test', 80)
+        }
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._app(self._scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({'type': 'websocket.connect'})
+        if (await self._from_app.get())['type'] != 'websocket.accept':
+            raise ConnectionError("WebSocket was not accepted")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._to_app.put({'type': 'websocket.disconnect', 'code': 1000})
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(self._task, timeout=5.0)
+
+    async def send(self, text: str):
+        await self._to_app.put({'type': 'websocket.receive', 'text': text})
+
+    async def recv(self) -> str:
+        message = await self._from_app.get()
+        if message['type'] == 'websocket.close':
+            raise ConnectionError("WebSocket closed")
+        return message.get('text') or message['bytes'].decode()
+
+@contextlib.asynccontextmanager
+async def in_process_client():
+    sys.path.insert(0, SRC_DIR)
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://load-test') as client:
+            yield client, lambda path: ASGIWebSocket(main.app, path)
+
+@contextlib.asynccontextmanager
+async def http_client(url: str, max_connections: int):
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    ws_url = 'ws' + url[len('http'):] if url.startswith('http') else url
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        yield client, lambda path: websockets.connect(ws_url + path)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+@contextlib.contextmanager
+def spawned_server(workers: int):
+    """Run uvicorn on a free local port for the duration of the test."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=SRC_DIR, env={**os.environ, 'PYTHONPATH': SRC_DIR}
+    )
+    try:
+        deadline = time.perf_counter() + 30
+        while True:
+            try:
+                if httpx.get(f"{url}/health", timeout=0.5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if server.poll() is not None or time.perf_counter() > deadline:
+                raise RuntimeError("uvicorn did not become healthy")
+            time.sleep(0.05)
+        yield url
+    finally:
+        server.terminate()
+        server.wait()
+
+def print_stage(users: int, results: Dict[str, Dict[str, float]]):
+    print(f"\n== {users} concurrent users ==")
+    print(f"{'endpoint':24s} {'requests':>9s} {'req/s':>9s} {'errors':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for endpoint, s in results.items():
+        print(f"{endpoint:24s} {s['requests']:9d} {s['throughput_rps']:9.1f} {s['error_rate']:8.2%} "
+              f"{s['p50_ms']:9.2f} {s['p95_ms']:9.2f} {s['p99_ms']:9.2f}", flush=True)
+
+async def run(args) -> List[Dict]:
+    options = Options(
+        session_seconds=args.session_seconds,
+        mental_math_share=args.mental_math_share,
+    )
+    stages = [int(s) for s in args.stages.split(',')]
+    max_connections = max(stages)
+
+    async def drive(client, connect):
+        report = []
+        for i, users in enumerate(stages):
+            results = await run_stage(client, connect, users, args.stage_duration, options, seed=args.seed + i)
+            print_stage(users, results)
+            report.append({'users': users, 'duration': args.stage_duration, 'endpoints': results})
+        return report
+
+    if args.url:
+        async with http_client(args.url, max_connections) as (client, connect):
+            return await drive(client, connect)
+    async with in_process_client() as (client, connect):
+        return await drive(client, connect)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help="Base URL of a running server (default: drive the app in-process)")
+    target.add_argument('--spawn', action='store_true', help="Start a local uvicorn for the test")
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn workers with --spawn")
+    parser.add_argument('--stages', default='10,25,50,100', help="Comma-separated concurrent user counts")
+    parser.add_argument('--stage-duration', type=float, default=30.0, help="Seconds per stage")
+    parser.add_argument('--session-seconds', type=float, default=120.0, help="Length of a mental-math session")
+    parser.add_argument('--mental-math-share', type=float, default=0.7, help="Fraction of users doing mental math")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.spawn:
+        with spawned_server(args.workers) as url:
+            args.url = url
+            report = asyncio.run(run(args))
+    else:
+        report = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Micro-benchmarks for the problem generators and finance_utils hot paths.
+
+Every case is timed with timeit (auto-ranged so one measurement takes at
+least --min-time seconds) and summarized by the median seconds per call
+over --repeats measurements.
+
+    # Record a baseline on this machine
+    python benchmarks/micro.py --save benchmarks/baselines/local.json
+    # Later, fail if any case got more than 25% slower
+    python benchmarks/micro.py --compare benchmarks/baselines/local.json --threshold 0.25
+
+Baselines are machine specific; compare only runs from the same host.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+SRC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+
+# A case is (name, setup) where setup() returns the zero-argument callable to time
+Case = Tuple[str, Callable[[], Callable[[], object]]]
+
+def generator_cases() -> List[Case]:
+    from services.problem_generator import ProblemGenerator
+
+    generator = ProblemGenerator()
+    rng = np.random.default_rng(0)
+    methods = {
+        'option_pricing': generator.generate_option_pricing_problem,
+        'portfolio': generator.generate_portfolio_problem,
+        'probability': generator.generate_probability_problem,
+        'stochastic_process': generator.generate_stochastic_process_problem,
+    }
+    cases = []
+    for label, method in methods.items():
+        for difficulty in generator.difficulty_levels:
+            cases.append((f"generate_{label}_problem[{difficulty}]",
+                          lambda method=method, difficulty=difficulty: lambda: method(difficulty, rng)))
+    cases.append(("generate_mental_math_problem", lambda: lambda: generator.generate_mental_math_problem(rng)))
+    cases.append(("generate_mental_math_batch[100]", lambda: lambda: generator.generate_mental_math_batch(100, rng)))
+    return cases
+
+def _contracts(n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    return {
+        'S': rng.uniform(80, 120, n),
+        'K': rng.uniform(80, 120, n),
+        'T': rng.uniform(0.1, 2.0, n),
+        'r': rng.uniform(0.0, 0.05, n),
+        'sigma': rng.uniform(0.1, 0.5, n),
+    }
+
+def finance_cases(sizes=(1, 100, 10_000, 1_000_000)) -> List[Case]:
+    from utils import finance_utils
+
+    cases = []
+    for n in sizes:
+        def black_scholes(n=n):
+            c = _contracts(n, np.random.default_rng(n))
+            if n == 1:
+                c = {k: float(v[0]) for k, v in c.items()}
+            return lambda: finance_utils.black_scholes_call(c['S'], c['K'], c['T'], c['r'], c['sigma'])
+        cases.append((f"black_scholes_call[n={n}]", black_scholes))
+
+    for n in sizes[:-1]:
+        def implied_vol(n=n):
+            c = _contracts(n, np.random.default_rng(n))
+            if n == 1:
+                c = {k: float(v[0]) for k, v in c.items()}
+            prices = finance_utils.black_scholes_call(c['S'], c['K'], c['T'], c['r'], c['sigma'])
+            return lambda: finance_utils.calculate_implied_volatility(prices, c['S'], c['K'], c['T'], c['r'])
+        cases.append((f"calculate_implied_volatility[n={n}]", implied_vol))
+
+    for n_assets, n_portfolios in ((5, 1), (50, 1), (50, 1000), (500, 100)):
+        def portfolio(n_assets=n_assets, n_portfolios=n_portfolios):
+            import pandas as pd
+
+            rng = np.random.default_rng(n_assets)
+            returns = pd.DataFrame(rng.normal(0.0005, 0.01, (252, n_assets)))
+            weights = rng.dirichlet(np.ones(n_assets), n_portfolios)
+            weights = weights[0] if n_portfolios == 1 else weights
+            return lambda: finance_utils.calculate_portfolio_metrics(weights, returns)
+        cases.append((f"calculate_portfolio_metrics[assets={n_assets},portfolios={n_portfolios}]", portfolio))
+
+    def portfolio_moments():
+        import pandas as pd
+
+        rng = np.random.default_rng(7)
+        moments = finance_utils.calculate_return_moments(pd.DataFrame(rng.normal(0.0005, 0.01, (252, 50))))
+        weights = rng.dirichlet(np.ones(50), 1000)
+        return lambda: finance_utils.calculate_portfolio_metrics(weights, moments)
+    cases.append(("calculate_portfolio_metrics[assets=50,portfolios=1000,moments]", portfolio_moments))
+
+    for method, n_positions in (('normal', 1000), ('student_t', 1000), ('historical', 1000), ('bootstrap', 10)):
+        def risk(method=method, n_positions=n_positions):
+            rng = np.random.default_rng(11)
+            returns = rng.normal(0.0005, 0.01, (1000, 20))
+            holdings = rng.dirichlet(np.ones(20), n_positions) * 1e6
+            levels = [0.9, 0.95, 0.975, 0.99, 0.995]
+            return lambda: finance_utils.calculate_var_es(returns, levels, holdings, method=method, df=5,
+                                                          n_resamples=200, seed=0)
+        cases.append((f"calculate_var_es[{method},positions={n_positions}]", risk))
+    return cases
+
+def measure(fn: Callable[[], object], repeats: int, min_time: float) -> Dict[str, float]:
+    """Median/min seconds per call over repeats, each measurement lasting at least min_time."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    per_call = [t / number for t in timer.repeat(repeat=repeats, number=number)]
+    return {
+        'median': statistics.median(per_call),
+        'min': min(per_call),
+        'max': max(per_call),
+        'number': number,
+        'repeats': repeats
+    }
+
+def run(cases: List[Case], repeats: int, min_time: float, verbose: bool = True) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, setup in cases:
+        results[name] = measure(setup(), repeats, min_time)
+        if verbose:
+            print(f"{name:70s} {results[name]['median'] * 1e6:12.2f} us", flush=True)
+    return results
+
+def compare(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Print a comparison table and return the cases slower than baseline by more than threshold."""
+    regressions = []
+    print(f"\n{'case':70s} {'baseline us':>12s} {'current us':>12s} {'ratio':>7s}")
+    for name, result in current.items():
+        if name not in baseline:
+            print(f"{name:70s} {'-':>12s} {result['median'] * 1e6:12.2f} {'new':>7s}")
+            continue
+        ratio = result['median'] / baseline[name]['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:70s} {baseline[name]['median'] * 1e6:12.2f} {result['median'] * 1e6:12.2f} {ratio:7.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', default='', help="Only run cases whose name contains this text")
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.05, help="Minimum seconds per measurement")
+    parser.add_argument('--save', help="Write results to this JSON baseline file")
+    parser.add_argument('--compare', help="Compare against this JSON baseline file")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed slowdown before a case counts as a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    cases = [c for c in generator_cases() + finance_cases() if args.filter in c[0]]
+    results = run(cases, args.repeats, args.min_time)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'machine': platform.machine(),
+                    'platform': platform.platform()
+                },
+                'results': results
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}:", file=sys.stderr)
+            for name in regressions:
+                print(f"  {name}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
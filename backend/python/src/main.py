@@ -1,11 +1,39 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
-import uvicorn
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from typing import Optional, List, Union
+import numpy as np
 from dotenv import load_dotenv
 import os
+import asyncio
+import logging
+import secrets
+import time
 
-from services.problem_generator import ProblemGenerator
+from services.problem_generator import ProblemGenerator, MAX_SEED
+from services import bulk_generation
+from services.worker_pool import WorkerPool, PoolSaturatedError
+from services.problem_bank import DEFAULT_PATH as DEFAULT_PROBLEM_BANK_PATH, ProblemBank, fcntl
+from services.static_responses import StaticResponse
+from services.mental_math_session import MentalMathSession
+from services.question_templates import QUESTION_TEMPLATES, to_wire
+from services.compression import CompressionMiddleware
+from services.solutions import ReferenceSolver
+from utils.metrics import REGISTRY, FUNCTION_ERRORS, FUNCTION_LATENCY
+from utils.black_scholes import black_scholes_price
+from utils.implied_volatility import implied_volatility
+from utils.monte_carlo import monte_carlo_price
+from utils.lattice import lattice_price
+from utils.portfolio import (
+    optimize_portfolios,
+    covariance_matrix,
+    parse_constraints,
+    constrained_mean_variance,
+    efficient_frontier
+)
+from utils.stochastic_paths import PROCESS_TYPES, simulate_paths, path_statistics
+from utils.risk import RISK_METHODS, var_es
 
 # Load environment variables
 load_dotenv()
@@ -23,10 +51,457 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Problem-Set-Seed"],  # Lets browser clients read the seed of a streamed problem set
 )
+# gzip, or brotli when installed, for clients that accept it
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 500)))
 
 # Initialize problem generator
-problem_generator = ProblemGenerator()
+problem_generator = ProblemGenerator(cache_size=int(os.getenv("PROBLEM_CACHE_SIZE", 1024)))
+# Reference solutions are only computed when a client asks for one
+reference_solver = ReferenceSolver(problem_generator, cache_size=int(os.getenv("SOLUTION_CACHE_SIZE", 512)))
+
+# Responses that only change when the underlying data does; call invalidate() after updating it
+practice_response = StaticResponse(lambda: {
+    "status": "success",
+    "problems": problem_generator.get_practice_problems()
+})
+types_response = StaticResponse(lambda: {
+    "status": "success",
+    "types": problem_generator.problem_types,
+    "difficulties": problem_generator.difficulty_levels
+})
+templates_response = StaticResponse(lambda: {
+    "status": "success",
+    "templates": QUESTION_TEMPLATES
+})
+
+# CPU-bound generation and pricing run here so the event loop stays responsive
+worker_pool = WorkerPool(
+    max_workers=int(os.getenv("WORKER_POOL_SIZE", os.cpu_count() or 4)),
+    max_queue=int(os.getenv("WORKER_QUEUE_SIZE", 64)),
+    kind=os.getenv("WORKER_POOL_KIND", "thread")
+)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=str(status))
+        if REGISTRY.timing_enabled:
+            HTTP_LATENCY.observe(time.perf_counter() - start, route=route)
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    return JSONResponse(
+        status_code=503,
+        content={"status": "error", "message": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+# Pre-generated problems shared by all uvicorn workers through a memory-mapped file
+problem_bank = None
+PROBLEM_BANK_ENABLED = os.getenv("PROBLEM_BANK_ENABLED", "1") == "1" and fcntl is not None
+PROBLEM_BANK_REFILL_INTERVAL = float(os.getenv("PROBLEM_BANK_REFILL_INTERVAL", 1.0))
+logger = logging.getLogger(__name__)
+
+# Metrics are per process; with several uvicorn workers each one exposes its own /metrics
+HTTP_REQUESTS = REGISTRY.counter(
+    "qf_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "qf_http_request_duration_seconds", "HTTP request latency by route", ("route",)
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "qf_handler_errors_total", "Errors caught by handlers and returned as status=error", ("handler", "error")
+)
+GENERATION_LATENCY = REGISTRY.histogram(
+    "qf_problem_generation_seconds", "Time to generate one problem, measured in the worker",
+    ("problem_type", "difficulty")
+)
+PROBLEMS_SERVED = REGISTRY.counter(
+    "qf_problems_served_total", "Problems returned to clients by where they came from", ("problem_type", "source")
+)
+MENTAL_MATH_SESSIONS = REGISTRY.counter(
+    "qf_mental_math_sessions_total", "Mental-math WebSocket sessions by how they ended", ("outcome",)
+)
+MENTAL_MATH_ANSWERS = REGISTRY.counter(
+    "qf_mental_math_answers_total", "Answers scored in mental-math sessions", ("correct",)
+)
+
+def _hit_ratio(hits, misses):
+    return hits / (hits + misses) if hits + misses else 0.0
+
+REGISTRY.collector("qf_worker_pool_jobs", "gauge", "Jobs running or queued on the worker pool", lambda: [
+    ({"state": "running"}, worker_pool.stats()["running"]),
+    ({"state": "queued"}, worker_pool.stats()["queue_depth"])
+])
+REGISTRY.collector("qf_worker_pool_jobs_total", "counter", "Jobs completed or rejected by the worker pool", lambda: [
+    ({"result": "completed"}, worker_pool.stats()["completed"]),
+    ({"result": "rejected"}, worker_pool.stats()["rejected"])
+])
+REGISTRY.collector("qf_seeded_problem_cache_hit_ratio", "gauge", "Hit ratio of the seeded problem LRU cache", lambda: [
+    ({}, _hit_ratio(problem_generator.cache_info().hits, problem_generator.cache_info().misses))
+])
+REGISTRY.collector("qf_solution_cache_hit_ratio", "gauge", "Hit ratio of the reference solution LRU cache", lambda: [
+    ({}, _hit_ratio(reference_solver.cache_info().hits, reference_solver.cache_info().misses))
+])
+REGISTRY.collector("qf_problem_bank_hit_ratio", "gauge", "Share of bank lookups that found a problem", lambda: [
+    ({}, _hit_ratio(problem_bank.hits, problem_bank.misses))
+] if problem_bank is not None else [])
+REGISTRY.collector("qf_problem_bank_size", "gauge", "Problems currently stored per bank", lambda: [
+    ({"bank": bank}, n) for bank, n in problem_bank.stats()["counts"].items()
+] if problem_bank is not None else [])
+
+def _error_response(handler: str, e: Exception):
+    """Count and log an error a handler caught, then build the usual error payload."""
+    HANDLER_ERRORS.inc(handler=handler, error=type(e).__name__)
+    # Bad input surfaces as ValueError; anything else deserves a traceback
+    if isinstance(e, ValueError):
+        logger.info("%s rejected request: %s", handler, e)
+    else:
+        logger.exception("%s failed", handler)
+    return {"status": "error", "message": str(e)}
+
+def _generate_timed(problem_type=None, difficulty=None, seed=None):
+    """Generate one problem and report how long that took.
+
+    Timing happens in the worker, so it excludes queueing and still works
+    for process pools, whose own metrics would never reach /metrics.
+    """
+    start = time.perf_counter()
+    problem = problem_generator.generate_problem(problem_type, difficulty, seed)
+    return problem, time.perf_counter() - start
+
+def _timed_job(fn, *args, **kwargs):
+    """Run fn in the worker, returning (result, elapsed, error) instead of raising.
+
+    Like _generate_timed, timing happens in the worker so it excludes
+    queueing and is not lost in process pools.
+    """
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs), time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, e
+
+async def _run_timed(fn, *args, **kwargs):
+    """worker_pool.run, recording fn in qf_function_duration_seconds and qf_function_errors_total."""
+    result, elapsed, error = await worker_pool.run(_timed_job, fn, *args, **kwargs)
+    label = fn.__name__.lstrip('_')
+    if REGISTRY.timing_enabled:
+        FUNCTION_LATENCY.observe(elapsed, function=label)
+    if error is not None:
+        FUNCTION_ERRORS.inc(function=label, error=type(error).__name__)
+        raise error
+    return result
+
+def _record_generation(problem, elapsed, source="generated"):
+    PROBLEMS_SERVED.inc(problem_type=problem.get("type", "unknown"), source=source)
+    if REGISTRY.timing_enabled and elapsed is not None:
+        GENERATION_LATENCY.observe(
+            elapsed, problem_type=problem.get("type", "unknown"), difficulty=problem.get("difficulty", "none")
+        )
+
+def _generate_chunk(mix, seed, chunk_index, size):
+    """One chunk of a streamed problem set, run on the worker pool."""
+    return bulk_generation.generate_chunk(problem_generator, mix, seed, chunk_index, size)
+
+def _generate_mental_math_batch(n, seed):
+    """A session's worth of mental math problems, run on the worker pool."""
+    return problem_generator.generate_mental_math_batch(n, np.random.default_rng(seed))
+
+def _reference_solution(problem_id):
+    """Reference answers, run on the worker pool.
+
+    A module-level function rather than the bound method, so that a process
+    pool reuses each worker's own solver and its cache instead of
+    unpickling a fresh copy for every job.
+    """
+    return reference_solver.solution(problem_id)
+
+def _generate_problems(problem_type, difficulty, n):
+    """Generate n problems (with their generation times) in one worker-pool job for the bank refill."""
+    return [_generate_timed(problem_type, difficulty) for _ in range(n)]
+
+async def _refill_problem_bank():
+    """Top up banks that fall below the low-water mark; only one worker refills at a time."""
+    while True:
+        if problem_bank.try_acquire_refill():
+            try:
+                for (problem_type, difficulty), missing in problem_bank.refill_needed().items():
+                    timed_problems = await worker_pool.run(_generate_problems, problem_type, difficulty, missing)
+                    if REGISTRY.timing_enabled:
+                        for problem, elapsed in timed_problems:
+                            GENERATION_LATENCY.observe(elapsed, problem_type=problem["type"],
+                                                       difficulty=problem.get("difficulty", "none"))
+                    problem_bank.push_many((problem_type, difficulty), [p for p, _ in timed_problems])
+            except PoolSaturatedError:
+                pass  # Serving requests comes first; try again next round
+            except Exception as e:
+                HANDLER_ERRORS.inc(handler="refill_problem_bank", error=type(e).__name__)
+                logger.exception("Problem bank refill failed")
+            finally:
+                problem_bank.release_refill()
+        await asyncio.sleep(PROBLEM_BANK_REFILL_INTERVAL)
+
+@app.on_event("startup")
+async def serialize_static_responses():
+    practice_response.refresh()
+    types_response.refresh()
+    templates_response.refresh()
+
+@app.on_event("startup")
+async def start_problem_bank():
+    global problem_bank
+    if not PROBLEM_BANK_ENABLED:
+        return
+    keys = [
+        (problem_type, difficulty if problem_type != 'mental_math' else None)
+        for problem_type in problem_generator.problem_types
+        for difficulty in problem_generator.difficulty_levels
+    ]
+    problem_bank = ProblemBank(
+        os.getenv("PROBLEM_BANK_PATH", DEFAULT_PROBLEM_BANK_PATH),
+        list(dict.fromkeys(keys)),
+        capacity=int(os.getenv("PROBLEM_BANK_CAPACITY", 256)),
+        low_water=int(os.getenv("PROBLEM_BANK_LOW_WATER", 32)),
+        high_water=int(os.getenv("PROBLEM_BANK_HIGH_WATER", 128))
+    )
+    app.state.problem_bank_refill = asyncio.create_task(_refill_problem_bank())
+
+@app.on_event("shutdown")
+async def shutdown_worker_pool():
+    if problem_bank is not None:
+        app.state.problem_bank_refill.cancel()
+        problem_bank.close()
+    worker_pool.shutdown()
+
+MAX_BATCH_CONTRACTS = 100_000
+MAX_MONTE_CARLO_PATHS = 2_000_000
+MAX_MONTE_CARLO_STEPS = 2_000
+MAX_LATTICE_NODES = 50_000_000
+MAX_SIMULATION_PATHS = 200_000
+MAX_SIMULATION_STEPS = 2_000
+MAX_SAMPLE_PATHS = 50
+MAX_STREAM_PROBLEMS = 100_000
+MAX_BOOTSTRAP_RESAMPLES = 10_000
+MAX_RISK_OBSERVATIONS = 100_000
+# Loss evaluations (observations x positions x resamples) allowed per historical/bootstrap request
+MAX_RISK_WORK = 10_000_000
+MAX_PORTFOLIO_ASSETS = 500
+# Factorization work (sum of assets^3 over problems) allowed per portfolio batch
+MAX_PORTFOLIO_BATCH_WORK = 500_000_000
+MAX_FRONTIER_POINTS = 200
+# ADMM iterations (solves x max_iterations) allowed per constrained portfolio request
+MAX_PORTFOLIO_ITERATIONS = 200_000
+# Solver work (ADMM iterations x assets^2) allowed per constrained portfolio request
+MAX_PORTFOLIO_WORK = 1_000_000_000
+DEFAULT_PRACTICE_PAGE_SIZE = 20
+MAX_PRACTICE_PAGE_SIZE = 200
+MONTE_CARLO_WORKERS = int(os.getenv("MONTE_CARLO_WORKERS", 1))
+
+class BlackScholesBatchRequest(BaseModel):
+    """Contract parameters; each field is a scalar or a list that broadcasts with the others."""
+    stock_price: Union[float, List[float]]
+    strike_price: Union[float, List[float]]
+    time_to_maturity: Union[float, List[float]]
+    risk_free_rate: Union[float, List[float]]
+    volatility: Union[float, List[float]]
+    dividend_yield: Union[float, List[float]] = 0.0
+    option_type: Union[str, List[str]] = 'call'
+
+class ImpliedVolatilityBatchRequest(BaseModel):
+    """Option quotes to invert; each field is a scalar or a list that broadcasts with the others."""
+    option_price: Union[float, List[float]]
+    stock_price: Union[float, List[float]]
+    strike_price: Union[float, List[float]]
+    time_to_maturity: Union[float, List[float]]
+    risk_free_rate: Union[float, List[float]]
+    dividend_yield: Union[float, List[float]] = 0.0
+    option_type: Union[str, List[str]] = 'call'
+
+class LatticeBatchRequest(BlackScholesBatchRequest):
+    """Contract parameters plus tree settings for American/European lattice pricing."""
+    option_type: Union[str, List[str]] = 'put'
+    american: bool = True
+    steps: int = 200
+    method: str = 'binomial'
+    smoothing: bool = True
+    richardson: bool = True
+
+class MonteCarloRequest(BaseModel):
+    """Contract and simulation settings for a Monte Carlo price."""
+    stock_price: float
+    strike_price: float
+    time_to_maturity: float
+    risk_free_rate: float
+    volatility: float
+    dividend_yield: float = 0.0
+    option_type: str = 'call'
+    payoff: str = 'european'
+    barrier_level: Optional[float] = None
+    n_paths: int = 100_000
+    n_steps: int = 252
+    seed: Optional[int] = None
+
+class RiskRequest(BaseModel):
+    """Positions and a return model for VaR/ES.
+
+    Parametric methods take mean_return and volatility (scalars or lists
+    that broadcast with positions). Historical methods take returns: one
+    series with scalar positions, or observations x assets with one row of
+    holdings per position.
+    """
+    method: str = 'normal'
+    confidence_levels: List[float] = [0.95, 0.99]
+    positions: Union[float, List[float], List[List[float]]] = 1.0
+    mean_return: Optional[Union[float, List[float]]] = None
+    volatility: Optional[Union[float, List[float]]] = None
+    degrees_of_freedom: Optional[Union[float, List[float]]] = None
+    horizon: float = 1.0
+    returns: Optional[Union[List[float], List[List[float]]]] = None
+    n_resamples: int = 1000
+    seed: Optional[int] = None
+
+class PortfolioParameters(BaseModel):
+    """The 'parameters' block of a generated portfolio problem."""
+    returns: List[float]
+    volatilities: List[float]
+    correlations: List[List[float]]
+
+class ConstrainedPortfolioRequest(PortfolioParameters):
+    """A generated portfolio problem plus solver settings."""
+    constraints: List[str] = []
+    transaction_costs: Optional[List[float]] = None
+    current_weights: Optional[List[float]] = None
+    risk_aversion: float = 3.0
+    frontier_points: int = 0
+    max_iterations: int = 10_000
+
+class PortfolioBatchRequest(BaseModel):
+    problems: List[PortfolioParameters]
+    risk_free_rate: float = 0.0
+
+def _check_batch_size(args):
+    """Reject batches whose broadcast size exceeds MAX_BATCH_CONTRACTS."""
+    shape = np.broadcast_shapes(*(np.shape(a) for a in args))
+    if int(np.prod(shape)) > MAX_BATCH_CONTRACTS:
+        raise ValueError(f"Batch size exceeds {MAX_BATCH_CONTRACTS} contracts")
+
+def _solve_portfolio_batch(request: PortfolioBatchRequest):
+    """Solve every problem in the batch, one stacked solve per portfolio size."""
+    # Stack problems with the same number of assets so each size is one batched solve
+    by_size = {}
+    for i, problem in enumerate(request.problems):
+        by_size.setdefault(len(problem.returns), []).append(i)
+
+    solutions = [None] * len(request.problems)
+    for indices in by_size.values():
+        group = [request.problems[i] for i in indices]
+        result = optimize_portfolios(
+            [p.returns for p in group],
+            [p.volatilities for p in group],
+            [p.correlations for p in group],
+            request.risk_free_rate
+        )
+        for k, i in enumerate(indices):
+            solutions[i] = {
+                name: {
+                    "weights": result[name]["weights"][k].tolist(),
+                    "expected_return": float(result[name]["expected_return"][k]),
+                    "volatility": float(result[name]["volatility"][k]),
+                    "sharpe_ratio": float(result[name]["sharpe_ratio"][k])
+                }
+                for name in ("max_sharpe", "min_variance")
+            }
+            if not result["max_sharpe"]["valid"][k]:
+                solutions[i]["max_sharpe"] = None
+    return solutions
+
+def _solve_constrained_portfolio(request: ConstrainedPortfolioRequest):
+    """Solve the constrained problem and the optional frontier sweep."""
+    n_assets = len(request.returns)
+    if n_assets > MAX_PORTFOLIO_ASSETS:
+        raise ValueError(f"Portfolio exceeds {MAX_PORTFOLIO_ASSETS} assets")
+    if request.max_iterations < 1:
+        raise ValueError("max_iterations must be positive")
+    frontier_points = min(max(request.frontier_points, 0), MAX_FRONTIER_POINTS)
+    iterations = (1 + frontier_points) * request.max_iterations
+    if iterations > MAX_PORTFOLIO_ITERATIONS:
+        raise ValueError(f"Request allows more than {MAX_PORTFOLIO_ITERATIONS} solver iterations; "
+                         "lower max_iterations or frontier_points")
+    if iterations * n_assets * n_assets > MAX_PORTFOLIO_WORK:
+        raise ValueError(f"Request requires more than {MAX_PORTFOLIO_WORK} solver operations")
+
+    cov = covariance_matrix(request.volatilities, request.correlations)
+    options = {
+        "constraints": parse_constraints(request.constraints, n_assets),
+        "transaction_costs": request.transaction_costs,
+        "current_weights": request.current_weights,
+        "max_iterations": request.max_iterations
+    }
+
+    def serialize(result):
+        return {
+            "weights": result["weights"].tolist(),
+            "expected_return": result["expected_return"],
+            "volatility": result["volatility"],
+            "transaction_cost": result["transaction_cost"],
+            "iterations": result["iterations"],
+            "converged": result["converged"]
+        }
+
+    optimum = constrained_mean_variance(request.returns, cov, request.risk_aversion, **options)
+    response = {"portfolio": serialize(optimum)}
+    if frontier_points > 0:
+        risk_aversions = np.geomspace(0.5, 50.0, frontier_points)
+        frontier = efficient_frontier(request.returns, cov, risk_aversions, **options)
+        response["frontier"] = [
+            {"risk_aversion": point["risk_aversion"], **serialize(point)} for point in frontier
+        ]
+    return response
+
+def _compute_var_es(request: RiskRequest):
+    """VaR/ES for every position and confidence level in one vectorized call."""
+    if request.method not in RISK_METHODS:
+        raise ValueError(f"method must be one of {RISK_METHODS}")
+    if request.n_resamples > MAX_BOOTSTRAP_RESAMPLES:
+        raise ValueError(f"n_resamples exceeds {MAX_BOOTSTRAP_RESAMPLES}")
+    n_positions = max(np.shape(x)[0] if np.ndim(x) else 1
+                      for x in (request.positions, request.mean_return, request.volatility))
+    if n_positions * len(request.confidence_levels) > MAX_BATCH_CONTRACTS:
+        raise ValueError(f"Batch size exceeds {MAX_BATCH_CONTRACTS} position-level pairs")
+    if request.returns is not None:
+        n_observations = len(request.returns)
+        if n_observations > MAX_RISK_OBSERVATIONS:
+            raise ValueError(f"returns exceed {MAX_RISK_OBSERVATIONS} observations")
+        resamples = request.n_resamples if request.method == 'bootstrap' else 1
+        if n_observations * n_positions * max(resamples, 1) > MAX_RISK_WORK:
+            raise ValueError(f"Request requires more than {MAX_RISK_WORK} loss evaluations")
+    result = var_es(
+        request.method, request.confidence_levels, request.positions,
+        returns=request.returns, mu=request.mean_return, sigma=request.volatility,
+        df=request.degrees_of_freedom, horizon=request.horizon,
+        n_resamples=request.n_resamples, seed=request.seed
+    )
+    return {key: value.tolist() for key, value in result.items()}
+
+def _simulate(process, n_paths, n_steps, T, seed, level, sample_paths, params):
+    """Compute streaming path statistics and a handful of sample paths for plotting."""
+    stats = path_statistics(process, n_paths, n_steps, T=T, seed=seed, level=level, **params)
+    samples = simulate_paths(process, sample_paths, n_steps, T=T, rng=np.random.default_rng(seed), **params)
+    return {
+        "statistics": {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in stats.items()},
+        "sample_paths": samples.tolist()
+    }
 
 @app.get("/")
 async def root():
@@ -36,44 +511,429 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    """Expose this process's metrics in the Prometheus text format.
+
+    Set METRICS_TIMING=0 to skip latency measurement on hot paths; counters
+    and gauges are still reported.
+    """
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/pool/stats")
+async def get_pool_stats():
+    """Report worker pool queue depth, rejections and wait times."""
+    return {
+        "status": "success",
+        "pool": worker_pool.stats(),
+        "bank": problem_bank.stats() if problem_bank is not None else None
+    }
+
 @app.get("/problems/generate")
 async def generate_problem(
     problem_type: str = Query(None, description="Type of problem to generate"),
-    difficulty: str = Query(None, description="Difficulty level of the problem")
+    difficulty: str = Query(None, description="Difficulty level of the problem"),
+    seed: Optional[int] = Query(None, description="Seed returned with an earlier problem, to reproduce it"),
+    compact: bool = Query(False, description="Return the question as a template id and parameters")
 ):
     """Generate a random quantitative finance problem."""
     try:
-        problem = problem_generator.generate_problem(problem_type, difficulty)
-        return {"status": "success", "problem": problem}
+        problem = None
+        if seed is None and problem_bank is not None:
+            # Choose the bank exactly as on-demand generation would choose type and difficulty
+            problem_type, difficulty = problem_generator.resolve(problem_type, difficulty)
+            problem = problem_bank.pop(problem_type, difficulty)
+        if problem is not None:
+            _record_generation(problem, None, source="bank")
+        else:
+            problem, elapsed = await worker_pool.run(_generate_timed, problem_type, difficulty, seed)
+            _record_generation(problem, elapsed)
+        return {"status": "success", "problem": to_wire(problem, compact)}
+    except PoolSaturatedError:
+        raise
     except Exception as e:
-        return {"status": "error", "message": str(e)}
+        return _error_response("generate_problem", e)
+
+@app.get("/problems/{problem_id}/solution")
+async def get_problem_solution(problem_id: str):
+    """Reference answers for a generated problem, by the id it was returned with.
+
+    Solutions are computed on first request, from the problem's own
+    parameters, and then served from an LRU cache.
+    """
+    try:
+        solution = await _run_timed(_reference_solution, problem_id)
+        return {"status": "success", "solution": solution}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("get_problem_solution", e)
+
+@app.get("/problems/stream")
+async def stream_problems(
+    count: int = Query(100, ge=1, le=MAX_STREAM_PROBLEMS, description="Number of problems to generate"),
+    mix: Optional[str] = Query(None, description="Weighted mix, e.g. option_pricing:hard=2,probability=1"),
+    format: str = Query("ndjson", description="ndjson or sse"),
+    seed: Optional[int] = Query(None, description="Seed for a reproducible problem set"),
+    compact: bool = Query(False, description="Send questions as template ids and parameters")
+):
+    """Stream a generated problem set as NDJSON or Server-Sent Events.
+
+    Problems are generated in small chunks on the worker pool and sent as
+    each chunk is ready, so the client can start reading immediately and
+    the server holds one chunk at a time however large count is. The set
+    depends only on (count, mix, seed); the seed used is returned in the
+    X-Problem-Set-Seed header. With compact=true each question is sent as
+    a template id and parameters, to be rendered from /problems/templates.
+    """
+    if format not in bulk_generation.FORMATS:
+        return _error_response("stream_problems", ValueError("format must be 'ndjson' or 'sse'"))
+    if seed is not None and not 0 <= seed < MAX_SEED:
+        return _error_response("stream_problems", ValueError(f"seed must be in [0, {MAX_SEED})"))
+    try:
+        entries = bulk_generation.parse_mix(mix, problem_generator.problem_types, problem_generator.difficulty_levels)
+    except ValueError as e:
+        return _error_response("stream_problems", e)
+    seed = secrets.randbelow(MAX_SEED) if seed is None else seed
+    media_type, render = bulk_generation.FORMATS[format]
+
+    async def body():
+        index = 0
+        try:
+            for chunk_index, size in bulk_generation.chunk_sizes(count):
+                while True:
+                    try:
+                        problems = await worker_pool.run(_generate_chunk, entries, seed, chunk_index, size)
+                        break
+                    except PoolSaturatedError:
+                        # Headers are already sent, so wait for capacity instead of failing the stream
+                        await asyncio.sleep(0.05)
+                PROBLEMS_SERVED.inc(len(problems), problem_type="mixed", source="stream")
+                lines = []
+                for problem in problems:
+                    lines.append(render(to_wire(problem, compact), index))
+                    index += 1
+                yield ''.join(lines)
+            if format == 'sse':
+                yield bulk_generation.sse_event("end", {"count": index, "seed": seed})
+        except Exception as e:
+            HANDLER_ERRORS.inc(handler="stream_problems", error=type(e).__name__)
+            logger.exception("stream_problems failed")
+            error = {"status": "error", "message": str(e)}
+            yield bulk_generation.sse_event("error", error) if format == 'sse' else render(error, index)
+
+    return StreamingResponse(body(), media_type=media_type,
+                             headers={"X-Problem-Set-Seed": str(seed), "Cache-Control": "no-cache"})
 
 @app.get("/problems/practice")
-async def get_practice_problems():
+async def get_practice_problems(
+    request: Request,
+    problem_type: Optional[str] = Query(None, description="Only problems of this type"),
+    difficulty: Optional[str] = Query(None, description="Only problems of this difficulty"),
+    q: Optional[str] = Query(None, description="Search terms matched against title, question and description"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PRACTICE_PAGE_SIZE, description="Page size"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """Get practice problems.
+
+    Without parameters this returns the full list (pre-serialized, ETag-validated).
+    Any filter, pagination or projection parameter switches to an indexed, paginated query.
+    """
+    if all(v is None for v in (problem_type, difficulty, q, cursor, limit, fields)):
+        return practice_response.respond(request)
     try:
-        problems = problem_generator.get_practice_problems()
-        return {"status": "success", "problems": problems}
+        page = problem_generator.query_practice_problems(
+            problem_type=problem_type,
+            difficulty=difficulty,
+            text=q,
+            cursor=cursor,
+            limit=limit or DEFAULT_PRACTICE_PAGE_SIZE,
+            fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        )
+        return {"status": "success", **page}
     except Exception as e:
-        return {"status": "error", "message": str(e)}
+        return _error_response("get_practice_problems", e)
 
 @app.get("/problems/types")
-async def get_problem_types():
+async def get_problem_types(request: Request):
     """Get available problem types."""
-    return {
-        "status": "success",
-        "types": problem_generator.problem_types,
-        "difficulties": problem_generator.difficulty_levels
-    }
+    return types_response.respond(request)
+
+@app.get("/problems/templates")
+async def get_question_templates(request: Request):
+    """Question templates for rendering problems fetched with compact=true."""
+    return templates_response.respond(request)
 
 @app.get("/problems/mental-math")
 async def generate_mental_math():
-    """Generate a mental math problem."""
+    """Generate a mental math problem, answer included.
+
+    Legacy and unscored: for self-checked practice only. Scored sessions
+    run over /ws/mental-math, which never reveals an answer before scoring it.
+    """
     try:
-        problem = problem_generator.generate_problem(problem_type='mental_math')
+        problem = problem_bank.pop('mental_math') if problem_bank is not None else None
+        if problem is not None:
+            _record_generation(problem, None, source="bank")
+        else:
+            problem, elapsed = await worker_pool.run(_generate_timed, 'mental_math')
+            _record_generation(problem, elapsed)
         return {"status": "success", "problem": problem}
+    except PoolSaturatedError:
+        raise
     except Exception as e:
-        return {"status": "error", "message": str(e)}
+        return _error_response("generate_mental_math", e)
+
+@app.websocket("/ws/mental-math")
+async def mental_math_session(websocket: WebSocket):
+    """Run a timed mental-math session over one WebSocket, scored on the server.
+
+    Server messages:
+      {"type": "start", "duration": seconds}
+      {"type": "problems", "problems": [{"id", "question"}, ...]}  (sent ahead of time)
+      {"type": "result", "id", "correct", "answer", "score", "answered", "problems": [...]}
+      {"type": "error", "message"}
+      {"type": "end", "score", "answered", "accuracy", "duration"}
+    Client messages:
+      {"type": "answer", "id": problem id, "answer": number}
+
+    Answers to session problems never leave the server before they are
+    scored, unlike the legacy, unscored /problems/mental-math endpoints,
+    which return them. The session ends, and the socket closes, when its
+    time runs out. Problems are drawn from fresh OS entropy, never a
+    client-chosen seed, so they cannot be predicted by replaying a seed
+    against /problems/mental-math/batch.
+    """
+    await websocket.accept()
+    session = MentalMathSession(problem_generator.generate_mental_math_batch)
+    try:
+        await websocket.send_json({"type": "start", "duration": session.duration})
+        await websocket.send_json({"type": "problems", "problems": session.top_up()})
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_json(), timeout=session.remaining)
+            except asyncio.TimeoutError:
+                break
+            except ValueError:
+                await websocket.send_json({"type": "error", "message": "Messages must be JSON"})
+                continue
+            if not isinstance(message, dict) or message.get("type") != "answer":
+                await websocket.send_json({"type": "error", "message": "Expected an answer message"})
+                continue
+            try:
+                result = session.submit(message.get("id"), message.get("answer"))
+            except ValueError as e:
+                if session.finished:
+                    break
+                await websocket.send_json({"type": "error", "message": str(e)})
+                continue
+            MENTAL_MATH_ANSWERS.inc(correct=str(result["correct"]).lower())
+            await websocket.send_json({"type": "result", **result, "problems": session.top_up()})
+        await websocket.send_json({"type": "end", **session.summary()})
+        await websocket.close()
+        MENTAL_MATH_SESSIONS.inc(outcome="completed")
+    except WebSocketDisconnect:
+        MENTAL_MATH_SESSIONS.inc(outcome="disconnected")
+
+@app.get("/problems/mental-math/batch")
+async def generate_mental_math_batch(
+    n: int = Query(100, ge=1, le=1000, description="Number of problems to generate"),
+    seed: Optional[int] = Query(None, description="Seed for a reproducible session")
+):
+    """Generate a full session's worth of mental math problems, answers included, in one call.
+
+    Legacy and unscored, like /problems/mental-math: the seed only makes a
+    practice set reproducible. Scored sessions run over /ws/mental-math.
+    """
+    try:
+        problems = await worker_pool.run(_generate_mental_math_batch, n, seed)
+        return {"status": "success", "problems": problems}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("generate_mental_math_batch", e)
+
+@app.post("/pricing/black-scholes")
+async def price_black_scholes_batch(request: BlackScholesBatchRequest):
+    """Price a batch of European calls/puts in one vectorized pass."""
+    try:
+        args = (
+            request.stock_price,
+            request.strike_price,
+            request.time_to_maturity,
+            request.risk_free_rate,
+            request.volatility,
+            request.dividend_yield,
+            request.option_type
+        )
+        _check_batch_size(args)
+        prices = await _run_timed(black_scholes_price, *args)
+        return {"status": "success", "prices": np.atleast_1d(prices).tolist()}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("price_black_scholes_batch", e)
+
+@app.post("/pricing/implied-volatility")
+async def solve_implied_volatility_batch(request: ImpliedVolatilityBatchRequest):
+    """Back out implied volatilities for a batch of call/put quotes."""
+    try:
+        args = (
+            request.option_price,
+            request.stock_price,
+            request.strike_price,
+            request.time_to_maturity,
+            request.risk_free_rate,
+            request.dividend_yield,
+            request.option_type
+        )
+        _check_batch_size(args)
+        result = await _run_timed(implied_volatility, *args)
+        vols = np.atleast_1d(result['implied_volatility'])
+        return {
+            "status": "success",
+            # NaN is not valid JSON; quotes outside no-arbitrage bounds come back as null
+            "implied_volatilities": [None if np.isnan(v) else v for v in vols.tolist()],
+            "iterations": np.atleast_1d(result['iterations']).tolist(),
+            "converged": np.atleast_1d(result['converged']).tolist()
+        }
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("solve_implied_volatility_batch", e)
+
+@app.post("/pricing/lattice")
+async def price_lattice_batch(request: LatticeBatchRequest):
+    """Price a batch of American/European options on a binomial or trinomial tree."""
+    try:
+        args = (
+            request.stock_price,
+            request.strike_price,
+            request.time_to_maturity,
+            request.risk_free_rate,
+            request.volatility,
+            request.dividend_yield,
+            request.option_type
+        )
+        _check_batch_size(args)
+        n_contracts = int(np.prod(np.broadcast_shapes(*(np.shape(a) for a in args))))
+        if n_contracts * request.steps * request.steps > MAX_LATTICE_NODES:
+            raise ValueError(f"Batch requires more than {MAX_LATTICE_NODES} lattice node updates")
+        prices = await _run_timed(
+            lattice_price,
+            *args,
+            american=request.american,
+            steps=request.steps,
+            method=request.method,
+            smoothing=request.smoothing,
+            richardson=request.richardson
+        )
+        return {"status": "success", "prices": np.atleast_1d(prices).tolist()}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("price_lattice_batch", e)
+
+@app.post("/pricing/monte-carlo")
+async def price_monte_carlo(request: MonteCarloRequest):
+    """Price a European, Asian or barrier option by Monte Carlo simulation."""
+    try:
+        if request.n_paths > MAX_MONTE_CARLO_PATHS:
+            raise ValueError(f"n_paths exceeds {MAX_MONTE_CARLO_PATHS}")
+        if request.n_steps > MAX_MONTE_CARLO_STEPS:
+            raise ValueError(f"n_steps exceeds {MAX_MONTE_CARLO_STEPS}")
+        result = await _run_timed(
+            monte_carlo_price,
+            request.stock_price,
+            request.strike_price,
+            request.time_to_maturity,
+            request.risk_free_rate,
+            request.volatility,
+            q=request.dividend_yield,
+            option_type=request.option_type,
+            payoff=request.payoff,
+            barrier=request.barrier_level,
+            n_paths=request.n_paths,
+            n_steps=request.n_steps,
+            seed=request.seed,
+            n_workers=MONTE_CARLO_WORKERS
+        )
+        return {"status": "success", **result}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("price_monte_carlo", e)
+
+@app.post("/risk/var-es")
+async def compute_var_es(request: RiskRequest):
+    """Value at Risk and Expected Shortfall by normal, Student-t, historical or bootstrap methods."""
+    try:
+        result = await _run_timed(_compute_var_es, request)
+        return {"status": "success", "confidence_levels": request.confidence_levels, **result}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("compute_var_es", e)
+
+@app.post("/portfolio/optimize")
+async def optimize_portfolio_batch(request: PortfolioBatchRequest):
+    """Solve max-Sharpe and minimum-variance portfolios for a batch of generated problems."""
+    try:
+        if len(request.problems) > MAX_BATCH_CONTRACTS:
+            raise ValueError(f"Batch size exceeds {MAX_BATCH_CONTRACTS} problems")
+        sizes = [len(problem.returns) for problem in request.problems]
+        if max(sizes, default=0) > MAX_PORTFOLIO_ASSETS:
+            raise ValueError(f"Portfolio exceeds {MAX_PORTFOLIO_ASSETS} assets")
+        if sum(n ** 3 for n in sizes) > MAX_PORTFOLIO_BATCH_WORK:
+            raise ValueError(f"Batch requires more than {MAX_PORTFOLIO_BATCH_WORK} factorization operations")
+        solutions = await _run_timed(_solve_portfolio_batch, request)
+        return {"status": "success", "solutions": solutions}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("optimize_portfolio_batch", e)
+
+@app.post("/portfolio/constrained")
+async def optimize_constrained_portfolio(request: ConstrainedPortfolioRequest):
+    """Solve a constrained mean-variance problem, optionally sweeping an efficient frontier."""
+    try:
+        response = await _run_timed(_solve_constrained_portfolio, request)
+        return {"status": "success", **response}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("optimize_constrained_portfolio", e)
+
+@app.get("/simulations/paths")
+async def simulate_stochastic_paths(
+    process: str = Query(..., description=f"One of {PROCESS_TYPES}"),
+    n_paths: int = Query(10_000, ge=1, le=MAX_SIMULATION_PATHS),
+    n_steps: int = Query(250, ge=1, le=MAX_SIMULATION_STEPS),
+    T: float = Query(1.0, gt=0),
+    x0: Optional[float] = Query(None),
+    mu: float = Query(0.0),
+    sigma: float = Query(1.0, ge=0),
+    theta: float = Query(1.0, ge=0),
+    long_run_mean: float = Query(0.0),
+    level: Optional[float] = Query(None, description="Level for hitting-time statistics"),
+    sample_paths: int = Query(10, ge=0, le=MAX_SAMPLE_PATHS, description="Paths to return for plotting"),
+    seed: Optional[int] = Query(None)
+):
+    """Simulate a stochastic process and return streaming summary statistics plus a few sample paths."""
+    try:
+        params = {"x0": x0, "mu": mu, "sigma": sigma, "theta": theta, "long_run_mean": long_run_mean}
+        result = await _run_timed(
+            _simulate, process, n_paths, n_steps, T, seed, level, sample_paths, params
+        )
+        return {"status": "success", **result}
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        return _error_response("simulate_stochastic_paths", e)
 
 if __name__ == "__main__":
+    import uvicorn
+
     port = int(os.getenv("PYTHON_PORT", 8000))
     uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True) 
\ No newline at end of file
@@ -0,0 +1,76 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from services.problem_generator import MAX_SEED
+
+CHUNK_SIZE = 64
+
+# (problem_type, difficulty or None for any, weight)
+MixEntry = Tuple[str, Optional[str], float]
+
+def parse_mix(spec: Optional[str], problem_types: List[str], difficulty_levels: List[str]) -> List[MixEntry]:
+    """Parse a mix such as "option_pricing:hard=2,probability=1,mental_math".
+
+    Each comma-separated entry is type[:difficulty][=weight]; a missing
+    difficulty means any difficulty and a missing weight means 1. An empty
+    spec is an even mix of every type.
+    """
+    if not spec:
+        return [(problem_type, None, 1.0) for problem_type in problem_types]
+    mix = []
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        key, _, weight = entry.partition('=')
+        problem_type, _, difficulty = key.partition(':')
+        if problem_type not in problem_types:
+            raise ValueError(f"Unknown problem type: {problem_type}")
+        if difficulty and difficulty not in difficulty_levels:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        try:
+            weight = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight in {entry!r}")
+        if weight <= 0:
+            raise ValueError(f"Weights must be positive: {entry!r}")
+        mix.append((problem_type, difficulty or None, weight))
+    if not mix:
+        raise ValueError("mix is empty")
+    return mix
+
+def generate_chunk(generator, mix: List[MixEntry], seed: int, chunk_index: int, size: int) -> List[Dict[str, Any]]:
+    """Generate one chunk of a problem set.
+
+    The chunk depends only on (mix, seed, chunk_index, size), so a set can
+    be produced chunk by chunk, in any process, and still be reproducible.
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+    weights = np.array([weight for _, _, weight in mix])
+    picks = rng.choice(len(mix), size=size, p=weights / weights.sum())
+    seeds = rng.integers(0, MAX_SEED, size=size)
+    return [
+        generator.generate_problem(mix[k][0], mix[k][1], int(problem_seed), cache=False)
+        for k, problem_seed in zip(picks.tolist(), seeds.tolist())
+    ]
+
+def chunk_sizes(count: int, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, int]]:
+    """(chunk_index, size) pairs covering count problems."""
+    for index, start in enumerate(range(0, count, chunk_size)):
+        yield index, min(chunk_size, count - start)
+
+def format_ndjson(problem: Dict[str, Any], index: int) -> str:
+    return json.dumps(problem, separators=(',', ':')) + '\n'
+
+def format_sse(problem: Dict[str, Any], index: int) -> str:
+    return f"id: {index}\nevent: problem\ndata: {json.dumps(problem, separators=(',', ':'))}\n\n"
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', format_ndjson),
+    'sse': ('text/event-stream', format_sse),
+}
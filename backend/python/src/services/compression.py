@@ -0,0 +1,144 @@
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional dependency: without it only gzip is offered
+    brotli = None
+
+# Compressing these would hold back events until a compressor flush anyway,
+# and tiny bodies are not worth the CPU
+UNCOMPRESSED_CONTENT_TYPES = ('text/event-stream',)
+MINIMUM_SIZE = 500
+
+def _accepted_encodings(header: str) -> List[Tuple[str, float]]:
+    encodings = []
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            encodings.append((name.strip().lower(), quality))
+    return encodings
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, preferring br at equal quality."""
+    qualities = dict(_accepted_encodings(accept_encoding))
+    wildcard = qualities.get('*', 0.0)
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    best, best_quality = None, 0.0
+    for name in candidates:
+        quality = qualities.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == 'br':
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Compress a chunk; flush makes everything so far decodable by the client."""
+        if self._br is not None:
+            out = self._br.process(data)
+            return out + (self._br.flush() if flush else b'')
+        out = self._gz.compress(data)
+        return out + (self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else b'')
+
+    def finish(self, data: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """Negotiate brotli (when installed) or gzip for HTTP responses.
+
+    Unlike a buffer-everything approach, streamed bodies are compressed
+    chunk by chunk and flushed after each one, so NDJSON lines still reach
+    the client as they are produced. Strong ETags become weak on compressed
+    responses, since the bytes differ from the identity encoding.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        headers = dict((k.lower(), v) for k, v in scope.get('headers', []))
+        encoding = choose_encoding(headers.get(b'accept-encoding', b'').decode('latin-1'))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message['type'] == 'http.response.start':
+                start_message = message
+                return
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if compressor is None:
+                response_headers = [(k.lower(), v) for k, v in start_message.get('headers', [])]
+                content_type = dict(response_headers).get(b'content-type', b'').decode('latin-1')
+                if (any(k == b'content-encoding' for k, _ in response_headers)
+                        or content_type.startswith(UNCOMPRESSED_CONTENT_TYPES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                new_headers = []
+                for key, value in response_headers:
+                    if key == b'content-length':
+                        continue
+                    if key == b'etag' and not value.startswith(b'W/'):
+                        value = b'W/' + value
+                    if key == b'vary':
+                        continue
+                    new_headers.append((key, value))
+                vary = dict(response_headers).get(b'vary')
+                new_headers.append((b'vary', vary + b', Accept-Encoding' if vary else b'Accept-Encoding'))
+                new_headers.append((b'content-encoding', encoding.encode()))
+                if not more_body:
+                    compressed = compressor.finish(body)
+                    new_headers.append((b'content-length', str(len(compressed)).encode()))
+                    await send({**start_message, 'headers': new_headers})
+                    await send({'type': 'http.response.body', 'body': compressed})
+                    return
+                await send({**start_message, 'headers': new_headers})
+
+            if more_body:
+                await send({'type': 'http.response.body', 'body': compressor.compress(body, flush=True),
+                            'more_body': True})
+            else:
+                await send({'type': 'http.response.body', 'body': compressor.finish(body)})
+
+        await self.app(scope, receive, send_wrapper)
+        if start_message is not None and compressor is None and not passthrough:
+            # The app never sent a body message
+            await send(start_message)
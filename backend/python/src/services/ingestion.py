@@ -0,0 +1,326 @@
+"""Streaming ingestion of practice problems into the local JSONL store.
+
+Sources are local HTML, Markdown or JSONL files. Each run streams problems
+through parse -> normalize -> dedup stages and only touches files that are
+new or changed since the last run (tracked in a manifest). Run it with:
+
+    python -m services.ingestion --sources ../data/sources
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+DEFAULT_STORE_PATH = os.path.join(DATA_DIR, 'practice_problems.jsonl')
+DEFAULT_SOURCES_DIR = os.path.join(DATA_DIR, 'sources')
+DEFAULT_MANIFEST_PATH = os.path.join(DATA_DIR, 'ingest_manifest.json')
+# Version 2 manifests list every id a file contains, not only the ones it was first to contribute
+MANIFEST_VERSION = 2
+
+SOURCE_EXTENSIONS = ('.html', '.htm', '.md', '.markdown', '.jsonl')
+REQUIRED_FIELDS = ('title', 'question')
+PROBLEM_FIELDS = ('title', 'type', 'difficulty', 'question', 'solution', 'description')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+def load_store(path: str = DEFAULT_STORE_PATH) -> List[Dict[str, Any]]:
+    """Read the practice-problem store (one JSON object per line)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _atomic_write(path: str, lines: Iterable[str]):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for line in lines:
+                f.write(line)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def write_store(problems: Iterable[Dict[str, Any]], path: str = DEFAULT_STORE_PATH):
+    _atomic_write(path, (json.dumps(p, ensure_ascii=False) + '\n' for p in problems))
+
+def parse_jsonl(text: str) -> Iterator[Dict[str, Any]]:
+    for line in text.splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+_MD_HEADING = re.compile(r'^(#{2,3})\s+(.*)$')
+_MD_FIELD = re.compile(r'^[-*]\s*(type|difficulty|description)\s*:\s*(.*)$', re.IGNORECASE)
+
+def parse_markdown(text: str) -> Iterator[Dict[str, Any]]:
+    """Parse problems written as:
+
+        ## Title
+        - type: probability
+        - difficulty: medium
+        - description: One-line summary
+        ### Question
+        ...
+        ### Solution
+        ...
+    """
+    problem: Optional[Dict[str, Any]] = None
+    section: Optional[str] = None
+    for line in text.splitlines():
+        heading = _MD_HEADING.match(line)
+        if heading and len(heading.group(1)) == 2:
+            if problem is not None:
+                yield problem
+            problem, section = {'title': heading.group(2)}, None
+            continue
+        if problem is None:
+            continue
+        if heading:
+            name = heading.group(2).strip().lower()
+            section = name if name in ('question', 'solution', 'description') else None
+            continue
+        field = _MD_FIELD.match(line.strip())
+        if field and section is None:
+            problem[field.group(1).lower()] = field.group(2)
+        elif section is not None:
+            problem[section] = problem.get(section, '') + line + '\n'
+    if problem is not None:
+        yield problem
+
+class _ProblemHTMLParser(HTMLParser):
+    """Collect elements with class="problem"; child classes name the fields.
+
+    <div class="problem" data-type="probability" data-difficulty="easy">
+      <h2 class="title">...</h2>
+      <p class="question">...</p>
+      <p class="solution">...</p>
+    </div>
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.problems: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._depth = 0
+        self._field: Optional[str] = None
+        self._field_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if self._current is None:
+            if 'problem' in classes:
+                self._current = {
+                    key[len('data-'):]: value for key, value in attrs.items()
+                    if key in ('data-type', 'data-difficulty')
+                }
+                self._depth = 1
+            return
+        if tag in VOID_TAGS:
+            if tag == 'br' and self._field is not None:
+                self._current[self._field] += '\n'
+            return
+        self._depth += 1
+        if self._field is None:
+            for name in PROBLEM_FIELDS:
+                if name in classes:
+                    self._field, self._field_depth = name, self._depth
+                    self._current.setdefault(name, '')
+                    break
+        elif tag in ('p', 'li'):
+            self._current[self._field] += '\n'
+
+    def handle_endtag(self, tag):
+        if self._current is None or tag in VOID_TAGS:
+            return
+        if self._field is not None and self._depth == self._field_depth:
+            self._field = None
+        self._depth -= 1
+        if self._depth == 0:
+            self.problems.append(self._current)
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None and self._field is not None:
+            self._current[self._field] += data
+
+def parse_html(text: str) -> Iterator[Dict[str, Any]]:
+    parser = _ProblemHTMLParser()
+    parser.feed(text)
+    parser.close()
+    yield from parser.problems
+
+PARSERS = {
+    '.jsonl': parse_jsonl,
+    '.md': parse_markdown,
+    '.markdown': parse_markdown,
+    '.html': parse_html,
+    '.htm': parse_html,
+}
+
+def parse_sources(paths: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream (source path, raw problem) pairs from each file."""
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        for raw in PARSERS[os.path.splitext(path)[1].lower()](text):
+            yield path, raw
+
+def _clean(text: Any) -> str:
+    lines = [' '.join(line.split()) for line in str(text).strip().splitlines()]
+    return '\n'.join(line for line in lines if line)
+
+def normalize(records: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Clean whitespace, canonicalize type/difficulty and drop incomplete problems."""
+    for source, raw in records:
+        problem = {field: _clean(raw[field]) for field in PROBLEM_FIELDS if raw.get(field)}
+        if not all(problem.get(field) for field in REQUIRED_FIELDS):
+            continue
+        problem['type'] = problem.get('type', 'probability').lower().replace(' ', '_').replace('-', '_')
+        difficulty = problem.get('difficulty', 'medium').lower()
+        problem['difficulty'] = difficulty if difficulty in DIFFICULTIES else 'medium'
+        problem.setdefault('solution', '')
+        problem.setdefault('description', '')
+        yield source, {field: problem[field] for field in PROBLEM_FIELDS}
+
+def fingerprint(problem: Dict[str, Any]) -> str:
+    """Content fingerprint: the question with case, punctuation and spacing removed."""
+    canonical = ' '.join(re.findall(r'[a-z0-9]+', problem['question'].lower()))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+def content_id(problem: Dict[str, Any]) -> int:
+    """Problem id derived from its fingerprint, so re-ingesting a source keeps the same ids.
+
+    48 bits keep the id exact as a JavaScript number.
+    """
+    return int(fingerprint(problem)[:12], 16)
+
+def dedup(records: Iterable[Tuple[str, Dict[str, Any]]],
+          seen: Dict[str, int]) -> Iterator[Tuple[str, Dict[str, Any], bool]]:
+    """Assign content ids and flag problems whose fingerprint is already in the store.
+
+    seen maps fingerprints to store ids and is updated as we go. Duplicates
+    are still yielded (with is_new False) so that every file containing a
+    problem can be recorded as one of its sources.
+
+    Yields:
+    (source, problem with 'id', is_new) triples
+    """
+    for source, problem in records:
+        key = fingerprint(problem)
+        problem = {'id': content_id(problem), **problem}
+        if key in seen:
+            # Only claim the stored copy if it is the ingested one, not a hand-written problem
+            if seen[key] == problem['id']:
+                yield source, problem, False
+            continue
+        seen[key] = problem['id']
+        yield source, problem, True
+
+def _file_signature(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': digest}
+
+def discover_sources(sources_dir: str) -> List[str]:
+    paths = []
+    for root, _, files in os.walk(sources_dir):
+        for name in files:
+            if name.lower().endswith(SOURCE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+def run_ingestion(sources_dir: str = DEFAULT_SOURCES_DIR, store_path: str = DEFAULT_STORE_PATH,
+                  manifest_path: str = DEFAULT_MANIFEST_PATH) -> Dict[str, int]:
+    """Ingest new or changed source files into the store.
+
+    Problems from a changed file replace the ones it contributed last time;
+    problems from files that were deleted are removed. The manifest records
+    every file that contains each problem, so a problem shared by several
+    files stays in the store until the last of them drops it. Ingested
+    problems get content-derived ids (content_id), so a problem keeps its id
+    when other problems in its file change.
+
+    Returns:
+    dict: Counts of scanned/changed files and added/removed problems
+    """
+    manifest: Dict[str, Any] = {}
+    rescan = False
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            stored = json.load(f)
+        manifest = stored['files']
+        # Older manifests under-record shared problems, so re-parse every source once
+        rescan = stored.get('version') != MANIFEST_VERSION
+
+    paths = discover_sources(sources_dir) if os.path.isdir(sources_dir) else []
+    changed, signatures = [], {}
+    for path in paths:
+        key = os.path.relpath(path, sources_dir)
+        previous = None if rescan else manifest.get(key)
+        stat = os.stat(path)
+        # Cheap mtime/size check first; only hash files that look different
+        if previous and previous['mtime'] == stat.st_mtime and previous['size'] == stat.st_size:
+            continue
+        signature = _file_signature(path)
+        if previous and previous['sha256'] == signature['sha256']:
+            manifest[key].update(mtime=signature['mtime'], size=signature['size'])
+            continue
+        changed.append(path)
+        signatures[key] = signature
+
+    current_keys = {os.path.relpath(p, sources_dir) for p in paths}
+    stale_keys = [k for k in manifest if k not in current_keys] + list(signatures)
+    dropped_ids = {i for k in stale_keys for i in manifest.get(k, {}).get('ids', [])}
+    # A problem only leaves the store when no unchanged file still contains it
+    kept_ids = {i for k, entry in manifest.items() if k not in stale_keys for i in entry.get('ids', [])}
+    stale_ids = dropped_ids - kept_ids
+
+    store = [p for p in load_store(store_path) if p['id'] not in stale_ids]
+    seen = {fingerprint(p): p['id'] for p in store}
+    contributed: Dict[str, List[int]] = {k: [] for k in signatures}
+
+    ingested = set()
+    for source, problem, is_new in dedup(normalize(parse_sources(changed)), seen):
+        ids = contributed[os.path.relpath(source, sources_dir)]
+        if problem['id'] not in ids:
+            ids.append(problem['id'])
+        if is_new:
+            # Unchanged problems in an edited file come back under the ids they had
+            store.append(problem)
+            ingested.add(problem['id'])
+
+    for key in stale_keys:
+        manifest.pop(key, None)
+    for key, signature in signatures.items():
+        manifest[key] = {**signature, 'ids': contributed[key]}
+
+    if changed or stale_ids:
+        write_store(store, store_path)
+    _atomic_write(manifest_path, [json.dumps({'version': MANIFEST_VERSION, 'files': manifest},
+                                             indent=2, sort_keys=True)])
+    return {
+        'scanned': len(paths),
+        'changed': len(changed),
+        'added': len(ingested - stale_ids),
+        'removed': len(stale_ids - ingested)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest practice problems into the local store")
+    parser.add_argument('--sources', default=DEFAULT_SOURCES_DIR, help="Directory of HTML/Markdown/JSONL files")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help="Practice problem store (JSONL)")
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST_PATH, help="Manifest of already ingested files")
+    args = parser.parse_args()
+    print(json.dumps(run_ingestion(args.sources, args.store, args.manifest)))
+
+if __name__ == "__main__":
+    main()
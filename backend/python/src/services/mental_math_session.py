@@ -0,0 +1,91 @@
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+SESSION_SECONDS = 120
+LOOKAHEAD = 5
+BATCH_SIZE = 50
+
+class MentalMathSession:
+    """Server-side state for one timed mental-math session.
+
+    Problems are generated in batches and kept here with their answers;
+    clients only ever see an id and the question text. The next LOOKAHEAD
+    problems are sent ahead of time, so answering one is a single message
+    and the next question is already on the client. Each problem can be
+    answered once, in order, and only before the session deadline.
+    """
+
+    def __init__(self, generate_batch: Callable[[int, np.random.Generator], List[Dict[str, Any]]],
+                 seed: Optional[int] = None, duration: float = SESSION_SECONDS,
+                 lookahead: int = LOOKAHEAD, clock: Callable[[], float] = time.monotonic):
+        self._generate_batch = generate_batch
+        self._rng = np.random.default_rng(seed)
+        self.duration = duration
+        self.lookahead = lookahead
+        self._clock = clock
+        self.started_at = clock()
+        self.score = 0
+        self.answered = 0
+        self._next_id = 0
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        # Problems sent to the client and not yet answered, oldest first: (id, answer)
+        self._pending: Deque[tuple] = deque()
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.started_at + self.duration - self._clock())
+
+    @property
+    def finished(self) -> bool:
+        return self.remaining <= 0
+
+    def _take(self) -> Dict[str, Any]:
+        if not self._buffer:
+            self._buffer.extend(self._generate_batch(BATCH_SIZE, self._rng))
+        problem = self._buffer.popleft()
+        problem_id = self._next_id
+        self._next_id += 1
+        self._pending.append((problem_id, problem['answer']))
+        return {'id': problem_id, 'question': problem['question']}
+
+    def top_up(self) -> List[Dict[str, Any]]:
+        """Public problems (id and question) to send so the client holds LOOKAHEAD unanswered ones."""
+        return [self._take() for _ in range(self.lookahead - len(self._pending))]
+
+    def submit(self, problem_id: int, answer: Any) -> Dict[str, Any]:
+        """Score an answer to the oldest outstanding problem.
+
+        Raises:
+        ValueError: If the session is over, the id is not the oldest
+                    outstanding problem, or the answer is not a number
+        """
+        if self.finished:
+            raise ValueError("Session is over")
+        if not self._pending or self._pending[0][0] != problem_id:
+            raise ValueError(f"Expected an answer to problem {self._pending[0][0] if self._pending else None}")
+        try:
+            value = float(answer)
+        except (TypeError, ValueError):
+            raise ValueError("answer must be a number")
+        _, expected = self._pending.popleft()
+        correct = value == expected
+        self.answered += 1
+        self.score += correct
+        return {
+            'id': problem_id,
+            'correct': correct,
+            'answer': expected,
+            'score': self.score,
+            'answered': self.answered
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'score': self.score,
+            'answered': self.answered,
+            'accuracy': self.score / self.answered if self.answered else 0.0,
+            'duration': self.duration
+        }
@@ -0,0 +1,89 @@
+import re
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional
+
+TEXT_FIELDS = ('title', 'question', 'description')
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens used by the full-text index."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+class PracticeCatalogue:
+    """Practice problems with type/difficulty indexes and a full-text inverted index.
+
+    Problems are kept sorted by id, and every index maps to a set of ids, so
+    a query intersects the relevant id sets and pages through the result
+    with an id cursor instead of scanning the whole list.
+    """
+
+    def __init__(self, problems: List[Dict[str, Any]]):
+        self._problems = sorted(problems, key=lambda p: p['id'])
+        self._by_id = {p['id']: p for p in self._problems}
+        self._ids = [p['id'] for p in self._problems]
+        self._fields = sorted({key for p in self._problems for key in p})
+        self._by_type: Dict[str, set] = {}
+        self._by_difficulty: Dict[str, set] = {}
+        self._inverted: Dict[str, set] = {}
+        for problem in self._problems:
+            self._by_type.setdefault(problem.get('type'), set()).add(problem['id'])
+            self._by_difficulty.setdefault(problem.get('difficulty'), set()).add(problem['id'])
+            for field in TEXT_FIELDS:
+                for token in tokenize(problem.get(field) or ''):
+                    self._inverted.setdefault(token, set()).add(problem['id'])
+
+    def __len__(self):
+        return len(self._problems)
+
+    def all(self) -> List[Dict[str, Any]]:
+        return self._problems
+
+    def get(self, problem_id: int) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(problem_id)
+
+    def query(self, problem_type: Optional[str] = None, difficulty: Optional[str] = None,
+              text: Optional[str] = None, cursor: Optional[int] = None, limit: int = 20,
+              fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Filter, paginate and project the catalogue.
+
+        Parameters:
+        problem_type: Only problems of this type
+        difficulty: Only problems of this difficulty
+        text: Space-separated search terms; every term must appear in the
+              title, question or description
+        cursor: Return problems with ids after this one (the previous page's next_cursor)
+        limit: Page size
+        fields: Keys to include in each problem ('id' is always included)
+
+        Returns:
+        dict: 'problems' for this page, 'total' matches and 'next_cursor'
+              (None on the last page)
+        """
+        unknown = set(fields or []) - set(self._fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {sorted(unknown)}")
+
+        id_sets = []
+        if problem_type is not None:
+            id_sets.append(self._by_type.get(problem_type, set()))
+        if difficulty is not None:
+            id_sets.append(self._by_difficulty.get(difficulty, set()))
+        for token in tokenize(text or ''):
+            id_sets.append(self._inverted.get(token, set()))
+
+        if id_sets:
+            # Intersect starting from the smallest set
+            id_sets.sort(key=len)
+            matches = sorted(set(id_sets[0]).intersection(*id_sets[1:]))
+        else:
+            matches = self._ids
+
+        start = bisect_right(matches, cursor) if cursor is not None else 0
+        page_ids = matches[start:start + limit]
+        next_cursor = page_ids[-1] if start + limit < len(matches) else None
+
+        page = [self._by_id[i] for i in page_ids]
+        if fields:
+            keep = set(fields) | {'id'}
+            page = [{k: v for k, v in p.items() if k in keep} for p in page]
+        return {'problems': page, 'total': len(matches), 'next_cursor': next_cursor}
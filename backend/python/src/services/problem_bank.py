@@ -0,0 +1,191 @@
+import json
+import mmap
+import os
+import stat
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no POSIX record locks, so the shared bank is unavailable
+    fcntl = None
+
+MAGIC = b'QFBANK04'  # bumped whenever the stored problem format changes
+FILE_HEADER = struct.Struct('<8sIII')   # magic, n_banks, capacity, slot_bytes
+BANK_HEADER = struct.Struct('<QQ')      # head, count
+SLOT_LENGTH = struct.Struct('<I')
+HEADER_BYTES = 64
+BANK_HEADER_BYTES = 64
+# Inside the application's own data directory rather than a shared, world-writable temp directory
+DEFAULT_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'problem_bank.dat'))
+# Byte ranges of the file header used as cross-process locks
+INIT_LOCK = (0, 32)
+REFILL_LOCK = (32, 32)
+
+BankKey = Tuple[str, Optional[str]]
+
+class ProblemBank:
+    """A pool of pre-generated problems shared by every worker process.
+
+    Problems are stored as JSON in fixed-size slots of a memory-mapped file,
+    one ring buffer per (problem_type, difficulty). Each ring buffer header
+    is guarded by a POSIX byte-range lock, so push and pop are O(1) and safe
+    across uvicorn workers, and a process-local mutex covers threads within
+    one process. pop never blocks on either lock, since it is called from
+    the event loop: a contended bank counts as a miss, like an empty one.
+
+    The file is opened without following symlinks and must be a regular
+    file owned by the current user, so another account cannot plant or
+    read the bank.
+    """
+
+    def __init__(self, path: str, keys: List[BankKey], capacity: int = 256, slot_bytes: int = 8192,
+                 low_water: int = 32, high_water: int = 128):
+        if fcntl is None:
+            raise RuntimeError("ProblemBank requires fcntl (POSIX)")
+        if not 0 <= low_water < high_water <= capacity:
+            raise ValueError("Require 0 <= low_water < high_water <= capacity")
+        self.path = path
+        self.keys = list(keys)
+        self._index = {key: i for i, key in enumerate(self.keys)}
+        self.capacity = capacity
+        self.slot_bytes = slot_bytes
+        self.low_water = low_water
+        self.high_water = high_water
+        self._mutex = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._data_offset = HEADER_BYTES + len(self.keys) * BANK_HEADER_BYTES
+        size = self._data_offset + len(self.keys) * capacity * slot_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        info = os.fstat(self._fd)
+        if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid():
+            os.close(self._fd)
+            raise PermissionError(f"Problem bank {path} must be a regular file owned by the current user")
+        self._lock(*INIT_LOCK)
+        try:
+            # First process to arrive (or one with a different layout) initializes the file
+            header = os.pread(self._fd, FILE_HEADER.size, 0)
+            expected = FILE_HEADER.pack(MAGIC, len(self.keys), capacity, slot_bytes)
+            if header != expected or os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, expected, 0)
+            self._map = mmap.mmap(self._fd, size)
+        finally:
+            self._unlock(*INIT_LOCK)
+
+    def _lock(self, start: int, length: int, blocking: bool = True) -> bool:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.lockf(self._fd, flags, length, start)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock(self, start: int, length: int):
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+    def _bank_header(self, i: int) -> int:
+        return HEADER_BYTES + i * BANK_HEADER_BYTES
+
+    def _slot(self, i: int, slot: int) -> int:
+        return self._data_offset + (i * self.capacity + slot) * self.slot_bytes
+
+    def push_many(self, key: BankKey, problems: List[Dict[str, Any]]) -> int:
+        """Append problems to a bank; returns how many fit."""
+        i = self._index[key]
+        payloads = [json.dumps(p, separators=(',', ':')).encode() for p in problems]
+        payloads = [p for p in payloads if SLOT_LENGTH.size + len(p) <= self.slot_bytes]
+        offset = self._bank_header(i)
+        stored = 0
+        with self._mutex:
+            self._lock(offset, BANK_HEADER_BYTES)
+            try:
+                head, count = BANK_HEADER.unpack_from(self._map, offset)
+                for payload in payloads:
+                    if count >= self.capacity:
+                        break
+                    pos = self._slot(i, (head + count) % self.capacity)
+                    SLOT_LENGTH.pack_into(self._map, pos, len(payload))
+                    self._map[pos + SLOT_LENGTH.size:pos + SLOT_LENGTH.size + len(payload)] = payload
+                    count += 1
+                    stored += 1
+                BANK_HEADER.pack_into(self._map, offset, head, count)
+            finally:
+                self._unlock(offset, BANK_HEADER_BYTES)
+        return stored
+
+    def pop(self, problem_type: str, difficulty: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Take one problem from the (problem_type, difficulty) bank, or None if it has none available.
+
+        Callers resolve an unspecified type or difficulty first, as on-demand
+        generation would, so serving from the bank does not change the mix
+        of problems. An empty or locked bank counts as a miss.
+        """
+        i = self._index.get((problem_type, difficulty))
+        if i is None:
+            return None
+        payload = self._pop_bank(i)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(payload)
+
+    def _pop_bank(self, i: int) -> Optional[bytes]:
+        offset = self._bank_header(i)
+        if not self._mutex.acquire(blocking=False):
+            return None
+        try:
+            if not self._lock(offset, BANK_HEADER_BYTES, blocking=False):
+                return None
+            try:
+                head, count = BANK_HEADER.unpack_from(self._map, offset)
+                if count == 0:
+                    return None
+                pos = self._slot(i, head)
+                (length,) = SLOT_LENGTH.unpack_from(self._map, pos)
+                payload = self._map[pos + SLOT_LENGTH.size:pos + SLOT_LENGTH.size + length]
+                BANK_HEADER.pack_into(self._map, offset, (head + 1) % self.capacity, count - 1)
+                return payload
+            finally:
+                self._unlock(offset, BANK_HEADER_BYTES)
+        finally:
+            self._mutex.release()
+
+    def counts(self) -> Dict[BankKey, int]:
+        """Current number of stored problems per bank (a lock-free snapshot)."""
+        return {key: BANK_HEADER.unpack_from(self._map, self._bank_header(i))[1] for key, i in self._index.items()}
+
+    def refill_needed(self) -> Dict[BankKey, int]:
+        """Banks below the low-water mark, with how many problems bring them to high water."""
+        return {key: self.high_water - n for key, n in self.counts().items() if n < self.low_water}
+
+    def try_acquire_refill(self) -> bool:
+        """Become the single refilling process for this round; False if another worker is."""
+        with self._mutex:
+            return self._lock(*REFILL_LOCK, blocking=False)
+
+    def release_refill(self):
+        with self._mutex:
+            self._unlock(*REFILL_LOCK)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'capacity': self.capacity,
+            'low_water': self.low_water,
+            'high_water': self.high_water,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'counts': {f"{t}/{d}" if d else t: n for (t, d), n in self.counts().items()}
+        }
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
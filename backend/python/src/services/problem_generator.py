@@ -1,10 +1,48 @@
 import numpy as np
-from typing import Dict, Any, List
-import random
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
+import secrets
+import os
+
+from services.practice_catalogue import PracticeCatalogue
+from services.ingestion import load_store, DEFAULT_STORE_PATH
+from services.question_templates import question_fields
+
+# Seeds are kept below 2**53 so they survive a round trip through JavaScript numbers
+MAX_SEED = 2**53
+
+def problem_id(problem_type: str, difficulty: Optional[str], seed: int) -> str:
+    """Stable id of a seeded problem: type.difficulty.seed (type.seed for mental math)."""
+    if difficulty is None:
+        return f"{problem_type}.{seed}"
+    return f"{problem_type}.{difficulty}.{seed}"
+
+def parse_problem_id(value: str, problem_types: List[str],
+                     difficulty_levels: List[str]) -> Tuple[str, Optional[str], int]:
+    """Split a problem id back into (problem_type, difficulty, seed).
+
+    Raises:
+    ValueError: If the id is malformed or names an unknown type or difficulty
+    """
+    parts = value.split('.')
+    if len(parts) == 2:
+        problem_type, difficulty, seed = parts[0], None, parts[1]
+    elif len(parts) == 3:
+        problem_type, difficulty, seed = parts
+    else:
+        raise ValueError(f"Malformed problem id: {value}")
+    if problem_type not in problem_types:
+        raise ValueError(f"Unknown problem type: {problem_type}")
+    if (difficulty is None) != (problem_type == 'mental_math'):
+        raise ValueError(f"Malformed problem id: {value}")
+    if difficulty is not None and difficulty not in difficulty_levels:
+        raise ValueError(f"Unknown difficulty: {difficulty}")
+    if not seed.isdigit() or not 0 <= int(seed) < MAX_SEED:
+        raise ValueError(f"seed must be in [0, {MAX_SEED})")
+    return problem_type, difficulty, int(seed)
 
 class ProblemGenerator:
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024):
         self.difficulty_levels = ['easy', 'medium', 'hard']
         self.problem_types = [
             'option_pricing',
@@ -15,201 +53,40 @@ class ProblemGenerator:
             'mental_math'
         ]
         self.practice_problems = self._initialize_practice_problems()
+        self.practice_catalogue = PracticeCatalogue(self.practice_problems)
+        # Seeded problems are pure functions of (type, difficulty, seed), so repeats can be cached
+        self._generate_seeded_cached = lru_cache(maxsize=cache_size)(self._generate_seeded)
+
+    def __getstate__(self):
+        # lru_cache wrappers cannot be pickled; process-pool workers get a fresh cache
+        state = self.__dict__.copy()
+        state.pop('_generate_seeded_cached', None)
+        state['_cache_size'] = self._generate_seeded_cached.cache_parameters()['maxsize']
+        return state
+
+    def __setstate__(self, state):
+        cache_size = state.pop('_cache_size')
+        self.__dict__.update(state)
+        self._generate_seeded_cached = lru_cache(maxsize=cache_size)(self._generate_seeded)
 
     def _initialize_practice_problems(self) -> List[Dict[str, Any]]:
-        """Initialize the list of practice problems with solutions."""
-        return [
-            {
-                "id": 1,
-                "title": "Tennis Game Probability",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "For a 3 sets tennis game, would you bet on it finishing in 2 sets or 3 sets?",
-                "solution": "Two sets - Let p=prob team 1 wins and q=prob team 2 wins. p^2 + q^2 = probability finish in two sets. 2*p*q = probability finish in three sets. p^2 + q^2 always >= 2*p*q, so the answer is two sets.",
-                "description": "A probability problem involving game theory and tennis match outcomes"
-            },
-            {
-                "id": 2,
-                "title": "Random Dots on Square",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "I have a square, and place three dots along the 4 edges at random. What is the probability that the dots lie on distinct edges?",
-                "solution": "3/8 - Given the edge the first dot is on, the probability the other two dots are on distinct edges is (3/4)*(2/4)",
-                "description": "A geometric probability problem involving random placement"
-            },
-            {
-                "id": 3,
-                "title": "Card Deck Choice",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "Two decks of cards. One deck has 52 cards, the other has 104. You pick two cards separately from a same pack. If both of two cards are red, you win. Which pack will you choose?",
-                "solution": "104 card pack - (52/104)*(51/103) > (26/52)*(25/51), or 51/103 > 25/51",
-                "description": "A probability problem involving card selection"
-            },
-            {
-                "id": 4,
-                "title": "Mental Math",
-                "type": "probability",
-                "difficulty": "easy",
-                "question": "What is 39*41?",
-                "solution": "1599 - 39*41 = (40-1)*(40+1) = 40*40 - 1 = 1599",
-                "description": "A mental math problem using algebraic patterns"
-            },
-            {
-                "id": 5,
-                "title": "Salary Average Problem",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "A group of people wants to determine their average salary on the condition that no individual would be able to find out anyone else's salary. Can they accomplish this, and, if so, how?",
-                "solution": "Yes, it's possible - The first person thinks of a random number, say X. This person adds this number to her salary. The rest of the group simply adds their salary to the initial number. Then, the first person subtracts the random number X and divides the total salary sum by the size of the group to obtain the average.",
-                "description": "A problem solving question involving privacy and mathematics"
-            },
-            {
-                "id": 6,
-                "title": "Digit Count Problem",
-                "type": "probability",
-                "difficulty": "hard",
-                "question": "How many digits are in 99 to the 99th power?",
-                "solution": "198 - 99^99 = (100)^(99) * (.99)^99 = (10)^(198) * (.99)^99. You can convince yourself 10^198 has 199 digits, and 0.99^.99 approaches 1/e. Thus, (10)^(198) * (.99)^99 has 198 digits.",
-                "description": "A mathematical reasoning problem involving exponents"
-            },
-            {
-                "id": 7,
-                "title": "Airplane Seating Probability",
-                "type": "probability",
-                "difficulty": "hard",
-                "question": "A line of 100 passengers is waiting to board a plane. They each hold a ticket to one of the 100 seats on that flight. Unfortunately, the first person in line is crazy, and will ignore the seat number on their ticket, picking a random seat to occupy. All of the other passengers are quite normal, and will go to their proper seat unless it is already occupied. If it is occupied, they will then find a free seat to sit in, at random. What is the probability that the last (100th) person to board the plane will sit in their proper seat (#100)?",
-                "solution": "0.5 - The fate of the last passenger is determined the second either the first or last seat on the plane is taken. This statement is true because the last person will either get the first seat or the last seat. All other seats will necessarily be taken by the time the last passenger gets to pick his/her seat. Since at each choice step, the first or last seat has an equal probability of being taken, the last person will get either the first or last with equal probability: 0.5.",
-                "description": "A complex probability problem involving sequential decisions"
-            },
-            {
-                "id": 8,
-                "title": "Sum of Numbers",
-                "type": "probability",
-                "difficulty": "easy",
-                "question": "What is the sum of the numbers one to 100?",
-                "solution": "5050 - Sum of numbers from 1,2....n = n*(n+1)/2. You can also think about this problem by pairing off numbers - 1 and 100, 2 and 99, 3 and 98, 4 and 97, etc. We have 50 of these pairs, and each pair sums up to 101, so the final sum = 50*101 = 5050.",
-                "description": "A mathematical problem involving series and patterns"
-            },
-            {
-                "id": 9,
-                "title": "Water Jug Problem",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "You have a 3 gallon jug and 5 gallon jug, how do you measure out exactly 4 gallons? Is this possible?",
-                "solution": "Yes, it's possible - Fill up the 3 gallon jug. Then, pour the liquid into the 5 gallon jug. Fill the 3 gallon jug again, and then fill the 5 gallon jug until it is full. We now have 1 gallon remaining in the 3 gallon jug. We empty the five gallon jug and pour the remaining 1 gallon into our 5 gallon jug. Finally, we fill the 3 gallon jug and add this to the 5 gallon jug (which already had 1 gallon). We are left with 4 gallons in the 5 gallon jug.",
-                "description": "A problem solving question involving liquid measurements"
-            },
-            {
-                "id": 10,
-                "title": "Coin Flip Probability",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "You have 17 coins and I have 16 coins, we flip all coins at the same time. If you have more heads then you win, if we have the same number of heads or if you have less then I win. What's your probability of winning?",
-                "solution": "0.5 - Use recursion - The initial 16 flips have the same probability of everything. Thus, the game completely depends on if the last coin flip is tails or head (50/50 chance of H vs. T).",
-                "description": "A probability problem involving coin flips"
-            },
-            {
-                "id": 11,
-                "title": "Card Color Probability",
-                "type": "probability",
-                "difficulty": "easy",
-                "question": "What is the probability you draw two cards of the same color from a standard 52-card deck? You are drawing without replacement.",
-                "solution": "25/51 - You either draw a black or a red card first. Then, there are 51 cards left in the deck and 25 of these cards have the same color. Thus, the probability is 25/51.",
-                "description": "A probability problem involving card drawing"
-            },
-            {
-                "id": 12,
-                "title": "Light Bulb Problem",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "You're in a room with three light switches, each of which controls one of three light bulbs in the next room. You need to determine which switch controls which bulb. All lights are off to begin, and you can't see into one room from the other. You can inspect the other room only once. How can you find out which switches are connected to which bulbs? Is this possible?",
-                "solution": "Yes, it's possible - Leave switch 1 off. Then, turn switch 2 on for ten minutes. After the ten minutes, turn it off and quickly turn on switch 3. Now, go into the room. The currently lit up bulb connects to switch 3. The bulb that off but still warm is from switch 2, and the remaining bulb is from switch 1.",
-                "description": "A logical reasoning problem"
-            },
-            {
-                "id": 13,
-                "title": "World Series Probability",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "In world series, what are the odds it goes 7 games if each team equal chance of winning?",
-                "solution": "20/64 - Out of the first three games, each team needs to win three. Thus, (6 choose 3)*(.5^6) = 20/64, as each team has a 1/2 probability of winning each game.",
-                "description": "A probability problem involving sports"
-            },
-            {
-                "id": 14,
-                "title": "Even Heads Probability",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "Given 100 coin flips, what is the probability that you get an even number of heads?",
-                "solution": "1/2 - Whether there is an odd or even number of heads is ultimately determined by the final flip (50/50 chance of being heads vs. tails), for any number of flips.",
-                "description": "A probability problem involving coin flips"
-            },
-            {
-                "id": 15,
-                "title": "Ball Ordering Problem",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "There are 5 balls, 3 red, and 2 black. What is the probability that a random ordering of the 5 balls does not have the 2 black balls next to each other?",
-                "solution": "0.6 - Because of repeats of black/red balls, there are 10 combinations of red/black balls: (5 choose 2) or (5 choose 3) spots to put the black or red balls, respectively. There are 4 places that 2 black balls can be next to each other, so the other 6 combinations do NOT have two black balls next to each other.",
-                "description": "A probability problem involving ball arrangements"
-            },
-            {
-                "id": 16,
-                "title": "Multiple of 15",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "What is the least multiple of 15 whose digits consist only of 1's and 0's?",
-                "solution": "1110 - The last digit must be zero (30, 45, 60, 75, etc.). Multiples of 15 never end in 1. Then, starting checking numbers. 10, 100, 110, 1000, 1100, 1110. You will quickly arrive at the answer if you are good with your mental math.",
-                "description": "A number theory problem"
-            },
-            {
-                "id": 17,
-                "title": "Prime Number Check",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "Is 1027 a prime number?",
-                "solution": "No - 1027 = 1000 + 27 = 10^3 + 3^3. We know a^3 + b^3 can be factored, so 1027 is NOT prime.",
-                "description": "A number theory problem"
-            },
-            {
-                "id": 18,
-                "title": "Option Volatility",
-                "type": "option_pricing",
-                "difficulty": "easy",
-                "question": "Does the price of a call option increase when volatility increases?",
-                "solution": "Yes - sometimes a rare finance question is included in these interviews; remember that both time and volatility increase the prices of both calls and puts",
-                "description": "An option pricing concept question"
-            },
-            {
-                "id": 19,
-                "title": "Ball Color Game",
-                "type": "probability",
-                "difficulty": "medium",
-                "question": "2 blue and 2 red balls, in a box, no replacing. Guess the color of the ball, you receive a dollar if you are correct. What is the dollar amount you would pay to play this game?",
-                "solution": "17/6 dollars - You'll always get the last ball right as your sampling w/o replacement. The first ball you have a 50% chance of getting right. The second ball you have a 2/3 chance of getting right.",
-                "description": "A probability problem involving expected value"
-            },
-            {
-                "id": 20,
-                "title": "Power of 2",
-                "type": "probability",
-                "difficulty": "easy",
-                "question": "What is the singles digit for 2^230?",
-                "solution": "4 - Repeating patterns -- 2,4,8,6,2 -- follow the pattern.",
-                "description": "A number theory problem involving patterns"
-            }
-        ]
+        """Load practice problems with solutions from the local store.
 
-    def generate_option_pricing_problem(self, difficulty: str) -> Dict[str, Any]:
+        The store is a JSONL file maintained by services.ingestion; set
+        PRACTICE_PROBLEMS_PATH to read a different one.
+        """
+        return load_store(os.getenv("PRACTICE_PROBLEMS_PATH", DEFAULT_STORE_PATH))
+
+    def generate_option_pricing_problem(self, difficulty: str, rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
         """Generate an option pricing problem."""
+        rng = rng if rng is not None else np.random.default_rng()
         if difficulty == 'easy':
             # Basic European call option
-            S = round(random.uniform(80, 120), 2)
-            K = round(S * random.uniform(0.9, 1.1), 2)
-            T = round(random.uniform(0.25, 1.0), 2)
-            r = round(random.uniform(0.01, 0.05), 3)
-            sigma = round(random.uniform(0.15, 0.30), 2)
+            S = round(rng.uniform(80, 120), 2)
+            K = round(S * rng.uniform(0.9, 1.1), 2)
+            T = round(rng.uniform(0.25, 1.0), 2)
+            r = round(rng.uniform(0.01, 0.05), 3)
+            sigma = round(rng.uniform(0.15, 0.30), 2)
             
             return {
                 'type': 'option_pricing',
@@ -221,25 +98,17 @@ class ProblemGenerator:
                     'risk_free_rate': r,
                     'volatility': sigma
                 },
-                'question': f"""
-                Calculate the Black-Scholes price for a European call option with:
-                - Current stock price: ${S}
-                - Strike price: ${K}
-                - Time to maturity: {T} years
-                - Risk-free rate: {r*100}%
-                - Volatility: {sigma*100}%
-                
-                Additionally, explain how changes in volatility would affect the option price.
-                """
+                **question_fields('option_pricing/easy', S=str(S), K=str(K), T=str(T),
+                                  r=str(r*100), sigma=str(sigma*100))
             }
         elif difficulty == 'medium':
             # American put option with dividend
-            S = round(random.uniform(50, 150), 2)
-            K = round(S * random.uniform(0.8, 1.2), 2)
-            T = round(random.uniform(0.5, 2.0), 2)
-            r = round(random.uniform(0.02, 0.06), 3)
-            sigma = round(random.uniform(0.20, 0.40), 2)
-            div_yield = round(random.uniform(0.01, 0.04), 3)
+            S = round(rng.uniform(50, 150), 2)
+            K = round(S * rng.uniform(0.8, 1.2), 2)
+            T = round(rng.uniform(0.5, 2.0), 2)
+            r = round(rng.uniform(0.02, 0.06), 3)
+            sigma = round(rng.uniform(0.20, 0.40), 2)
+            div_yield = round(rng.uniform(0.01, 0.04), 3)
             
             return {
                 'type': 'option_pricing',
@@ -252,27 +121,16 @@ class ProblemGenerator:
                     'volatility': sigma,
                     'dividend_yield': div_yield
                 },
-                'question': f"""
-                Price an American put option with dividend yield:
-                - Current stock price: ${S}
-                - Strike price: ${K}
-                - Time to maturity: {T} years
-                - Risk-free rate: {r*100}%
-                - Volatility: {sigma*100}%
-                - Dividend yield: {div_yield*100}%
-                
-                1. Calculate the option price
-                2. Explain early exercise considerations
-                3. Compare with European put option price
-                """
+                **question_fields('option_pricing/medium', S=str(S), K=str(K), T=str(T),
+                                  r=str(r*100), sigma=str(sigma*100), q=str(div_yield*100))
             }
         else:  # hard
             # Exotic option
-            S = round(random.uniform(40, 160), 2)
-            K = round(S * random.uniform(0.7, 1.3), 2)
-            T = round(random.uniform(1.0, 3.0), 2)
-            r = round(random.uniform(0.01, 0.08), 3)
-            sigma = round(random.uniform(0.25, 0.50), 2)
+            S = round(rng.uniform(40, 160), 2)
+            K = round(S * rng.uniform(0.7, 1.3), 2)
+            T = round(rng.uniform(1.0, 3.0), 2)
+            r = round(rng.uniform(0.01, 0.08), 3)
+            sigma = round(rng.uniform(0.25, 0.50), 2)
             barrier = round(K * 1.2, 2)
             
             return {
@@ -286,35 +144,20 @@ class ProblemGenerator:
                     'risk_free_rate': r,
                     'volatility': sigma
                 },
-                'question': f"""
-                Price a up-and-out barrier call option:
-                - Current stock price: ${S}
-                - Strike price: ${K}
-                - Barrier level: ${barrier}
-                - Time to maturity: {T} years
-                - Risk-free rate: {r*100}%
-                - Volatility: {sigma*100}%
-                
-                1. Calculate the option price
-                2. Explain the impact of the barrier on delta hedging
-                3. Compare with vanilla call option price
-                4. Discuss volatility smile implications
-                """
+                **question_fields('option_pricing/hard', S=str(S), K=str(K), barrier=str(barrier),
+                                  T=str(T), r=str(r*100), sigma=str(sigma*100))
             }
 
-    def generate_portfolio_problem(self, difficulty: str) -> Dict[str, Any]:
+    def generate_portfolio_problem(self, difficulty: str, rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
         """Generate a portfolio optimization problem."""
+        rng = rng if rng is not None else np.random.default_rng()
         if difficulty == 'easy':
             n_assets = 3
-            returns = np.random.normal(0.10, 0.20, n_assets)
-            volatilities = np.random.uniform(0.15, 0.35, n_assets)
-            correlations = np.random.uniform(-0.2, 0.6, (n_assets, n_assets))
+            returns = rng.normal(0.10, 0.20, n_assets)
+            volatilities = rng.uniform(0.15, 0.35, n_assets)
+            correlations = rng.uniform(-0.2, 0.6, (n_assets, n_assets))
             np.fill_diagonal(correlations, 1)
             
-            assets_info = []
-            for i in range(n_assets):
-                assets_info.append(f"Asset {i+1}: Return = {returns[i]:.2%}, Volatility = {volatilities[i]:.2%}")
-            
             return {
                 'type': 'portfolio_optimization',
                 'difficulty': difficulty,
@@ -323,21 +166,15 @@ class ProblemGenerator:
                     'volatilities': volatilities.tolist(),
                     'correlations': correlations.tolist()
                 },
-                'question': f"""
-                Consider a portfolio with {n_assets} assets having the following annual returns and volatilities:
-                
-                {chr(10).join(assets_info)}
-                
-                1. Find the optimal portfolio weights that maximize the Sharpe ratio
-                2. Calculate the portfolio's expected return and volatility
-                3. Explain the impact of correlations on diversification
-                """
+                **question_fields('portfolio_optimization/easy', n_assets=str(n_assets), assets=[
+                    [str(i + 1), f"{returns[i]:.2%}", f"{volatilities[i]:.2%}"] for i in range(n_assets)
+                ])
             }
         elif difficulty == 'medium':
             n_assets = 5
-            returns = np.random.normal(0.12, 0.25, n_assets)
-            volatilities = np.random.uniform(0.20, 0.40, n_assets)
-            correlations = np.random.uniform(-0.3, 0.7, (n_assets, n_assets))
+            returns = rng.normal(0.12, 0.25, n_assets)
+            volatilities = rng.uniform(0.20, 0.40, n_assets)
+            correlations = rng.uniform(-0.3, 0.7, (n_assets, n_assets))
             np.fill_diagonal(correlations, 1)
             constraints = [
                 "No single asset can exceed 30% of the portfolio",
@@ -354,28 +191,17 @@ class ProblemGenerator:
                     'correlations': correlations.tolist(),
                     'constraints': constraints
                 },
-                'question': f"""
-                Optimize a portfolio with {n_assets} assets subject to constraints:
-                
-                Asset Information:
-                {chr(10).join([f"Asset {i+1}: μ={returns[i]:.2%}, σ={volatilities[i]:.2%}" for i in range(n_assets)])}
-                
-                Constraints:
-                {chr(10).join([f"- {c}" for c in constraints])}
-                
-                1. Find the optimal portfolio weights
-                2. Calculate the efficient frontier
-                3. Analyze the impact of constraints
-                4. Discuss rebalancing considerations
-                """
+                **question_fields('portfolio_optimization/medium', n_assets=str(n_assets), assets=[
+                    [str(i + 1), f"{returns[i]:.2%}", f"{volatilities[i]:.2%}"] for i in range(n_assets)
+                ], constraints=[[c] for c in constraints])
             }
         else:  # hard
             n_assets = 7
-            returns = np.random.normal(0.15, 0.30, n_assets)
-            volatilities = np.random.uniform(0.25, 0.45, n_assets)
-            correlations = np.random.uniform(-0.4, 0.8, (n_assets, n_assets))
+            returns = rng.normal(0.15, 0.30, n_assets)
+            volatilities = rng.uniform(0.25, 0.45, n_assets)
+            correlations = rng.uniform(-0.4, 0.8, (n_assets, n_assets))
             np.fill_diagonal(correlations, 1)
-            transaction_costs = np.random.uniform(0.001, 0.003, n_assets)
+            transaction_costs = rng.uniform(0.001, 0.003, n_assets)
             
             return {
                 'type': 'portfolio_optimization',
@@ -386,147 +212,122 @@ class ProblemGenerator:
                     'correlations': correlations.tolist(),
                     'transaction_costs': transaction_costs.tolist()
                 },
-                'question': f"""
-                Dynamic portfolio optimization problem with transaction costs:
-                
-                Asset Information:
-                {chr(10).join([f"Asset {i+1}: μ={returns[i]:.2%}, σ={volatilities[i]:.2%}, TC={transaction_costs[i]:.3%}" for i in range(n_assets)])}
-                
-                1. Develop a dynamic rebalancing strategy considering transaction costs
-                2. Calculate the multi-period efficient frontier
-                3. Implement a risk parity approach
-                4. Compare with static Markowitz optimization
-                5. Analyze the impact of estimation error
-                6. Discuss practical implementation challenges
-                """
+                **question_fields('portfolio_optimization/hard', assets=[
+                    [str(i + 1), f"{returns[i]:.2%}", f"{volatilities[i]:.2%}", f"{transaction_costs[i]:.3%}"]
+                    for i in range(n_assets)
+                ])
             }
 
-    def generate_probability_problem(self, difficulty: str) -> Dict[str, Any]:
+    def generate_probability_problem(self, difficulty: str, rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
         """Generate a probability/statistics problem."""
+        rng = rng if rng is not None else np.random.default_rng()
         if difficulty == 'easy':
             return {
                 'type': 'probability',
                 'difficulty': difficulty,
-                'question': """
-                A trader observes that a stock's daily returns follow a normal distribution with 
-                mean 0.1% and standard deviation 1.5%. 
-                
-                1. What is the probability that tomorrow's return will be positive?
-                2. What is the probability of observing a return greater than 2%?
-                3. Calculate the 95% confidence interval for the daily returns
-                """
+                **question_fields('probability/easy')
             }
         elif difficulty == 'medium':
+            # Daily VaR/ES of a normally distributed strategy, with a Student-t variant
+            mu = round(rng.uniform(0.0, 0.001), 4)
+            sigma = round(rng.uniform(0.008, 0.025), 3)
+            notional = int(rng.choice([500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000]))
+            df = int(rng.integers(3, 9))
+            # Loss thresholds about two standard deviations out, on a round $5,000 grid
+            daily_std = sigma * notional
+            loss_threshold = max(5_000, int(round(rng.uniform(1.8, 2.6) * daily_std / 5_000)) * 5_000)
+            days_threshold = max(5_000, int(round(rng.uniform(1.4, 2.0) * daily_std / 5_000)) * 5_000)
+            confidence_levels = [0.95, 0.99]
+            days = 252
+
             return {
                 'type': 'probability',
                 'difficulty': difficulty,
-                'question': """
-                A trading strategy generates daily returns that are normally distributed with 
-                mean 0.05% and standard deviation 1.2%. If you implement this strategy with 
-                $1 million:
-                
-                1. What is the 95% Value at Risk (VaR)?
-                2. What is the Expected Shortfall (ES)?
-                3. What is the probability of losing more than $25,000 in a single day?
-                4. Calculate the expected number of days in a year where losses exceed $20,000
-                5. How would your calculations change if returns were Student's t-distributed?
-                """
+                'parameters': {
+                    'mean_return': mu,
+                    'return_volatility': sigma,
+                    'notional': notional,
+                    'confidence_levels': confidence_levels,
+                    'loss_threshold': loss_threshold,
+                    'days_threshold': days_threshold,
+                    'trading_days': days,
+                    'degrees_of_freedom': df
+                },
+                **question_fields('probability/medium', mu=f"{mu * 100:.2f}", sigma=f"{sigma * 100:.1f}",
+                                  notional=f"{notional:,}", level_low=f"{confidence_levels[0] * 100:g}",
+                                  level_high=f"{confidence_levels[1] * 100:g}",
+                                  loss_threshold=f"{loss_threshold:,}", days=str(days),
+                                  days_threshold=f"{days_threshold:,}", df=str(df))
             }
         else:  # hard
+            # Tail risk of a compound Poisson strategy with a two-regime trade P&L
+            trades_per_hour = int(rng.integers(5, 21)) * 10
+            hours = float(rng.choice([6.5, 8.0]))
+            bad_share = round(rng.uniform(0.1, 0.3), 2)
+            good_mean = round(rng.uniform(0.3, 1.0), 2)
+            good_std = round(rng.uniform(0.5, 1.5), 2)
+            bad_mean = -round(rng.uniform(1.0, 3.0), 2)
+            bad_std = round(rng.uniform(1.0, 3.0), 2)
+            level = 0.99
+
             return {
                 'type': 'probability',
                 'difficulty': difficulty,
-                'question': """
-                Consider a high-frequency trading strategy with the following characteristics:
-                - Trade arrival follows a Poisson process with mean 100 trades per hour
-                - Profit per trade follows a mixture of two normal distributions:
-                  * 80% of trades: N(0.5, 1)
-                  * 20% of trades: N(-2, 2)
-                
-                1. Calculate the expected daily profit
-                2. What is the probability of a losing day?
-                3. Derive the distribution of the maximum drawdown
-                4. How many trades do you need to be 99% confident about the strategy's profitability?
-                5. If you observe 3 consecutive losing days, what is the probability that the strategy is broken?
-                """
+                'parameters': {
+                    'trades_per_hour': trades_per_hour,
+                    'hours_per_day': hours,
+                    'mixture_weights': [round(1 - bad_share, 2), bad_share],
+                    'trade_means': [good_mean, bad_mean],
+                    'trade_stds': [good_std, bad_std],
+                    'confidence_level': level
+                },
+                **question_fields('probability/hard', trades_per_hour=str(trades_per_hour), hours=f"{hours:g}",
+                                  good_share=f"{(1 - bad_share) * 100:.0f}", good_mean=f"{good_mean:.2f}",
+                                  good_std=f"{good_std:.2f}", bad_share=f"{bad_share * 100:.0f}",
+                                  bad_loss=f"{-bad_mean:.2f}", bad_std=f"{bad_std:.2f}", level=f"{level * 100:g}")
             }
 
-    def generate_stochastic_process_problem(self, difficulty: str) -> Dict[str, Any]:
+    def generate_stochastic_process_problem(self, difficulty: str, rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
         """Generate a stochastic process problem."""
         if difficulty == 'easy':
             return {
                 'type': 'stochastic_processes',
                 'difficulty': difficulty,
-                'question': """
-                Consider a standard Brownian motion W(t) and the process X(t) = W(t) - t/2.
-                
-                1. Show that X(t) is a martingale
-                2. Calculate E[X(t)] and Var[X(t)]
-                3. What is the distribution of X(t) at any fixed time t?
-                4. Explain why this process has independent increments
-                """
+                # X(t) = W(t) - t/2 is Brownian motion with drift -1/2
+                'simulation': {'process': 'brownian', 'mu': -0.5, 'sigma': 1.0, 'x0': 0.0, 'T': 1.0},
+                **question_fields('stochastic_processes/easy')
             }
         elif difficulty == 'medium':
             return {
                 'type': 'stochastic_processes',
                 'difficulty': difficulty,
-                'question': """
-                Consider the following questions about stochastic processes:
-
-                1. Define and compare:
-                   - Brownian Motion
-                   - Geometric Brownian Motion
-                   - Ornstein-Uhlenbeck Process
-                
-                2. For a standard Brownian motion W(t):
-                   - What is its PDF at time t?
-                   - What is its CDF?
-                   - What are its key properties?
-                
-                3. For a process X(t) = exp(W(t) - t/2):
-                   - Show that this is a martingale
-                   - Calculate E[X(t)]
-                   - Is this process stationary?
-                """
+                # X(t) = exp(W(t) - t/2) is GBM with zero drift, unit volatility and X(0) = 1
+                'simulation': {'process': 'gbm', 'mu': 0.0, 'sigma': 1.0, 'x0': 1.0, 'T': 1.0},
+                **question_fields('stochastic_processes/medium')
             }
         else:  # hard
             return {
                 'type': 'stochastic_processes',
                 'difficulty': difficulty,
-                'question': """
-                Consider a stock price following Geometric Brownian Motion:
-                dS(t) = μS(t)dt + σS(t)dW(t)
-
-                1. Derive the solution for S(t) using Itô's lemma
-                2. Show that log(S(t)) follows a normal distribution
-                3. Calculate:
-                   - E[S(t)]
-                   - Var[S(t)]
-                   - The probability that S(t) > S(0)
-                
-                4. Now consider a more complex process:
-                   X(t) = W(t)² - t
-                   where W(t) is a standard Brownian motion
-                   
-                   a) Is this a martingale? Prove your answer
-                   b) Calculate E[X(t)] and Var[X(t)]
-                   c) Find the quadratic variation of X(t)
-                """
+                # Illustrative parameters for the symbolic GBM in the question
+                'simulation': {'process': 'gbm', 'mu': 0.08, 'sigma': 0.2, 'x0': 100.0, 'T': 1.0},
+                **question_fields('stochastic_processes/hard')
             }
 
-    def generate_mental_math_problem(self) -> Dict[str, Any]:
+    def generate_mental_math_problem(self, rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
         """Generate a mental math problem with a single operation."""
-        num1 = random.randint(0, 100)
-        num2 = random.randint(0, 100)
+        rng = rng if rng is not None else np.random.default_rng()
+        num1 = int(rng.integers(0, 101))
+        num2 = int(rng.integers(0, 101))
         operations = ['+', '-', '*', '/']
-        operation = random.choice(operations)
+        operation = operations[rng.integers(0, 4)]
         
         # For division, ensure we have clean division (no decimals)
         if operation == '/':
             # Generate a divisor between 1 and 20 for manageable division
-            num2 = random.randint(1, 20)
+            num2 = int(rng.integers(1, 21))
             # Generate num1 as a multiple of num2
-            multiplier = random.randint(0, 5)
+            multiplier = int(rng.integers(0, 6))
             num1 = num2 * multiplier
         
         question = f"{num1} {operation} {num2}"
@@ -549,30 +350,113 @@ class ProblemGenerator:
             'explanation': f"The answer to {question} is {answer}"
         }
 
-    def generate_problem(self, problem_type: str = None, difficulty: str = None) -> Dict[str, Any]:
-        """Generate a random problem based on type and difficulty."""
+    def generate_mental_math_batch(self, n: int = 100, rng: Optional[np.random.Generator] = None) -> List[Dict[str, Any]]:
+        """Generate a batch of mental math problems with vectorized draws.
+
+        Uses the same operand ranges and clean-division rule as
+        generate_mental_math_problem, but draws all operands and operators
+        for the batch at once so a full session can be served in one call.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        operations = np.array(['+', '-', '*', '/'])
+        ops = rng.integers(0, 4, n)
+        num1 = rng.integers(0, 101, n)
+        num2 = rng.integers(0, 101, n)
+
+        # For division, ensure we have clean division (no decimals)
+        is_div = ops == 3
+        divisors = rng.integers(1, 21, n)
+        multipliers = rng.integers(0, 6, n)
+        num2 = np.where(is_div, divisors, num2)
+        num1 = np.where(is_div, divisors * multipliers, num1)
+
+        answers = np.select(
+            [ops == 0, ops == 1, ops == 2],
+            [num1 + num2, num1 - num2, num1 * num2],
+            default=multipliers
+        )
+
+        problems = []
+        for a, op, b, answer in zip(num1.tolist(), operations[ops].tolist(), num2.tolist(), answers.tolist()):
+            question = f"{a} {op} {b}"
+            problems.append({
+                'type': 'mental_math',
+                'question': question,
+                'answer': answer,
+                'time_limit': 120,
+                'explanation': f"The answer to {question} is {answer}"
+            })
+        return problems
+
+    def _resolve(self, problem_type: Optional[str], difficulty: Optional[str], seed: int):
+        """Fill in an unspecified type/difficulty from a selection stream derived from seed."""
+        selection_rng = np.random.default_rng([seed, 0])
         if problem_type is None:
-            problem_type = random.choice(self.problem_types)
+            problem_type = self.problem_types[selection_rng.integers(len(self.problem_types))]
         if difficulty is None and problem_type != 'mental_math':
-            difficulty = random.choice(self.difficulty_levels)
+            difficulty = self.difficulty_levels[selection_rng.integers(len(self.difficulty_levels))]
+        if problem_type == 'mental_math':
+            difficulty = None
+        return problem_type, difficulty
 
+    def resolve(self, problem_type: Optional[str] = None, difficulty: Optional[str] = None,
+                seed: Optional[int] = None):
+        """The (type, difficulty) a request generates, choosing unspecified ones as generate_problem does."""
+        return self._resolve(problem_type, difficulty, secrets.randbelow(MAX_SEED) if seed is None else seed)
+
+    def _generate_seeded(self, problem_type: str, difficulty: Optional[str], seed: int) -> Dict[str, Any]:
+        """Generate a fully specified problem from its own content stream."""
+        rng = np.random.default_rng([seed, 1])
         if problem_type == 'option_pricing':
-            return self.generate_option_pricing_problem(difficulty)
+            problem = self.generate_option_pricing_problem(difficulty, rng)
         elif problem_type == 'portfolio_optimization':
-            return self.generate_portfolio_problem(difficulty)
+            problem = self.generate_portfolio_problem(difficulty, rng)
         elif problem_type in ['probability', 'statistics']:
-            return self.generate_probability_problem(difficulty)
+            problem = self.generate_probability_problem(difficulty, rng)
         elif problem_type == 'stochastic_processes':
-            return self.generate_stochastic_process_problem(difficulty)
+            problem = self.generate_stochastic_process_problem(difficulty, rng)
         elif problem_type == 'mental_math':
-            return self.generate_mental_math_problem()
+            problem = self.generate_mental_math_problem(rng)
         else:
             raise ValueError(f"Unknown problem type: {problem_type}")
+        problem['id'] = problem_id(problem_type, difficulty, seed)
+        problem['seed'] = seed
+        return problem
+
+    def generate_problem(self, problem_type: str = None, difficulty: str = None, seed: int = None,
+                         cache: bool = True) -> Dict[str, Any]:
+        """Generate a problem based on type and difficulty.
+
+        Every problem is drawn from its own numpy Generator and carries the
+        seed it was generated from. The problem content depends only on
+        (type, difficulty, seed), so passing the seed back reproduces it
+        exactly whether or not type and difficulty were originally chosen
+        at random. Requests with an explicit seed are served from an LRU
+        cache unless cache is False (bulk generation would only evict
+        problems users are likely to reopen).
+        """
+        if seed is None:
+            seed = secrets.randbelow(MAX_SEED)
+            return self._generate_seeded(*self._resolve(problem_type, difficulty, seed), seed)
+        if not 0 <= seed < MAX_SEED:
+            raise ValueError(f"seed must be in [0, {MAX_SEED})")
+        if not cache:
+            return self._generate_seeded(*self._resolve(problem_type, difficulty, seed), seed)
+        # Shallow copy so callers adding keys cannot alter the cached entry
+        return dict(self._generate_seeded_cached(*self._resolve(problem_type, difficulty, seed), seed))
+
+    def cache_info(self):
+        """Return hit/miss statistics for the seeded problem cache."""
+        return self._generate_seeded_cached.cache_info()
 
     def get_practice_problems(self) -> List[Dict[str, Any]]:
         """Return the list of practice problems."""
         return self.practice_problems
 
+    def query_practice_problems(self, **filters) -> Dict[str, Any]:
+        """Filter and paginate practice problems; see PracticeCatalogue.query."""
+        return self.practice_catalogue.query(**filters)
+
 # Example usage:
 # generator = ProblemGenerator()
 # problem = generator.generate_problem(problem_type='option_pricing', difficulty='medium') 
@@ -0,0 +1,213 @@
+import textwrap
+from typing import Any, Dict
+
+# Question templates, keyed by template id. Placeholders use str.format
+# syntax and are filled with pre-formatted strings, so any client can render
+# them by plain substitution. A placeholder named in 'rows' takes a list of
+# rows; each row fills the row template positionally ({0}, {1}, ...) and the
+# rendered rows are joined with newlines.
+_RAW_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    'option_pricing/easy': {'text': """
+        Calculate the Black-Scholes price for a European call option with:
+        - Current stock price: ${S}
+        - Strike price: ${K}
+        - Time to maturity: {T} years
+        - Risk-free rate: {r}%
+        - Volatility: {sigma}%
+
+        Additionally, explain how changes in volatility would affect the option price.
+        """},
+    'option_pricing/medium': {'text': """
+        Price an American put option with dividend yield:
+        - Current stock price: ${S}
+        - Strike price: ${K}
+        - Time to maturity: {T} years
+        - Risk-free rate: {r}%
+        - Volatility: {sigma}%
+        - Dividend yield: {q}%
+
+        1. Calculate the option price
+        2. Explain early exercise considerations
+        3. Compare with European put option price
+        """},
+    'option_pricing/hard': {'text': """
+        Price a up-and-out barrier call option:
+        - Current stock price: ${S}
+        - Strike price: ${K}
+        - Barrier level: ${barrier}
+        - Time to maturity: {T} years
+        - Risk-free rate: {r}%
+        - Volatility: {sigma}%
+
+        1. Calculate the option price
+        2. Explain the impact of the barrier on delta hedging
+        3. Compare with vanilla call option price
+        4. Discuss volatility smile implications
+        """},
+    'portfolio_optimization/easy': {'text': """
+        Consider a portfolio with {n_assets} assets having the following annual returns and volatilities:
+
+        {assets}
+
+        1. Find the optimal portfolio weights that maximize the Sharpe ratio
+        2. Calculate the portfolio's expected return and volatility
+        3. Explain the impact of correlations on diversification
+        """, 'rows': {'assets': "Asset {0}: Return = {1}, Volatility = {2}"}},
+    'portfolio_optimization/medium': {'text': """
+        Optimize a portfolio with {n_assets} assets subject to constraints:
+
+        Asset Information:
+        {assets}
+
+        Constraints:
+        {constraints}
+
+        1. Find the optimal portfolio weights
+        2. Calculate the efficient frontier
+        3. Analyze the impact of constraints
+        4. Discuss rebalancing considerations
+        """, 'rows': {'assets': "Asset {0}: μ={1}, σ={2}", 'constraints': "- {0}"}},
+    'portfolio_optimization/hard': {'text': """
+        Dynamic portfolio optimization problem with transaction costs:
+
+        Asset Information:
+        {assets}
+
+        1. Develop a dynamic rebalancing strategy considering transaction costs
+        2. Calculate the multi-period efficient frontier
+        3. Implement a risk parity approach
+        4. Compare with static Markowitz optimization
+        5. Analyze the impact of estimation error
+        6. Discuss practical implementation challenges
+        """, 'rows': {'assets': "Asset {0}: μ={1}, σ={2}, TC={3}"}},
+    'probability/easy': {'text': """
+        A trader observes that a stock's daily returns follow a normal distribution with
+        mean 0.1% and standard deviation 1.5%.
+
+        1. What is the probability that tomorrow's return will be positive?
+        2. What is the probability of observing a return greater than 2%?
+        3. Calculate the 95% confidence interval for the daily returns
+        """},
+    'probability/medium': {'text': """
+        A trading strategy generates daily returns that are normally distributed with
+        mean {mu}% and standard deviation {sigma}%. If you implement this strategy with
+        ${notional}:
+
+        1. What are the one-day {level_low}% and {level_high}% Value at Risk (VaR)?
+        2. What is the Expected Shortfall (ES) at the same levels?
+        3. What is the probability of losing more than ${loss_threshold} in a single day?
+        4. Calculate the expected number of days in a {days}-day year where losses exceed ${days_threshold}
+        5. Recompute the VaR and ES if returns instead follow a Student's t-distribution with {df} degrees of freedom and the same standard deviation
+        """},
+    'probability/hard': {'text': """
+        Consider a high-frequency trading strategy with the following characteristics:
+        - Trades arrive as a Poisson process with mean {trades_per_hour} trades per hour, trading {hours} hours a day
+        - Profit per trade follows a mixture of two normal distributions:
+          * {good_share}% of trades: mean ${good_mean}, standard deviation ${good_std}
+          * {bad_share}% of trades: mean -${bad_loss}, standard deviation ${bad_std}
+
+        1. Calculate the expected daily profit
+        2. What is the probability of a losing day?
+        3. Calculate the one-day {level}% VaR and Expected Shortfall of the strategy
+        4. How many trades do you need to be {level}% confident about the strategy's profitability?
+        5. If you observe 3 consecutive losing days, how much evidence is that against the strategy?
+        """},
+    'stochastic_processes/easy': {'text': """
+        Consider a standard Brownian motion W(t) and the process X(t) = W(t) - t/2.
+
+        1. Show that X(t) is a martingale
+        2. Calculate E[X(t)] and Var[X(t)]
+        3. What is the distribution of X(t) at any fixed time t?
+        4. Explain why this process has independent increments
+        """},
+    'stochastic_processes/medium': {'text': """
+        Consider the following questions about stochastic processes:
+
+        1. Define and compare:
+           - Brownian Motion
+           - Geometric Brownian Motion
+           - Ornstein-Uhlenbeck Process
+
+        2. For a standard Brownian motion W(t):
+           - What is its PDF at time t?
+           - What is its CDF?
+           - What are its key properties?
+
+        3. For a process X(t) = exp(W(t) - t/2):
+           - Show that this is a martingale
+           - Calculate E[X(t)]
+           - Is this process stationary?
+        """},
+    'stochastic_processes/hard': {'text': """
+        Consider a stock price following Geometric Brownian Motion:
+        dS(t) = μS(t)dt + σS(t)dW(t)
+
+        1. Derive the solution for S(t) using Itô's lemma
+        2. Show that log(S(t)) follows a normal distribution
+        3. Calculate:
+           - E[S(t)]
+           - Var[S(t)]
+           - The probability that S(t) > S(0)
+
+        4. Now consider a more complex process:
+           X(t) = W(t)² - t
+           where W(t) is a standard Brownian motion
+
+           a) Is this a martingale? Prove your answer
+           b) Calculate E[X(t)] and Var[X(t)]
+           c) Find the quadratic variation of X(t)
+        """},
+}
+
+# Dedented and trimmed once at import instead of on every generated problem
+QUESTION_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    template_id: {**template, 'text': textwrap.dedent(template['text']).strip()}
+    for template_id, template in _RAW_TEMPLATES.items()
+}
+
+# Decimal places kept for floats in compact 'parameters'
+COMPACT_DECIMALS = 6
+
+def render_question(template_id: str, params: Dict[str, Any]) -> str:
+    """Fill a template with pre-formatted parameter strings (or lists of rows)."""
+    template = QUESTION_TEMPLATES[template_id]
+    rows = template.get('rows', {})
+    values = {
+        name: '\n'.join(rows[name].format(*row) for row in value) if name in rows else value
+        for name, value in params.items()
+    }
+    return template['text'].format(**values)
+
+def question_fields(template_id: str, **params) -> Dict[str, Any]:
+    """The question text plus the template id and parameters it was rendered from."""
+    return {
+        'question': render_question(template_id, params),
+        'template': template_id,
+        'template_params': params
+    }
+
+def _round_floats(value: Any, decimals: int) -> Any:
+    if isinstance(value, float):
+        return round(value, decimals)
+    if isinstance(value, list):
+        return [_round_floats(v, decimals) for v in value]
+    if isinstance(value, dict):
+        return {k: _round_floats(v, decimals) for k, v in value.items()}
+    return value
+
+def to_wire(problem: Dict[str, Any], compact: bool = False) -> Dict[str, Any]:
+    """Shape a generated problem for a response.
+
+    The full form carries the rendered question. The compact form replaces
+    it with the template id and parameters (clients render it from
+    /problems/templates, fetched once) and rounds float parameters to
+    COMPACT_DECIMALS places.
+    """
+    if 'template' not in problem:
+        return problem
+    if not compact:
+        return {k: v for k, v in problem.items() if k not in ('template', 'template_params')}
+    wire = {k: v for k, v in problem.items() if k != 'question'}
+    if 'parameters' in wire:
+        wire['parameters'] = _round_floats(wire['parameters'], COMPACT_DECIMALS)
+    return wire
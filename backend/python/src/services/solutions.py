@@ -0,0 +1,321 @@
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from services.problem_generator import parse_problem_id
+from utils.black_scholes import black_scholes_price, black_scholes_vega, d1_d2, norm_cdf_scalar
+from utils.lattice import lattice_price
+from utils.monte_carlo import monte_carlo_price
+from utils.risk import parametric_var_es, loss_exceedance_probability, normal_mixture_var_es
+from utils.portfolio import (
+    covariance_matrix,
+    optimize_portfolios,
+    parse_constraints,
+    constrained_mean_variance,
+    efficient_frontier,
+)
+
+TRADING_DAYS = 252
+# Paths for Monte Carlo reference prices: a few tenths of a second per barrier problem
+REFERENCE_MC_PATHS = 50_000
+FRONTIER_POINTS = 10
+REFERENCE_RISK_AVERSION = 3.0
+
+def _norm_ppf(p):
+    # Deferred so that importing this module does not pull in scipy
+    from scipy.special import ndtri
+    return float(ndtri(p))
+
+def _portfolio(weights, expected_return, volatility, **extra) -> Dict[str, Any]:
+    return {
+        'weights': np.asarray(weights).tolist(),
+        'expected_return': float(expected_return),
+        'volatility': float(volatility),
+        **extra
+    }
+
+def solve_option_pricing(difficulty: str, params: Dict[str, float], seed: int) -> Dict[str, Any]:
+    S, K, T = params['stock_price'], params['strike_price'], params['time_to_maturity']
+    r, sigma = params['risk_free_rate'], params['volatility']
+    if difficulty == 'easy':
+        d1, _ = d1_d2(S, K, T, r, sigma)
+        return {
+            'answers': {
+                'call_price': float(black_scholes_price(S, K, T, r, sigma)),
+                'delta': norm_cdf_scalar(float(d1)),
+                'vega_per_vol_point': float(black_scholes_vega(S, K, T, r, sigma)) / 100
+            },
+            'notes': ["Vega is positive: a higher volatility always raises the call price."]
+        }
+    if difficulty == 'medium':
+        q = params['dividend_yield']
+        american = float(lattice_price(S, K, T, r, sigma, q, option_type='put', american=True,
+                                       smoothing=True, richardson=True))
+        european = float(black_scholes_price(S, K, T, r, sigma, q, option_type='put'))
+        return {
+            'answers': {
+                'american_put_price': american,
+                'european_put_price': european,
+                'early_exercise_premium': american - european
+            },
+            'notes': ["American price from a 200-step binomial tree with Black-Scholes smoothing "
+                      "and Richardson extrapolation."]
+        }
+    barrier = params['barrier_level']
+    # One monitoring step per trading day over the option's life
+    n_steps = max(1, round(TRADING_DAYS * T))
+    vanilla = float(black_scholes_price(S, K, T, r, sigma))
+    if S >= barrier:
+        # Already at or through the barrier: knocked out at inception
+        price, standard_error = 0.0, 0.0
+    else:
+        result = monte_carlo_price(S, K, T, r, sigma, payoff='up-and-out', barrier=barrier,
+                                   n_paths=REFERENCE_MC_PATHS, n_steps=n_steps, seed=seed)
+        price, standard_error = result['price'], result['standard_error']
+    return {
+        'answers': {
+            'barrier_call_price': price,
+            'barrier_call_standard_error': standard_error,
+            'vanilla_call_price': vanilla,
+            'knock_out_discount': vanilla - price
+        },
+        'notes': [f"Barrier price by Monte Carlo ({REFERENCE_MC_PATHS} paths, {n_steps} daily steps "
+                  "with a continuity correction for continuous monitoring)."]
+    }
+
+def solve_portfolio(difficulty: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    returns, volatilities, correlations = params['returns'], params['volatilities'], params['correlations']
+    if difficulty == 'easy':
+        result = optimize_portfolios(returns, volatilities, correlations)
+        answers = {
+            name: _portfolio(result[name]['weights'], result[name]['expected_return'],
+                             result[name]['volatility'], sharpe_ratio=float(result[name]['sharpe_ratio']))
+            for name in ('max_sharpe', 'min_variance')
+        }
+        if not result['max_sharpe']['valid']:
+            answers['max_sharpe'] = None
+        return {
+            'answers': answers,
+            'notes': ["Unconstrained (short sales allowed), zero risk-free rate; the correlation "
+                      "matrix is repaired to the nearest valid one first."]
+        }
+
+    n_assets = len(returns)
+    cov = covariance_matrix(volatilities, correlations)
+    constraints = parse_constraints(params.get('constraints', []), n_assets)
+    options = {'constraints': constraints, 'transaction_costs': params.get('transaction_costs')}
+    risk_aversions = np.geomspace(0.5, 50.0, FRONTIER_POINTS)
+
+    def serialize(result):
+        return _portfolio(result['weights'], result['expected_return'], result['volatility'],
+                          transaction_cost=result['transaction_cost'])
+
+    optimum = constrained_mean_variance(returns, cov, REFERENCE_RISK_AVERSION, **options)
+    answers = {
+        'optimal': serialize(optimum),
+        'efficient_frontier': [
+            {'risk_aversion': float(point['risk_aversion']), **serialize(point)}
+            for point in efficient_frontier(returns, cov, risk_aversions, **options)
+        ]
+    }
+    notes = [f"Long-only mean-variance optimum at risk aversion {REFERENCE_RISK_AVERSION}."]
+    if difficulty == 'medium':
+        unconstrained = constrained_mean_variance(returns, cov, REFERENCE_RISK_AVERSION)
+        answers['long_only_without_constraints'] = serialize(unconstrained)
+    else:
+        static = constrained_mean_variance(returns, cov, REFERENCE_RISK_AVERSION, constraints=constraints)
+        inverse_vol = 1.0 / np.asarray(volatilities)
+        inverse_vol /= inverse_vol.sum()
+        answers['static_without_costs'] = serialize(static)
+        answers['inverse_volatility'] = _portfolio(inverse_vol, inverse_vol @ np.asarray(returns),
+                                                   math.sqrt(inverse_vol @ cov @ inverse_vol))
+        notes.append("Rebalancing from equal weights, with each asset's transaction cost charged on turnover. "
+                     "The inverse-volatility weights are the naive risk-parity answer.")
+    return {'answers': answers, 'notes': notes}
+
+def _poisson_support(mean: float, width: float = 8.0):
+    """Counts within width standard deviations of a Poisson mean, with their probabilities."""
+    from scipy.special import gammaln
+    spread = width * math.sqrt(mean) + 10
+    counts = np.arange(max(0, math.floor(mean - spread)), math.ceil(mean + spread) + 1)
+    return counts, np.exp(counts * math.log(mean) - mean - gammaln(counts + 1.0))
+
+def _compound_poisson_mixture(trades: float, weights, means, stds):
+    """Daily P&L of Poisson(trades) trades drawn from a normal mixture, as a mixture of normals.
+
+    Thinning splits the trades into independent Poisson counts per regime;
+    given the counts the day's P&L is normal, so the day is an exact
+    mixture over count pairs (truncated where probabilities are negligible).
+    """
+    (good, p_good), (bad, p_bad) = (_poisson_support(trades * w) for w in weights)
+    weight = np.outer(p_good, p_bad)
+    mean = good[:, None] * means[0] + bad[None, :] * means[1]
+    variance = good[:, None] * stds[0] ** 2 + bad[None, :] * stds[1] ** 2
+    # Drop negligible pairs, and the no-trade day, whose P&L is exactly zero
+    keep = (weight > 1e-16) & (variance > 0)
+    return weight[keep], mean[keep], np.sqrt(variance[keep])
+
+def solve_probability(difficulty: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if difficulty == 'easy':
+        mu, sigma = 0.001, 0.015
+        z = _norm_ppf(0.975)
+        return {
+            'answers': {
+                'probability_positive': norm_cdf_scalar(mu / sigma),
+                'probability_above_2pct': 1.0 - norm_cdf_scalar((0.02 - mu) / sigma),
+                'confidence_interval_95': [mu - z * sigma, mu + z * sigma]
+            },
+            'notes': []
+        }
+    if difficulty == 'medium':
+        mu, sigma, notional = params['mean_return'], params['return_volatility'], params['notional']
+        levels, df = params['confidence_levels'], params['degrees_of_freedom']
+        normal = parametric_var_es(mu, sigma, levels, notional)
+        student_t = parametric_var_es(mu, sigma, levels, notional, 'student_t', df)
+        exceedance = loss_exceedance_probability([params['loss_threshold'], params['days_threshold']],
+                                                 mu, sigma, notional)
+        return {
+            'answers': {
+                'confidence_levels': levels,
+                'var': normal['var'].tolist(),
+                'expected_shortfall': normal['es'].tolist(),
+                'probability_loss_above_threshold': float(exceedance[0]),
+                'expected_days_loss_above_threshold': params['trading_days'] * float(exceedance[1]),
+                'student_t_var': student_t['var'].tolist(),
+                'student_t_expected_shortfall': student_t['es'].tolist()
+            },
+            'notes': ["Losses are positive dollar amounts over one day. The Student-t distribution is "
+                      "scaled to the same standard deviation as the normal one."]
+        }
+
+    trades = params['trades_per_hour'] * params['hours_per_day']
+    weights, means, stds = (np.asarray(params[k], dtype=float)
+                            for k in ('mixture_weights', 'trade_means', 'trade_stds'))
+    level = params['confidence_level']
+    mean_per_trade = float(weights @ means)
+    second_moment = float(weights @ (stds ** 2 + means ** 2))
+    std_per_trade = math.sqrt(second_moment - mean_per_trade ** 2)
+    daily = normal_mixture_var_es(*_compound_poisson_mixture(trades, weights, means, stds), [level])
+    if mean_per_trade > 0:
+        trades_needed = math.ceil((_norm_ppf(level) * std_per_trade / mean_per_trade) ** 2)
+    else:
+        trades_needed = None
+    return {
+        'answers': {
+            'expected_profit_per_trade': mean_per_trade,
+            'expected_daily_profit': trades * mean_per_trade,
+            'daily_profit_std': math.sqrt(trades * second_moment),
+            'probability_losing_day': daily['loss_probability'],
+            'var': float(daily['var'][0]),
+            'expected_shortfall': float(daily['es'][0]),
+            'trades_for_confidence': trades_needed,
+            'probability_three_losing_days': daily['loss_probability'] ** 3
+        },
+        'notes': ["Daily P&L is computed exactly as a mixture over the Poisson numbers of trades in "
+                  "each regime. Trades needed uses the normal approximation to the mean profit per "
+                  "trade (none suffice without a positive edge). Three losing days are "
+                  "independent under a working strategy."]
+    }
+
+def solve_stochastic(difficulty: str, simulation: Dict[str, float]) -> Dict[str, Any]:
+    t = simulation['T']
+    if difficulty == 'easy':
+        return {
+            'answers': {
+                'is_martingale': False,
+                'mean_at_T': -t / 2,
+                'variance_at_T': t,
+                'distribution_at_T': {'family': 'normal', 'mean': -t / 2, 'variance': t}
+            },
+            'notes': ["X(t) = W(t) - t/2 has drift -1/2, so it is a supermartingale rather than a "
+                      "martingale. Increments are independent because those of W(t) are."]
+        }
+    if difficulty == 'medium':
+        return {
+            'answers': {
+                'is_martingale': True,
+                'mean_at_T': 1.0,
+                'variance_at_T': math.exp(t) - 1.0,
+                'is_stationary': False
+            },
+            'notes': ["W(t) ~ N(0, t), so its PDF is exp(-x^2 / 2t) / sqrt(2 pi t) and its CDF is Phi(x / sqrt(t))."]
+        }
+    mu, sigma, s0 = simulation['mu'], simulation['sigma'], simulation['x0']
+    return {
+        'answers': {
+            'mean_at_T': s0 * math.exp(mu * t),
+            'variance_at_T': s0 ** 2 * math.exp(2 * mu * t) * (math.exp(sigma ** 2 * t) - 1.0),
+            'probability_above_initial': norm_cdf_scalar((mu - 0.5 * sigma ** 2) * math.sqrt(t) / sigma),
+            'x_is_martingale': True,
+            'x_mean_at_T': 0.0,
+            'x_variance_at_T': 2 * t ** 2,
+            'x_expected_quadratic_variation_at_T': 2 * t ** 2
+        },
+        'notes': [f"GBM figures use the illustrative mu={mu}, sigma={sigma}, S(0)={s0} and t={t}. "
+                  "For X(t) = W(t)^2 - t, dX = 2W dW, so [X]_t = 4 * integral of W(s)^2 ds."]
+    }
+
+def solve_problem(problem: Dict[str, Any]) -> Dict[str, Any]:
+    """Reference answers for a generated problem, derived from its parameters."""
+    problem_type, difficulty = problem['type'], problem.get('difficulty')
+    if problem_type == 'option_pricing':
+        solution = solve_option_pricing(difficulty, problem['parameters'], problem['seed'])
+    elif problem_type == 'portfolio_optimization':
+        solution = solve_portfolio(difficulty, problem['parameters'])
+    elif problem_type == 'probability':
+        solution = solve_probability(difficulty, problem.get('parameters'))
+    elif problem_type == 'stochastic_processes':
+        solution = solve_stochastic(difficulty, problem['simulation'])
+    else:
+        raise ValueError(f"No reference solution for problem type: {problem_type}")
+    return solution
+
+class ReferenceSolver:
+    """Computes reference solutions on demand and memoizes them by problem id.
+
+    Nothing is solved when a problem is generated; the first request for a
+    solution regenerates the problem from its seed, solves it, and keeps
+    the result in an LRU cache of cache_size entries.
+    """
+
+    def __init__(self, generator, cache_size: int = 512):
+        self.generator = generator
+        self._solve_cached = lru_cache(maxsize=cache_size)(self._solve)
+
+    def __getstate__(self):
+        # lru_cache wrappers cannot be pickled; process-pool workers get a fresh cache
+        state = self.__dict__.copy()
+        state.pop('_solve_cached', None)
+        state['_cache_size'] = self._solve_cached.cache_parameters()['maxsize']
+        return state
+
+    def __setstate__(self, state):
+        cache_size = state.pop('_cache_size')
+        self.__dict__.update(state)
+        self._solve_cached = lru_cache(maxsize=cache_size)(self._solve)
+
+    def _solve(self, problem_type: str, difficulty: Optional[str], seed: int) -> Dict[str, Any]:
+        problem = self.generator.generate_problem(problem_type, difficulty, seed)
+        return {
+            'id': problem['id'],
+            'type': problem['type'],
+            'difficulty': problem.get('difficulty'),
+            **solve_problem(problem)
+        }
+
+    def solution(self, problem_id: str) -> Dict[str, Any]:
+        """Reference solution for a problem id; raises ValueError for a malformed or mental math id.
+
+        Mental math answers are only revealed by the scored WebSocket
+        session, as each answer is scored.
+        """
+        key = parse_problem_id(problem_id, self.generator.problem_types, self.generator.difficulty_levels)
+        if key[0] == 'mental_math':
+            raise ValueError("Mental math problems have no published solutions")
+        return self._solve_cached(*key)
+
+    def cache_info(self):
+        """Return hit/miss statistics for the solution cache."""
+        return self._solve_cached.cache_info()
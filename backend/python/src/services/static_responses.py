@@ -0,0 +1,45 @@
+import hashlib
+import json
+from typing import Any, Callable, Optional
+
+from fastapi import Request, Response
+
+class StaticResponse:
+    """A JSON response serialized once to bytes and served with a strong ETag.
+
+    build() is called on first use and again after invalidate(), so the
+    payload is only re-serialized when the underlying data changes.
+    Conditional requests whose If-None-Match matches the current ETag get a
+    bodyless 304 without calling build() at all.
+    """
+
+    def __init__(self, build: Callable[[], Any], cache_control: str = "public, max-age=300"):
+        self._build = build
+        self.cache_control = cache_control
+        self._body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+
+    def refresh(self):
+        body = json.dumps(self._build(), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        self._body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def invalidate(self):
+        """Drop the serialized payload; the next request rebuilds it."""
+        self._body = None
+        self.etag = None
+
+    def _matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        # If-None-Match uses weak comparison, so W/"x" matches "x"
+        return '*' in candidates or any(tag.removeprefix('W/') == self.etag for tag in candidates)
+
+    def respond(self, request: Request) -> Response:
+        if self._body is None:
+            self.refresh()
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self._matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self._body, media_type="application/json", headers=headers)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class PoolSaturatedError(Exception):
+    """Raised when the worker pool's queue is full and a job is rejected."""
+
+class WorkerPool:
+    """Run CPU-bound jobs off the event loop with a bounded queue.
+
+    At most max_workers jobs run at once; up to max_queue more may wait for
+    a slot. Anything beyond that is rejected immediately with
+    PoolSaturatedError so callers can shed load instead of queueing without
+    limit. All bookkeeping happens on the event loop thread, so no locks
+    are needed.
+
+    A slot is held until the job itself finishes: a caller that is
+    cancelled while its job runs stops waiting, but the job keeps its
+    worker until it is done.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64, kind: str = 'thread'):
+        if kind not in ('thread', 'process'):
+            raise ValueError("kind must be 'thread' or 'process'")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            executor_cls = ThreadPoolExecutor if self.kind == 'thread' else ProcessPoolExecutor
+            self._executor = executor_cls(max_workers=self.max_workers)
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool and return its result.
+
+        For a process pool, fn and its arguments must be picklable, and
+        they are pickled on every call: pass a module-level function that
+        uses the worker process's own module globals, not a bound method,
+        if caches on those objects should persist between jobs.
+        """
+        self._ensure_started()
+        if self._queued + self._running >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise PoolSaturatedError("Server is busy, please retry shortly")
+
+        self._queued += 1
+        enqueued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        wait = time.perf_counter() - enqueued_at
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+        self._running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._finish()
+            raise
+
+        def on_done(_):
+            try:
+                loop.call_soon_threadsafe(self._finish)
+            except RuntimeError:
+                pass  # The loop has closed; nothing is left to release
+
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def _finish(self):
+        self._running -= 1
+        self._completed += 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current queue depth and cumulative wait statistics."""
+        started = self._completed + self._running
+        return {
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': self._running,
+            'queue_depth': self._queued,
+            'completed': self._completed,
+            'rejected': self._rejected,
+            'mean_wait_seconds': self._total_wait / started if started else 0.0,
+            'max_wait_seconds': self._max_wait
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
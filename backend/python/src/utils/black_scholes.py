@@ -0,0 +1,120 @@
+import math
+import numpy as np
+
+def norm_cdf_scalar(x):
+    """Standard normal CDF for a single float (avoids scipy.stats overhead)."""
+    return 0.5 * math.erfc(-x / math.sqrt(2.0))
+
+def norm_cdf(x):
+    """Standard normal CDF for arrays; scipy is imported on first use to keep startup fast."""
+    from scipy.special import ndtr
+    return ndtr(x)
+
+def norm_pdf(x):
+    """Standard normal PDF, works on scalars and arrays."""
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+def _is_call(option_type):
+    """
+    Convert an option type specification into a boolean array.
+
+    option_type may be 'call'/'put', an array of those strings, or a boolean
+    array where True means call.
+    """
+    flags = np.asarray(option_type)
+    if flags.dtype == bool:
+        return flags
+    flags = np.char.lower(flags.astype(str))
+    if not np.all((flags == 'call') | (flags == 'put')):
+        raise ValueError("option_type must be 'call' or 'put'")
+    return flags == 'call'
+
+def d1_d2(S, K, T, r, sigma, q=0.0):
+    """
+    Calculate the Black-Scholes d1 and d2 terms.
+
+    All parameters may be scalars or NumPy arrays that broadcast together.
+
+    Returns:
+    tuple: (d1, d2)
+    """
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / vol_sqrt_T
+    return d1, d1 - vol_sqrt_T
+
+def black_scholes_scalar(S, K, T, r, sigma, q=0.0, option_type='call'):
+    """
+    Price a single European option using only the math module.
+
+    This is the fast path for scalar inputs; it is several times quicker than
+    going through NumPy/SciPy for one contract.
+
+    Returns:
+    float: Option price
+    """
+    if T <= 0 or sigma <= 0:
+        forward_intrinsic = S * math.exp(-q * T) - K * math.exp(-r * T)
+        return max(forward_intrinsic, 0.0) if option_type == 'call' else max(-forward_intrinsic, 0.0)
+
+    vol_sqrt_T = sigma * math.sqrt(T)
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+    disc_S = S * math.exp(-q * T)
+    disc_K = K * math.exp(-r * T)
+
+    if option_type == 'call':
+        return disc_S * norm_cdf_scalar(d1) - disc_K * norm_cdf_scalar(d2)
+    elif option_type == 'put':
+        return disc_K * norm_cdf_scalar(-d2) - disc_S * norm_cdf_scalar(-d1)
+    raise ValueError("option_type must be 'call' or 'put'")
+
+def black_scholes_price(S, K, T, r, sigma, q=0.0, option_type='call'):
+    """
+    Price European calls and puts in one broadcasted pass.
+
+    Parameters:
+    S: Current stock price(s)
+    K: Strike price(s)
+    T: Time(s) to maturity (in years)
+    r: Risk-free interest rate(s)
+    sigma: Volatility(ies)
+    q: Continuous dividend yield(s)
+    option_type: 'call', 'put', an array of those, or a boolean array (True = call)
+
+    Returns:
+    float or ndarray: Option price(s), shaped like the broadcast of the inputs
+    """
+    if isinstance(option_type, str) and all(isinstance(x, (int, float)) for x in (S, K, T, r, sigma, q)):
+        return black_scholes_scalar(S, K, T, r, sigma, q, option_type)
+
+    S, K, T, r, sigma, q = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q))
+    is_call = _is_call(option_type)
+
+    disc_S = S * np.exp(-q * T)
+    disc_K = K * np.exp(-r * T)
+
+    # Expired or zero-vol contracts are worth their discounted intrinsic value
+    degenerate = (T <= 0) | (sigma <= 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2 = d1_d2(S, K, T, r, sigma, q)
+    d1 = np.where(degenerate, np.where(disc_S > disc_K, np.inf, -np.inf), d1)
+    d2 = np.where(degenerate, d1, d2)
+
+    # Evaluate put prices as calls on the mirrored terms: sign = +1 for calls, -1 for puts
+    sign = np.where(is_call, 1.0, -1.0)
+    price = sign * (disc_S * norm_cdf(sign * d1) - disc_K * norm_cdf(sign * d2))
+    return np.maximum(price, 0.0)
+
+def black_scholes_vega(S, K, T, r, sigma, q=0.0):
+    """
+    Calculate Black-Scholes vega (same for calls and puts).
+
+    Returns:
+    float or ndarray: dPrice/dSigma
+    """
+    S, K, T, r, sigma, q = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, _ = d1_d2(S, K, T, r, sigma, q)
+        vega = S * np.exp(-q * T) * np.sqrt(T) * norm_pdf(d1)
+    return np.nan_to_num(vega, nan=0.0)
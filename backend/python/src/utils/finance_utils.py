@@ -1,7 +1,13 @@
 import numpy as np
-from scipy.stats import norm
-import yfinance as yf
 
+from utils.black_scholes import black_scholes_price
+from utils.implied_volatility import implied_volatility
+from utils.lattice import lattice_price
+from utils.market_data import COLUMNS, get_market_data_cache
+from utils.metrics import timed
+from utils.risk import var_es, position_pnl
+
+@timed()
 def black_scholes_call(S, K, T, r, sigma):
     """
     Calculate Black-Scholes call option price.
@@ -16,52 +22,152 @@ def black_scholes_call(S, K, T, r, sigma):
     Returns:
     call_price: Black-Scholes call option price
     """
-    d1 = (np.log(S/K) + (r + sigma**2/2)*T) / (sigma*np.sqrt(T))
-    d2 = d1 - sigma*np.sqrt(T)
+    return black_scholes_price(S, K, T, r, sigma, option_type='call')
+
+@timed()
+def american_option_price(S, K, T, r, sigma, q=0.0, option_type='put', steps=200):
+    """
+    Calculate an American option price on a binomial tree.
+    
+    Parameters:
+    S: Current stock price
+    K: Strike price
+    T: Time to maturity (in years)
+    r: Risk-free interest rate
+    sigma: Volatility
+    q: Continuous dividend yield
+    option_type: Type of option ('call' or 'put')
+    steps: Number of tree steps
     
-    call_price = S*norm.cdf(d1) - K*np.exp(-r*T)*norm.cdf(d2)
-    return call_price
+    Returns:
+    float: American option price
+    """
+    return lattice_price(S, K, T, r, sigma, q, option_type, american=True, steps=steps,
+                         smoothing=True, richardson=True)
 
-def calculate_portfolio_metrics(weights, returns):
+@timed()
+def calculate_return_moments(returns, periods_per_year=252):
     """
-    Calculate portfolio metrics including return, volatility, and Sharpe ratio.
+    Calculate annualized mean returns and covariance once for reuse.
     
     Parameters:
-    weights: Array of portfolio weights
     returns: DataFrame of asset returns
+    periods_per_year: Number of return periods in a year
+    
+    Returns:
+    dict: 'mean' vector and 'cov' matrix, both annualized
+    """
+    return {
+        "mean": returns.mean().to_numpy() * periods_per_year,
+        "cov": returns.cov().to_numpy() * periods_per_year
+    }
+
+@timed()
+def calculate_portfolio_metrics(weights, returns, risk_free_rate=0.0):
+    """
+    Calculate portfolio metrics including return, volatility, and Sharpe ratio.
+    
+    Parameters:
+    weights: Array of portfolio weights, or a 2-D array with one portfolio per row
+    returns: DataFrame of asset returns, or the output of calculate_return_moments
+             (pass the moments when evaluating many weight sets on the same data)
+    risk_free_rate: Annual risk-free rate used in the Sharpe ratio
     
     Returns:
-    dict: Portfolio metrics
+    dict: Portfolio metrics (scalars for a single portfolio, arrays for a 2-D weights matrix)
     """
-    portfolio_return = np.sum(returns.mean() * weights) * 252
-    portfolio_vol = np.sqrt(np.dot(weights.T, np.dot(returns.cov() * 252, weights)))
-    sharpe_ratio = portfolio_return / portfolio_vol
+    moments = returns if isinstance(returns, dict) else calculate_return_moments(returns)
+    weights = np.asarray(weights, dtype=float)
+    single = weights.ndim == 1
+    W = np.atleast_2d(weights)
+    
+    portfolio_return = W @ moments["mean"]
+    portfolio_vol = np.sqrt(np.einsum('ij,ij->i', W @ moments["cov"], W))
+    sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_vol
     
+    if single:
+        portfolio_return, portfolio_vol, sharpe_ratio = portfolio_return[0], portfolio_vol[0], sharpe_ratio[0]
     return {
         "return": portfolio_return,
         "volatility": portfolio_vol,
         "sharpe_ratio": sharpe_ratio
     }
 
+@timed()
+def calculate_var_es(returns, confidence_levels=(0.95, 0.99), positions=1.0, method='historical',
+                     df=None, horizon=1.0, n_resamples=1000, seed=None):
+    """
+    Calculate Value at Risk and Expected Shortfall for many positions and confidence levels.
+    
+    Parameters:
+    returns: Series or 1-D array of returns (scalar positions), or DataFrame /
+             2-D array of asset returns (one row of holdings per position)
+    confidence_levels: Confidence levels in (0, 1)
+    positions: Position values (1-D returns) or holdings per asset (2-D returns)
+    method: 'historical', 'bootstrap', 'normal' or 'student_t'; the parametric
+            methods fit the mean and volatility of each position's P&L
+    df: Student-t degrees of freedom
+    horizon: Periods to scale parametric estimates to (square-root-of-time)
+    n_resamples: Bootstrap resamples
+    seed: Bootstrap seed
+    
+    Returns:
+    dict: 'var' and 'es' arrays of shape (positions, levels), as positive losses
+    """
+    returns = np.asarray(returns, dtype=float)
+    if method in ('normal', 'student_t'):
+        # Fit each position's P&L directly, so holdings in several assets keep their correlations
+        pnl = position_pnl(returns, positions)
+        return var_es(method, confidence_levels, 1.0, mu=pnl.mean(axis=0), sigma=pnl.std(axis=0, ddof=1),
+                      df=df, horizon=horizon)
+    return var_es(method, confidence_levels, positions, returns=returns, n_resamples=n_resamples, seed=seed)
+
+@timed()
 def fetch_stock_data(ticker, start_date, end_date):
     """
-    Fetch stock data using yfinance.
+    Fetch daily stock data through the local market-data cache.
+    
+    Only date ranges not already cached are downloaded (with yfinance by
+    default; see utils.market_data for offline providers).
     
     Parameters:
     ticker: Stock ticker symbol
     start_date: Start date for data
-    end_date: End date for data
+    end_date: End date for data (exclusive)
     
     Returns:
-    DataFrame: Stock price data
+    DataFrame: Stock price data indexed by date
     """
-    stock = yf.Ticker(ticker)
-    df = stock.history(start=start_date, end=end_date)
-    return df
+    # pandas is slow to import, so only load it when fetching data
+    import pandas as pd
 
+    bars = get_market_data_cache().get(ticker, start_date, end_date)
+    index = pd.DatetimeIndex(np.asarray(bars['Date'], dtype='datetime64[ns]'), name='Date')
+    return pd.DataFrame({column: np.array(bars[column]) for column in COLUMNS}, index=index)
+
+@timed()
+def fetch_close_prices(tickers, start_date, end_date):
+    """
+    Fetch closing prices for several tickers in one aligned table.
+    
+    Parameters:
+    tickers: List of stock ticker symbols
+    start_date: Start date for data
+    end_date: End date for data (exclusive)
+    
+    Returns:
+    DataFrame: One column per ticker, NaN where a ticker has no bar that day
+    """
+    import pandas as pd
+
+    dates, closes = get_market_data_cache().get_many(tickers, start_date, end_date, column='Close')
+    index = pd.DatetimeIndex(dates.astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame(closes, index=index, columns=list(tickers))
+
+@timed()
 def calculate_implied_volatility(option_price, S, K, T, r, option_type='call'):
     """
-    Calculate implied volatility using Newton-Raphson method.
+    Calculate implied volatility using a safeguarded Newton-Raphson method.
     
     Parameters:
     option_price: Market price of option
@@ -72,28 +178,9 @@ def calculate_implied_volatility(option_price, S, K, T, r, option_type='call'):
     option_type: Type of option ('call' or 'put')
     
     Returns:
-    float: Implied volatility
-    """
-    sigma = 0.5  # Initial guess
-    max_iterations = 100
-    tolerance = 1e-5
-    
-    for i in range(max_iterations):
-        if option_type == 'call':
-            price = black_scholes_call(S, K, T, r, sigma)
-        else:
-            # Add put option calculation if needed
-            continue
-            
-        diff = option_price - price
-        if abs(diff) < tolerance:
-            return sigma
-            
-        # Calculate vega
-        d1 = (np.log(S/K) + (r + sigma**2/2)*T) / (sigma*np.sqrt(T))
-        vega = S * np.sqrt(T) * norm.pdf(d1)
-        
-        # Update sigma
-        sigma = sigma + diff/vega
-        
-    return sigma 
\ No newline at end of file
+    float or ndarray: Implied volatility (NaN if the price violates no-arbitrage
+                      bounds); an array when any input is an array
+    """
+    result = implied_volatility(option_price, S, K, T, r, option_type=option_type)
+    iv = result['implied_volatility']
+    return float(iv) if np.ndim(iv) == 0 else iv
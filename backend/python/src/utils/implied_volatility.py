@@ -0,0 +1,93 @@
+import numpy as np
+
+from utils.black_scholes import black_scholes_price, black_scholes_vega, _is_call
+
+SIGMA_LOWER = 1e-6
+SIGMA_UPPER = 5.0
+MIN_VEGA = 1e-10
+
+def implied_volatility(option_price, S, K, T, r, q=0.0, option_type='call',
+                       tolerance=1e-8, max_iterations=100):
+    """
+    Invert Black-Scholes prices for whole arrays of calls and puts at once.
+
+    Each element runs a safeguarded Newton-Raphson iteration: the root is
+    kept inside a bracket [lo, hi] that shrinks every step, and whenever the
+    Newton step would leave the bracket (or vega is too small to divide by)
+    the element falls back to bisection. Converged elements are masked out
+    so later iterations only touch the quotes that still need work.
+
+    Parameters:
+    option_price: Market price(s) of the options
+    S: Current stock price(s)
+    K: Strike price(s)
+    T: Time(s) to maturity (in years)
+    r: Risk-free interest rate(s)
+    q: Continuous dividend yield(s)
+    option_type: 'call', 'put', an array of those, or a boolean array (True = call)
+    tolerance: Absolute price tolerance for convergence
+    max_iterations: Maximum number of iterations per element
+
+    Returns:
+    dict: 'implied_volatility' (NaN where the price violates no-arbitrage
+          bounds), 'iterations' and 'converged' arrays, all shaped like the
+          broadcast of the inputs
+    """
+    price, S, K, T, r, q = (np.asarray(x, dtype=float) for x in (option_price, S, K, T, r, q))
+    is_call = _is_call(option_type)
+    price, S, K, T, r, q, is_call = np.broadcast_arrays(price, S, K, T, r, q, is_call)
+    shape = price.shape
+    price, S, K, T, r, q, is_call = (x.ravel() for x in (price, S, K, T, r, q, is_call))
+
+    # No-arbitrage bounds: intrinsic value below, discounted spot/strike above
+    disc_S = S * np.exp(-q * T)
+    disc_K = K * np.exp(-r * T)
+    lower_bound = np.where(is_call, np.maximum(disc_S - disc_K, 0.0), np.maximum(disc_K - disc_S, 0.0))
+    upper_bound = np.where(is_call, disc_S, disc_K)
+    valid = (price >= lower_bound) & (price < upper_bound) & (T > 0)
+
+    # Manaster-Koehler starting point, clipped into the search bracket
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(np.abs(np.log(S / K) + (r - q) * T) * 2.0 / T)
+    sigma = np.clip(np.nan_to_num(sigma, nan=0.2), 0.05, 1.0)
+    lo = np.full_like(sigma, SIGMA_LOWER)
+    hi = np.full_like(sigma, SIGMA_UPPER)
+
+    iterations = np.zeros(price.shape, dtype=int)
+    converged = np.zeros(price.shape, dtype=bool)
+    active = np.flatnonzero(valid)
+
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        s = sigma[active]
+        model = black_scholes_price(S[active], K[active], T[active], r[active], s, q[active], is_call[active])
+        diff = model - price[active]
+        iterations[active] += 1
+
+        done = np.abs(diff) < tolerance
+        converged[active[done]] = True
+
+        # Price is increasing in sigma, so the sign of diff tells us which side the root is on
+        hi[active] = np.where(diff > 0, s, hi[active])
+        lo[active] = np.where(diff < 0, s, lo[active])
+
+        vega = black_scholes_vega(S[active], K[active], T[active], r[active], s, q[active])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = s - diff / vega
+        a_lo, a_hi = lo[active], hi[active]
+        use_bisection = (vega < MIN_VEGA) | ~(newton > a_lo) | ~(newton < a_hi)
+        sigma[active] = np.where(done, s, np.where(use_bisection, 0.5 * (a_lo + a_hi), newton))
+
+        # Bracket collapsed onto the root even if the price tolerance was not met
+        collapsed = (a_hi - a_lo) < tolerance
+        converged[active[collapsed]] = True
+
+        active = active[~(done | collapsed)]
+
+    sigma[~valid] = np.nan
+    return {
+        'implied_volatility': sigma.reshape(shape),
+        'iterations': iterations.reshape(shape),
+        'converged': converged.reshape(shape)
+    }
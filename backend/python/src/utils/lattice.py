@@ -0,0 +1,131 @@
+import numpy as np
+
+from utils.black_scholes import black_scholes_price, _is_call
+
+LATTICE_METHODS = ['binomial', 'trinomial']
+
+def _lattice_parameters(T, r, sigma, q, steps, method):
+    """
+    Calculate per-contract step size, log up-move and branch probabilities.
+
+    Returns:
+    tuple: (dt, log_u, probabilities) where probabilities are ordered from
+           the highest branch to the lowest
+    """
+    dt = T / steps
+    growth = np.exp((r - q) * dt)
+    if method == 'binomial':
+        # Cox-Ross-Rubinstein
+        log_u = sigma * np.sqrt(dt)
+        u, d = np.exp(log_u), np.exp(-log_u)
+        p_up = (growth - d) / (u - d)
+        probabilities = (p_up, 1.0 - p_up)
+    else:
+        # Boyle trinomial with a middle branch that keeps the spot unchanged
+        log_u = sigma * np.sqrt(2.0 * dt)
+        half_growth = np.exp((r - q) * dt / 2.0)
+        up_half = np.exp(sigma * np.sqrt(dt / 2.0))
+        down_half = 1.0 / up_half
+        p_up = ((half_growth - down_half) / (up_half - down_half))**2
+        p_down = ((up_half - half_growth) / (up_half - down_half))**2
+        probabilities = (p_up, 1.0 - p_up - p_down, p_down)
+    return dt, log_u, probabilities
+
+def _backward_induction(S, K, T, r, sigma, q, is_call, american, steps, method, smoothing):
+    """
+    Roll a batch of lattices back to the root over one reused value array.
+
+    All contract parameters are column vectors of shape (n, 1); the value
+    array has shape (n, width) and is overwritten in place step by step,
+    so memory is O(n * steps) rather than O(n * steps^2).
+
+    Returns:
+    ndarray: Root values, shape (n,)
+    """
+    dt, log_u, probabilities = _lattice_parameters(T, r, sigma, q, steps, method)
+    discount = np.exp(-r * dt)
+    sign = np.where(is_call, 1.0, -1.0)
+    log_S = np.log(S)
+    branches = len(probabilities)
+    # Binomial nodes at step i sit at log_S + (2j - i) log_u; trinomial at log_S + (j - i) log_u
+    node_spacing = 2 if method == 'binomial' else 1
+    width = (steps + 1) if method == 'binomial' else (2 * steps + 1)
+    offsets = np.arange(width)
+
+    def node_spots(i):
+        n_nodes = i + 1 if method == 'binomial' else 2 * i + 1
+        return np.exp(log_S + (node_spacing * offsets[:n_nodes] - i) * log_u)
+
+    def intrinsic(spots):
+        return np.maximum(sign * (spots - K), 0.0)
+
+    if smoothing:
+        # Black-Scholes smoothing: replace the last step with the European price over dt
+        last = steps - 1
+        spots = node_spots(last)
+        values = np.empty((S.shape[0], width))
+        n_nodes = spots.shape[1]
+        values[:, :n_nodes] = black_scholes_price(spots, K, dt, r, sigma, q, is_call)
+        if american:
+            np.maximum(values[:, :n_nodes], intrinsic(spots), out=values[:, :n_nodes])
+    else:
+        last = steps
+        values = intrinsic(node_spots(last))
+
+    for i in range(last - 1, -1, -1):
+        n_nodes = i + 1 if method == 'binomial' else 2 * i + 1
+        # Highest-branch child of node j is j + branches - 1, lowest is j
+        continuation = probabilities[0] * values[:, branches - 1:branches - 1 + n_nodes]
+        for b in range(1, branches):
+            continuation += probabilities[b] * values[:, branches - 1 - b:branches - 1 - b + n_nodes]
+        values[:, :n_nodes] = discount * continuation
+        if american:
+            np.maximum(values[:, :n_nodes], intrinsic(node_spots(i)), out=values[:, :n_nodes])
+
+    return values[:, 0]
+
+def lattice_price(S, K, T, r, sigma, q=0.0, option_type='put', american=True,
+                  steps=200, method='binomial', smoothing=False, richardson=False):
+    """
+    Price American or European options on a recombining binomial/trinomial tree.
+
+    Prices a whole array of contracts at once; every contract uses the same
+    number of steps.
+
+    Parameters:
+    S: Current stock price(s)
+    K: Strike price(s)
+    T: Time(s) to maturity (in years)
+    r: Risk-free interest rate(s)
+    sigma: Volatility(ies)
+    q: Continuous dividend yield(s)
+    option_type: 'call', 'put', an array of those, or a boolean array (True = call)
+    american: Allow early exercise
+    steps: Number of time steps
+    method: 'binomial' (Cox-Ross-Rubinstein) or 'trinomial' (Boyle)
+    smoothing: Use the Black-Scholes price over the final step (removes most of the
+               odd/even oscillation in the tree price)
+    richardson: Extrapolate 2 * P(steps) - P(steps / 2), which cancels the leading
+                O(1/steps) error term
+
+    Returns:
+    float or ndarray: Option price(s), shaped like the broadcast of the inputs
+    """
+    if method not in LATTICE_METHODS:
+        raise ValueError(f"Unknown lattice method: {method}")
+    if steps < 2:
+        raise ValueError("steps must be at least 2")
+
+    S, K, T, r, sigma, q = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q))
+    is_call = _is_call(option_type)
+    S, K, T, r, sigma, q, is_call = np.broadcast_arrays(S, K, T, r, sigma, q, is_call)
+    shape = S.shape
+    columns = [x.reshape(-1, 1) for x in (S, K, T, r, sigma, q, is_call)]
+
+    price = _backward_induction(*columns, american, steps, method, smoothing)
+    if richardson:
+        coarse = _backward_induction(*columns, american, steps // 2, method, smoothing)
+        price = 2.0 * price - coarse
+
+    price = price.reshape(shape)
+    return float(price) if price.ndim == 0 else price
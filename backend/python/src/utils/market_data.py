@@ -0,0 +1,376 @@
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in different processes are not serialized
+    fcntl = None
+
+# Prices are split- and dividend-adjusted, as yfinance returns them by default
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits')
+# Columns that are zero (no event) rather than missing when a source does not provide them
+EVENT_COLUMNS = ('Dividends', 'Stock Splits')
+# Bumped whenever stored bars change meaning; older caches are refetched
+CACHE_FORMAT = 2
+# Each ticker directory holds snapshot-* directories and a CURRENT file naming the published one
+CURRENT_FILE = 'CURRENT'
+LOCK_FILE = '.lock'
+SNAPSHOT_PREFIX = 'snapshot-'
+READ_ATTEMPTS = 5
+# Yahoo-style symbols such as BRK-B, ^GSPC, EURUSD=X or 0700.HK; never a path
+TICKER_PATTERN = re.compile(r'^[A-Z0-9^][A-Z0-9.\-^=]{0,19}$')
+# A gap starting this close to the last stored bar is widened to re-read that bar
+ANCHOR_WINDOW = np.timedelta64(7, 'D')
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+DEFAULT_CACHE_DIR = os.path.join(DATA_DIR, 'market_cache')
+DEFAULT_FIXTURES_DIR = os.path.join(DATA_DIR, 'market_fixtures')
+
+# A fetcher returns {'Date': datetime64[D] array, 'Open': ..., ...} for dates in [start, end)
+Fetcher = Callable[[str, np.datetime64, np.datetime64], Dict[str, np.ndarray]]
+
+def _to_day(date) -> np.datetime64:
+    return np.datetime64(date, 'D')
+
+def _check_ticker(ticker: str) -> str:
+    symbol = ticker.upper()
+    if not TICKER_PATTERN.match(symbol):
+        raise ValueError(f"Invalid ticker: {ticker!r}")
+    return symbol
+
+def _column_file(column: str) -> str:
+    return column.lower().replace(' ', '_') + '.npy'
+
+def _empty_frame() -> Dict[str, np.ndarray]:
+    frame = {'Date': np.array([], dtype='datetime64[D]')}
+    frame.update({column: np.array([], dtype=float) for column in COLUMNS})
+    return frame
+
+def yfinance_fetcher(ticker: str, start: np.datetime64, end: np.datetime64) -> Dict[str, np.ndarray]:
+    """Download daily bars from Yahoo Finance (needs network access)."""
+    import yfinance as yf
+
+    df = yf.Ticker(ticker).history(start=str(start), end=str(end), auto_adjust=True)
+    if df.empty:
+        return _empty_frame()
+    index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    frame = {'Date': index.values.astype('datetime64[D]')}
+    for column in COLUMNS:
+        if column in df:
+            frame[column] = df[column].to_numpy(dtype=float)
+        else:
+            frame[column] = np.full(len(df), 0.0 if column in EVENT_COLUMNS else np.nan)
+    return frame
+
+class FixtureFetcher:
+    """Serve bars from local CSV files (<directory>/<TICKER>.csv) instead of the network.
+
+    Files have a header row with Date and any of the COLUMNS; missing
+    Dividends and Stock Splits are filled with zero, other columns with NaN.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def __call__(self, ticker: str, start: np.datetime64, end: np.datetime64) -> Dict[str, np.ndarray]:
+        path = os.path.join(self.directory, f"{_check_ticker(ticker)}.csv")
+        if not os.path.exists(path):
+            raise KeyError(f"No fixture for ticker {ticker!r} in {self.directory}")
+        with open(path, encoding='utf-8') as f:
+            header = [name.strip() for name in f.readline().split(',')]
+            rows = [line.strip().split(',') for line in f if line.strip()]
+        dates = np.array([row[header.index('Date')][:10] for row in rows], dtype='datetime64[D]')
+        keep = (dates >= start) & (dates < end)
+        frame = {'Date': dates[keep]}
+        for column in COLUMNS:
+            if column in header:
+                values = np.array([float(row[header.index(column)]) for row in rows])
+            else:
+                values = np.full(len(rows), 0.0 if column in EVENT_COLUMNS else np.nan)
+            frame[column] = values[keep]
+        return frame
+
+class SyntheticFetcher:
+    """Deterministic geometric Brownian motion bars on business days.
+
+    Each ticker gets its own reproducible path, so the same (ticker, date)
+    always has the same prices no matter which range is requested.
+    """
+
+    def __init__(self, seed: int = 0, s0: float = 100.0, mu: float = 0.07, sigma: float = 0.25,
+                 origin: str = '2000-01-03'):
+        self.seed = seed
+        self.s0 = s0
+        self.mu = mu
+        self.sigma = sigma
+        self.origin = np.datetime64(origin, 'D')
+
+    def __call__(self, ticker: str, start: np.datetime64, end: np.datetime64) -> Dict[str, np.ndarray]:
+        start = max(start, self.origin)
+        if end <= start:
+            return _empty_frame()
+        days = np.arange(self.origin, end, dtype='datetime64[D]')
+        days = days[np.is_busday(days)]
+        ticker_key = int.from_bytes(hashlib.sha1(ticker.upper().encode()).digest()[:8], 'little')
+        rng = np.random.default_rng([self.seed, ticker_key])
+        dt = 1.0 / 252
+        log_returns = (self.mu - 0.5 * self.sigma**2) * dt + self.sigma * np.sqrt(dt) * rng.standard_normal((len(days), 3))
+        close = self.s0 * np.exp(np.cumsum(log_returns[:, 0]))
+        spread = np.abs(log_returns[:, 1:]) * close[:, None]
+        frame = {
+            'Date': days,
+            'Open': close * np.exp(-log_returns[:, 0] / 2),
+            'High': close + spread[:, 0],
+            'Low': close - spread[:, 1],
+            'Close': close,
+            'Volume': np.floor(1e6 * (1 + np.abs(log_returns[:, 1]) * 50)),
+            'Dividends': np.zeros(len(days)),
+            'Stock Splits': np.zeros(len(days))
+        }
+        frame['High'] = np.maximum(frame['High'], frame['Open'])
+        frame['Low'] = np.minimum(frame['Low'], frame['Open'])
+        keep = days >= start
+        return {column: values[keep] for column, values in frame.items()}
+
+def fetcher_from_env() -> Fetcher:
+    """Pick a fetcher from MARKET_DATA_PROVIDER: yfinance (default), fixtures or synthetic."""
+    provider = os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+    if provider == 'yfinance':
+        return yfinance_fetcher
+    if provider == 'fixtures':
+        return FixtureFetcher(os.getenv("MARKET_DATA_FIXTURES", DEFAULT_FIXTURES_DIR))
+    if provider == 'synthetic':
+        return SyntheticFetcher(seed=int(os.getenv("MARKET_DATA_SEED", 0)))
+    raise ValueError(f"Unknown MARKET_DATA_PROVIDER {provider!r}")
+
+def _subtract(start: np.datetime64, end: np.datetime64, covered: List[Tuple[np.datetime64, np.datetime64]]):
+    """Parts of [start, end) not inside any of the (sorted, disjoint) covered ranges."""
+    gaps = []
+    cursor = start
+    for lo, hi in covered:
+        if hi <= cursor:
+            continue
+        if lo >= end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+def _merge(ranges: List[Tuple[np.datetime64, np.datetime64]]):
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+class MarketDataCache:
+    """On-disk daily bars, one directory of .npy columns per ticker.
+
+    Each column (Date, Open, ..., Stock Splits) is a plain NumPy array file
+    sorted by date, so reads are memory-mapped slices found by binary
+    search. A small meta.json records which date ranges have been fetched;
+    a request only fetches the parts of its range that are not covered yet
+    (weekends and holidays inside a covered range are known to have no data
+    and are not fetched again). Ranges reaching today or later are not
+    marked as covered, so the latest bar is refreshed on the next request.
+
+    Prices are adjusted, and a new split or dividend rescales every earlier
+    bar. Each fill therefore re-reads the last stored bar (inside a covered
+    range) alongside the gaps; if its price has changed, the stored bars
+    are on an old adjustment basis and the ticker is fetched afresh rather
+    than mixing the two.
+
+    Every update writes a new snapshot directory (columns plus meta.json)
+    and then publishes it by atomically replacing the CURRENT pointer, so
+    readers in any thread or process always see one consistent snapshot
+    without locking. Writers are serialized per ticker by a thread lock
+    and, where fcntl is available, a file lock across processes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, fetcher: Optional[Fetcher] = None):
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher if fetcher is not None else fetcher_from_env()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.fetches = 0
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, _check_ticker(ticker))
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    @contextlib.contextmanager
+    def _writer_lock(self, ticker: str):
+        with self._lock(ticker):
+            if fcntl is None:
+                yield
+                return
+            directory = self._dir(ticker)
+            os.makedirs(directory, exist_ok=True)
+            fd = os.open(os.path.join(directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _read(self, ticker: str) -> Tuple[Optional[str], List[Tuple[np.datetime64, np.datetime64]], Dict[str, np.ndarray]]:
+        """(snapshot name, covered ranges, columns) of the published snapshot, read consistently."""
+        directory = self._dir(ticker)
+        pointer = os.path.join(directory, CURRENT_FILE)
+        for _ in range(READ_ATTEMPTS):
+            try:
+                with open(pointer, encoding='utf-8') as f:
+                    name = f.read().strip()
+            except FileNotFoundError:
+                break
+            snapshot = os.path.join(directory, name)
+            try:
+                with open(os.path.join(snapshot, 'meta.json'), encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get('format') != CACHE_FORMAT:
+                    break
+                # Once opened, the maps stay valid even if the snapshot is pruned
+                frame = {column: np.load(os.path.join(snapshot, _column_file(column)), mmap_mode='r')
+                         for column in ('Date',) + COLUMNS}
+            except FileNotFoundError:
+                # A writer published and pruned snapshots since the pointer was read; read it again
+                continue
+            return name, [(_to_day(lo), _to_day(hi)) for lo, hi in meta['covered']], frame
+        return None, [], _empty_frame()
+
+    def _store(self, ticker: str, frame: Dict[str, np.ndarray], covered, previous: Optional[str]):
+        directory = self._dir(ticker)
+        os.makedirs(directory, exist_ok=True)
+        snapshot = tempfile.mkdtemp(dir=directory, prefix=SNAPSHOT_PREFIX)
+        for column, values in frame.items():
+            np.save(os.path.join(snapshot, _column_file(column)), values)
+        with open(os.path.join(snapshot, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'ticker': ticker.upper(), 'format': CACHE_FORMAT,
+                       'covered': [[str(lo), str(hi)] for lo, hi in covered]}, f)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(os.path.basename(snapshot))
+        os.replace(tmp, os.path.join(directory, CURRENT_FILE))
+        # Keep the snapshot just replaced for readers that are still opening it
+        keep = {os.path.basename(snapshot), previous, CURRENT_FILE, LOCK_FILE}
+        for entry in os.listdir(directory):
+            if entry not in keep:
+                path = os.path.join(directory, entry)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+
+    def missing_ranges(self, ticker: str, start, end) -> List[Tuple[np.datetime64, np.datetime64]]:
+        """Date ranges within [start, end) that would have to be fetched."""
+        return _subtract(_to_day(start), _to_day(end), self._read(ticker)[1])
+
+    def _fetch_gaps(self, ticker: str, gaps, stored: Dict[str, np.ndarray], covered) -> List[Optional[Dict[str, np.ndarray]]]:
+        """Fetch each gap, plus the last covered stored bar to check its adjustment basis.
+
+        Returns one frame per fetch, with None appended if the stored bars
+        are on a different basis from the fresh ones.
+        """
+        dates = np.asarray(stored['Date'], dtype='datetime64[D]')
+        in_covered = np.zeros(len(dates), dtype=bool)
+        for lo, hi in covered:
+            in_covered |= (dates >= lo) & (dates < hi)
+        anchor = dates[in_covered][-1] if in_covered.any() else None
+
+        parts, anchor_frame = [], None
+        for lo, hi in gaps:
+            if anchor is not None and anchor_frame is None and anchor < lo <= anchor + ANCHOR_WINDOW:
+                lo = anchor
+            part = self.fetcher(ticker, lo, hi)
+            self.fetches += 1
+            parts.append(part)
+            if lo == anchor:
+                anchor_frame = part
+        if anchor is None:
+            return parts
+        if anchor_frame is None:
+            anchor_frame = self.fetcher(ticker, anchor, anchor + 1)
+            self.fetches += 1
+        fresh = np.asarray(anchor_frame['Close'])[np.asarray(anchor_frame['Date'], dtype='datetime64[D]') == anchor]
+        stored_close = stored['Close'][np.flatnonzero(dates == anchor)[-1]]
+        if len(fresh) and not np.isclose(fresh[0], stored_close, rtol=1e-9, equal_nan=True):
+            parts.append(None)
+        return parts
+
+    def _fill(self, ticker: str, start: np.datetime64, end: np.datetime64):
+        if not _subtract(start, end, self._read(ticker)[1]):
+            return
+        with self._writer_lock(ticker):
+            # Re-read under the lock: another writer may have filled the gaps meanwhile
+            name, covered, stored = self._read(ticker)
+            gaps = _subtract(start, end, covered)
+            if not gaps:
+                return
+            parts = [stored] + self._fetch_gaps(ticker, gaps, stored, covered)
+            if parts[-1] is None:
+                # A corporate action since the stored bars were fetched: start again on the new basis
+                covered, gaps = [], [(start, end)]
+                parts = self._fetch_gaps(ticker, gaps, _empty_frame(), covered)
+            # Reversed so that np.unique keeps the latest fetch for dates already stored
+            dates = np.concatenate([np.asarray(p['Date'], dtype='datetime64[D]') for p in parts])[::-1]
+            frame = {}
+            frame['Date'], pick = np.unique(dates, return_index=True)
+            for column in COLUMNS:
+                frame[column] = np.concatenate([np.asarray(p[column], dtype=float) for p in parts])[::-1][pick]
+            today = np.datetime64('today', 'D')
+            newly_covered = [(lo, min(hi, today)) for lo, hi in gaps if min(hi, today) > lo]
+            self._store(ticker, frame, _merge(covered + newly_covered), previous=name)
+
+    def get(self, ticker: str, start, end) -> Dict[str, np.ndarray]:
+        """Daily bars for ticker with dates in [start, end), fetching only what is missing.
+
+        Returns:
+        dict: 'Date' (datetime64[D]) and one array per column in COLUMNS;
+              the arrays are read-only views of memory-mapped files
+        """
+        start, end = _to_day(start), _to_day(end)
+        self._fill(ticker, start, end)
+        frame = self._read(ticker)[2]
+        lo, hi = np.searchsorted(frame['Date'], [start, end])
+        return {column: values[lo:hi] for column, values in frame.items()}
+
+    def get_many(self, tickers: Sequence[str], start, end, column: str = 'Close') -> Tuple[np.ndarray, np.ndarray]:
+        """One column for several tickers aligned on the union of their dates.
+
+        Returns:
+        tuple: (dates, values) where values has shape (len(dates), len(tickers))
+               and is NaN where a ticker has no bar on that date
+        """
+        if column not in COLUMNS:
+            raise ValueError(f"column must be one of {COLUMNS}")
+        frames = [self.get(ticker, start, end) for ticker in tickers]
+        dates = np.unique(np.concatenate([f['Date'] for f in frames])) if frames else np.array([], dtype='datetime64[D]')
+        values = np.full((len(dates), len(frames)), np.nan)
+        for j, frame in enumerate(frames):
+            values[np.searchsorted(dates, frame['Date']), j] = frame[column]
+        return dates, values
+
+_default_cache: Optional[MarketDataCache] = None
+
+def get_market_data_cache() -> MarketDataCache:
+    """Process-wide cache configured by MARKET_DATA_CACHE and MARKET_DATA_PROVIDER."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MarketDataCache(os.getenv("MARKET_DATA_CACHE", DEFAULT_CACHE_DIR))
+    return _default_cache
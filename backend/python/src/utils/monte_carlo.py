@@ -0,0 +1,181 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.black_scholes import black_scholes_price
+
+PAYOFF_TYPES = ['european', 'asian', 'up-and-out', 'down-and-out', 'up-and-in', 'down-and-in']
+
+# Broadie-Glasserman-Kou shift for discretely monitored barriers: zeta(1/2)/sqrt(2*pi)
+BGK_BETA = 0.5826
+
+def _simulate_chunk(args):
+    """
+    Simulate one chunk of GBM paths and return its sufficient statistics.
+
+    Runs in a worker process, so it takes a single picklable tuple and
+    returns only sums, never the paths themselves.
+
+    Returns:
+    ndarray: [n, sum(Y), sum(Y^2), sum(X), sum(X^2), sum(XY)] where Y is the
+             discounted payoff and X the discounted vanilla control payoff
+    """
+    (seed, n_paths, S, K, T, r, sigma, q, is_call, payoff, barrier,
+     n_steps, antithetic, continuity_correction) = args
+    rng = np.random.default_rng(seed)
+
+    dt = T / n_steps
+    drift = (r - q - 0.5 * sigma**2) * dt
+    vol = sigma * math.sqrt(dt)
+    discount = math.exp(-r * T)
+
+    n_draws = (n_paths + 1) // 2 if antithetic else n_paths
+    z = rng.standard_normal((n_draws, n_steps))
+    if antithetic:
+        z = np.concatenate([z, -z])
+
+    # Build log-price paths in place to keep one (paths x steps) array per chunk
+    z *= vol
+    z += drift
+    log_paths = np.cumsum(z, axis=1, out=z)
+    log_paths += math.log(S)
+    terminal = np.exp(log_paths[:, -1])
+
+    sign = 1.0 if is_call else -1.0
+    vanilla = np.maximum(sign * (terminal - K), 0.0)
+
+    if payoff == 'european':
+        y = vanilla
+    elif payoff == 'asian':
+        y = np.maximum(sign * (np.exp(log_paths).mean(axis=1) - K), 0.0)
+    else:
+        level = barrier
+        if continuity_correction:
+            # Discrete monitoring misses crossings between steps; pulling the barrier
+            # towards the spot makes the discrete estimate match continuous monitoring
+            shift = BGK_BETA * vol
+            level = barrier * math.exp(-shift if payoff.startswith('up') else shift)
+        if payoff.startswith('up'):
+            crossed = log_paths.max(axis=1) >= math.log(level)
+        else:
+            crossed = log_paths.min(axis=1) <= math.log(level)
+        alive = ~crossed if payoff.endswith('out') else crossed
+        y = np.where(alive, vanilla, 0.0)
+
+    y = discount * y
+    x = discount * vanilla
+    if antithetic:
+        # Average each antithetic pair so samples stay independent for the error estimate
+        y = 0.5 * (y[:n_draws] + y[n_draws:])
+        x = 0.5 * (x[:n_draws] + x[n_draws:])
+
+    return np.array([y.size, y.sum(), (y * y).sum(), x.sum(), (x * x).sum(), (x * y).sum()])
+
+def _estimate(stats, control_mean):
+    """
+    Turn accumulated sufficient statistics into a price and standard error.
+
+    If control_mean is given, applies the optimal control-variate adjustment.
+
+    Returns:
+    tuple: (price, standard_error)
+    """
+    n, sy, syy, sx, sxx, sxy = stats
+    mean_y = sy / n
+    var_y = max(syy / n - mean_y**2, 0.0)
+    if control_mean is None:
+        return mean_y, math.sqrt(var_y / n)
+
+    mean_x = sx / n
+    var_x = sxx / n - mean_x**2
+    cov_xy = sxy / n - mean_x * mean_y
+    if var_x <= 0:
+        return mean_y, math.sqrt(var_y / n)
+    beta = cov_xy / var_x
+    price = mean_y - beta * (mean_x - control_mean)
+    var_cv = max(var_y - cov_xy**2 / var_x, 0.0)
+    return price, math.sqrt(var_cv / n)
+
+def monte_carlo_price(S, K, T, r, sigma, q=0.0, option_type='call', payoff='european',
+                      barrier=None, n_paths=100_000, n_steps=252, chunk_size=10_000,
+                      antithetic=True, control_variate=True, continuity_correction=True,
+                      seed=None, n_workers=1):
+    """
+    Price a European, Asian or barrier option by Monte Carlo simulation of GBM paths.
+
+    Paths are simulated in fixed-size chunks, so peak memory is
+    O(chunk_size * n_steps) regardless of n_paths. Each chunk gets its own
+    child seed, which makes the result identical for any n_workers.
+
+    Parameters:
+    S: Current stock price
+    K: Strike price
+    T: Time to maturity (in years)
+    r: Risk-free interest rate
+    sigma: Volatility
+    q: Continuous dividend yield
+    option_type: 'call' or 'put'
+    payoff: One of PAYOFF_TYPES
+    barrier: Barrier level (required for barrier payoffs)
+    n_paths: Total number of simulated paths
+    n_steps: Monitoring/time steps per path
+    chunk_size: Paths per chunk
+    antithetic: Use antithetic variates
+    control_variate: Use the vanilla European payoff (known in closed form) as a control
+    continuity_correction: Shift the barrier so the result approximates continuous monitoring
+    seed: Seed for reproducible results
+    n_workers: Number of worker processes (1 runs in-process; None uses all cores)
+
+    Returns:
+    dict: price, standard_error, n_paths and a convergence trace of
+          (paths, price, standard_error) after each chunk
+    """
+    if payoff not in PAYOFF_TYPES:
+        raise ValueError(f"Unknown payoff: {payoff}")
+    if option_type not in ('call', 'put'):
+        raise ValueError("option_type must be 'call' or 'put'")
+    if payoff not in ('european', 'asian') and barrier is None:
+        raise ValueError(f"barrier is required for {payoff} options")
+    if n_paths <= 0 or chunk_size <= 0 or n_steps <= 0:
+        raise ValueError("n_paths, chunk_size and n_steps must be positive")
+
+    n_chunks = math.ceil(n_paths / chunk_size)
+    chunk_sizes = [chunk_size] * (n_chunks - 1) + [n_paths - chunk_size * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [
+        (seeds[i], chunk_sizes[i], S, K, T, r, sigma, q, option_type == 'call', payoff, barrier,
+         n_steps, antithetic, continuity_correction)
+        for i in range(n_chunks)
+    ]
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = min(n_workers, n_chunks)
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunk_stats = list(executor.map(_simulate_chunk, tasks))
+    else:
+        chunk_stats = [_simulate_chunk(task) for task in tasks]
+
+    control_mean = black_scholes_price(S, K, T, r, sigma, q, option_type) if control_variate else None
+
+    totals = np.zeros(6)
+    convergence = []
+    for stats in chunk_stats:
+        totals += stats
+        price, std_err = _estimate(totals, control_mean)
+        samples = int(totals[0])
+        convergence.append({
+            'paths': samples * 2 if antithetic else samples,
+            'price': price,
+            'standard_error': std_err
+        })
+
+    return {
+        'price': convergence[-1]['price'],
+        'standard_error': convergence[-1]['standard_error'],
+        'n_paths': convergence[-1]['paths'],
+        'convergence': convergence
+    }
@@ -0,0 +1,372 @@
+import re
+
+import numpy as np
+
+MIN_EIGENVALUE = 1e-4
+
+def nearest_correlation_matrix(correlations, min_eigenvalue=MIN_EIGENVALUE):
+    """
+    Project (a stack of) correlation matrices onto the positive definite cone.
+
+    Symmetrizes the input, clips eigenvalues at min_eigenvalue and rescales
+    back to a unit diagonal. This is a single spectral projection rather
+    than Higham's full alternating projection: it is exact for matrices that
+    are already valid and cheap enough to run on thousands of matrices.
+
+    Parameters:
+    correlations: Array of shape (..., n, n)
+    min_eigenvalue: Floor for the eigenvalues of the repaired matrix
+
+    Returns:
+    ndarray: Repaired correlation matrices, same shape as the input
+    """
+    corr = np.asarray(correlations, dtype=float)
+    corr = 0.5 * (corr + np.swapaxes(corr, -1, -2))
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    eigenvalues = np.maximum(eigenvalues, min_eigenvalue)
+    repaired = (eigenvectors * eigenvalues[..., None, :]) @ np.swapaxes(eigenvectors, -1, -2)
+
+    scale = 1.0 / np.sqrt(np.diagonal(repaired, axis1=-2, axis2=-1))
+    repaired = repaired * scale[..., :, None] * scale[..., None, :]
+    # Remove rounding asymmetry so downstream Cholesky factorizations succeed
+    return 0.5 * (repaired + np.swapaxes(repaired, -1, -2))
+
+def covariance_matrix(volatilities, correlations, repair=True):
+    """
+    Build (a stack of) covariance matrices from volatilities and correlations.
+
+    Parameters:
+    volatilities: Array of shape (..., n)
+    correlations: Array of shape (..., n, n)
+    repair: Project the correlations onto the nearest valid correlation matrix first
+
+    Returns:
+    ndarray: Covariance matrices of shape (..., n, n)
+    """
+    vols = np.asarray(volatilities, dtype=float)
+    corr = nearest_correlation_matrix(correlations) if repair else np.asarray(correlations, dtype=float)
+    return corr * vols[..., :, None] * vols[..., None, :]
+
+def _solve(cov, rhs):
+    """Solve cov @ x = rhs for a stack of SPD matrices via Cholesky factors."""
+    L = np.linalg.cholesky(cov)
+    y = np.linalg.solve(L, rhs[..., None])
+    return np.linalg.solve(np.swapaxes(L, -1, -2), y)[..., 0]
+
+def _portfolio_stats(weights, mu, cov, risk_free_rate):
+    """Expected return, volatility and Sharpe ratio for a stack of weight vectors."""
+    expected_return = np.einsum('...i,...i->...', weights, mu)
+    variance = np.einsum('...i,...ij,...j->...', weights, cov, weights)
+    volatility = np.sqrt(np.maximum(variance, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (expected_return - risk_free_rate) / volatility
+    return expected_return, volatility, sharpe
+
+def optimize_portfolios(returns, volatilities, correlations, risk_free_rate=0.0):
+    """
+    Solve the unconstrained max-Sharpe and minimum-variance portfolios for a stack of problems.
+
+    Weights sum to one and may be negative (short positions allowed). Every
+    problem in the stack is solved with the same batched Cholesky solves.
+
+    Parameters:
+    returns: Expected annual returns, shape (..., n)
+    volatilities: Annual volatilities, shape (..., n)
+    correlations: Correlation matrices, shape (..., n, n); repaired to be PSD
+    risk_free_rate: Risk-free rate used for the Sharpe ratio
+
+    Returns:
+    dict: For 'max_sharpe' and 'min_variance', the weights, expected_return,
+          volatility and sharpe_ratio arrays, plus the repaired 'covariance'.
+          'max_sharpe' also has a 'valid' mask: False where the excess returns
+          imply no tangency portfolio with positive weight sum
+    """
+    mu = np.asarray(returns, dtype=float)
+    cov = covariance_matrix(volatilities, correlations)
+
+    ones = np.ones_like(mu)
+    inv_ones = _solve(cov, ones)
+    inv_excess = _solve(cov, mu - risk_free_rate)
+
+    min_var_weights = inv_ones / inv_ones.sum(axis=-1, keepdims=True)
+    excess_total = inv_excess.sum(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        max_sharpe_weights = inv_excess / excess_total
+
+    result = {'covariance': cov}
+    for name, weights in (('max_sharpe', max_sharpe_weights), ('min_variance', min_var_weights)):
+        expected_return, volatility, sharpe = _portfolio_stats(weights, mu, cov, risk_free_rate)
+        result[name] = {
+            'weights': weights,
+            'expected_return': expected_return,
+            'volatility': volatility,
+            'sharpe_ratio': sharpe
+        }
+    result['max_sharpe']['valid'] = excess_total[..., 0] > 0
+    return result
+
+_PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+_ASSET_LIST_PATTERN = re.compile(r'\(([^)]*)\)')
+_UPPER_WORDS = ('exceed', 'maximum', 'at most', 'no more than', 'up to')
+_LOWER_WORDS = ('at least', 'minimum', 'no less than')
+
+def parse_constraints(constraints, n_assets, long_only=True):
+    """
+    Turn the generator's constraint sentences into bounds and group limits.
+
+    Understands sentences such as "No single asset can exceed 30% of the
+    portfolio", "At least 20% must be in low-risk assets (1 and 2)" and
+    "Maximum 40% in high-risk assets (4 and 5)". Asset numbers are 1-based
+    in the text and 0-based in the result.
+
+    Parameters:
+    constraints: List of constraint strings
+    n_assets: Number of assets in the problem
+    long_only: Use a lower bound of zero on every weight
+
+    Returns:
+    dict: 'lower_bounds' and 'upper_bounds' arrays, and 'groups', a list of
+          dicts with 'assets', 'min' and 'max' keys
+    """
+    lower = np.zeros(n_assets) if long_only else np.full(n_assets, -np.inf)
+    upper = np.full(n_assets, np.inf)
+    groups = []
+
+    for text in constraints or []:
+        lowered = text.lower()
+        percent = _PERCENT_PATTERN.search(lowered)
+        if percent is None:
+            raise ValueError(f"Constraint has no percentage: {text}")
+        limit = float(percent.group(1)) / 100.0
+
+        if any(word in lowered for word in _UPPER_WORDS):
+            is_upper = True
+        elif any(word in lowered for word in _LOWER_WORDS):
+            is_upper = False
+        else:
+            raise ValueError(f"Cannot tell whether constraint is a floor or a cap: {text}")
+
+        asset_list = _ASSET_LIST_PATTERN.search(lowered)
+        if asset_list is None:
+            if 'single asset' not in lowered and 'each asset' not in lowered:
+                raise ValueError(f"Constraint does not name its assets: {text}")
+            if is_upper:
+                upper = np.minimum(upper, limit)
+            else:
+                lower = np.maximum(lower, limit)
+            continue
+
+        assets = [int(a) - 1 for a in re.findall(r'\d+', asset_list.group(1))]
+        if not assets or min(assets) < 0 or max(assets) >= n_assets:
+            raise ValueError(f"Constraint refers to unknown assets: {text}")
+        groups.append({
+            'assets': assets,
+            'min': -np.inf if is_upper else limit,
+            'max': limit if is_upper else np.inf
+        })
+
+    return {'lower_bounds': lower, 'upper_bounds': upper, 'groups': groups}
+
+def _soft_threshold(v, threshold):
+    return np.sign(v) * np.maximum(np.abs(v) - threshold, 0.0)
+
+def _project_box_budget(v, lower, upper):
+    """Euclidean projection onto {w : sum(w) = 1, lower <= w <= upper}."""
+    # sum(clip(v - tau)) is non-increasing in tau, so bracket the shift and bisect
+    def total(tau):
+        return np.clip(v - tau, lower, upper).sum()
+
+    span = 1.0 + np.max(np.abs(v))
+    lo, hi = -span, span
+    for _ in range(60):
+        if total(lo) >= 1.0:
+            break
+        lo *= 2.0
+    for _ in range(60):
+        if total(hi) <= 1.0:
+            break
+        hi *= 2.0
+    for _ in range(100):
+        mid = 0.5 * (lo + hi)
+        if total(mid) > 1.0:
+            lo = mid
+        else:
+            hi = mid
+    return np.clip(v - 0.5 * (lo + hi), lower, upper)
+
+def _project_feasible(v, constraints, tolerance=1e-12, max_sweeps=1000):
+    """
+    Project weights onto the budget, box and group constraints.
+
+    Uses Dykstra's alternating projections between each group slab and the
+    budget-plus-box set. The budget-plus-box projection runs last, so the
+    result is always fully invested and within bounds; group limits hold to
+    within tolerance whenever the constraints are jointly feasible.
+    """
+    lower, upper = constraints['lower_bounds'], constraints['upper_bounds']
+    groups = constraints['groups']
+
+    def project_group(w, group):
+        w = w.copy()
+        total = w[group['assets']].sum()
+        if total > group['max']:
+            w[group['assets']] -= (total - group['max']) / len(group['assets'])
+        elif total < group['min']:
+            w[group['assets']] += (group['min'] - total) / len(group['assets'])
+        return w
+
+    projections = [lambda w, g=g: project_group(w, g) for g in groups]
+    projections.append(lambda w: _project_box_budget(w, lower, upper))
+    increments = [np.zeros_like(v) for _ in projections]
+    w = np.asarray(v, dtype=float)
+    for _ in range(max_sweeps if groups else 1):
+        for k, project in enumerate(projections):
+            shifted = w + increments[k]
+            w = project(shifted)
+            increments[k] = shifted - w
+        violation = max((max(w[g['assets']].sum() - g['max'], g['min'] - w[g['assets']].sum(), 0.0)
+                         for g in groups), default=0.0)
+        if violation <= tolerance:
+            break
+    return w
+
+def constrained_mean_variance(returns, cov, risk_aversion=1.0, constraints=None,
+                              transaction_costs=None, current_weights=None, warm_start=None,
+                              rho=0.1, sigma=1e-6, tolerance=1e-7, max_iterations=10_000):
+    """
+    Solve a fully invested mean-variance problem with bounds, group limits and linear costs.
+
+    Minimizes 0.5 * risk_aversion * w'Cw - mu'w + sum_i c_i |w_i - w0_i|
+    subject to sum(w) = 1, box bounds and group limits, using an
+    operator-splitting (ADMM) QP iteration in the style of OSQP. The linear
+    system is factored once per call; pass the returned 'state' back as
+    warm_start to resume from a previous solution, which is what makes
+    risk-aversion sweeps cheap.
+
+    Parameters:
+    returns: Expected annual returns, shape (n,)
+    cov: Covariance matrix, shape (n, n)
+    risk_aversion: Weight on the variance term
+    constraints: Output of parse_constraints (defaults to long-only)
+    transaction_costs: Proportional cost per unit of turnover for each asset
+    current_weights: Weights being rebalanced from (defaults to equal weight)
+    warm_start: 'state' dict from a previous call
+    rho: ADMM penalty parameter
+    sigma: Proximal regularization keeping the linear system positive definite
+    tolerance: Primal/dual residual tolerance
+    max_iterations: Iteration cap
+
+    Returns:
+    dict: weights (projected onto the constraints, so always fully invested
+          and within bounds), expected_return, volatility, transaction_cost,
+          iterations, converged and the solver 'state'
+    """
+    mu = np.asarray(returns, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    n = mu.shape[0]
+    if constraints is None:
+        constraints = parse_constraints([], n)
+
+    # Stack every linear map on w into M, with matching projection bounds for z = Mw
+    rows = [np.ones((1, n))]
+    lower = [np.array([1.0])]
+    upper = [np.array([1.0])]
+    for group in constraints['groups']:
+        row = np.zeros((1, n))
+        row[0, group['assets']] = 1.0
+        rows.append(row)
+        lower.append(np.array([group['min']]))
+        upper.append(np.array([group['max']]))
+    rows.append(np.eye(n))
+    lower.append(constraints['lower_bounds'])
+    upper.append(constraints['upper_bounds'])
+    n_projected = sum(r.shape[0] for r in rows)
+
+    if transaction_costs is not None:
+        costs = np.asarray(transaction_costs, dtype=float)
+        w0 = np.full(n, 1.0 / n) if current_weights is None else np.asarray(current_weights, dtype=float)
+        rows.append(np.eye(n))
+    M = np.vstack(rows)
+    lower = np.concatenate(lower)
+    upper = np.concatenate(upper)
+
+    # Equality rows get a much stiffer penalty, as in OSQP
+    rho_vec = np.full(M.shape[0], rho)
+    rho_vec[:n_projected][lower == upper] = rho * 1e3
+
+    # Deferred so that importing this module does not pull in scipy.linalg
+    from scipy.linalg import cho_factor, cho_solve
+
+    P = risk_aversion * cov
+    factor = cho_factor(P + sigma * np.eye(n) + M.T @ (rho_vec[:, None] * M))
+
+    if warm_start is not None and warm_start['x'].shape[0] == n and warm_start['z'].shape[0] == M.shape[0]:
+        x, z, y = warm_start['x'].copy(), warm_start['z'].copy(), warm_start['y'].copy()
+    else:
+        x = np.full(n, 1.0 / n)
+        z = M @ x
+        y = np.zeros(M.shape[0])
+
+    converged = False
+    for iteration in range(1, max_iterations + 1):
+        rhs = sigma * x + mu + M.T @ (rho_vec * z - y)
+        x = cho_solve(factor, rhs)
+
+        Mx = M @ x
+        v = Mx + y / rho_vec
+        z_prev = z
+        z = np.empty_like(v)
+        z[:n_projected] = np.clip(v[:n_projected], lower, upper)
+        if transaction_costs is not None:
+            z[n_projected:] = w0 + _soft_threshold(v[n_projected:] - w0, costs / rho_vec[n_projected:])
+        y = y + rho_vec * (Mx - z)
+
+        primal_residual = np.max(np.abs(Mx - z))
+        dual_residual = np.max(np.abs(M.T @ (rho_vec * (z - z_prev))))
+        if primal_residual < tolerance and dual_residual < tolerance:
+            converged = True
+            break
+
+    # The ADMM iterate only meets the constraints to within tolerance (or not at
+    # all when the iteration cap is hit), so report its projection onto them
+    weights = _project_feasible(x, constraints)
+    expected_return = float(mu @ weights)
+    volatility = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+    cost = float(costs @ np.abs(weights - w0)) if transaction_costs is not None else 0.0
+    return {
+        'weights': weights,
+        'expected_return': expected_return,
+        'volatility': volatility,
+        'transaction_cost': cost,
+        'iterations': iteration,
+        'converged': converged,
+        'state': {'x': x, 'z': z, 'y': y}
+    }
+
+def efficient_frontier(returns, cov, risk_aversions, warm_start=True, **kwargs):
+    """
+    Sweep risk aversion and solve the constrained problem at each level.
+
+    With warm_start=True each solve resumes from the previous point's
+    solver state instead of starting cold.
+
+    Parameters:
+    returns: Expected annual returns, shape (n,)
+    cov: Covariance matrix, shape (n, n)
+    risk_aversions: Iterable of risk-aversion levels
+    warm_start: Reuse the previous solution as the starting point
+    **kwargs: Passed through to constrained_mean_variance
+
+    Returns:
+    list: One constrained_mean_variance result (without 'state') per level
+    """
+    frontier = []
+    state = None
+    for risk_aversion in risk_aversions:
+        result = constrained_mean_variance(returns, cov, risk_aversion, warm_start=state, **kwargs)
+        state = result.pop('state')
+        if not warm_start:
+            state = None
+        result['risk_aversion'] = float(risk_aversion)
+        frontier.append(result)
+    return frontier
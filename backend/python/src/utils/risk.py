@@ -0,0 +1,288 @@
+import math
+
+import numpy as np
+
+from utils.black_scholes import norm_cdf, norm_pdf
+
+RISK_METHODS = ['normal', 'student_t', 'historical', 'bootstrap']
+
+# Size of the (resamples x observations x positions) loss array bootstrap_var_es builds at once
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+def _confidence_levels(confidence_levels):
+    levels = np.atleast_1d(np.asarray(confidence_levels, dtype=float))
+    if levels.ndim != 1 or np.any((levels <= 0) | (levels >= 1)):
+        raise ValueError("confidence levels must be a 1-D list of values in (0, 1)")
+    return levels
+
+def _norm_ppf(p):
+    # Deferred so that importing this module does not pull in scipy
+    from scipy.special import ndtri
+    return ndtri(p)
+
+def _student_t_scale(df):
+    df = np.asarray(df, dtype=float)
+    if np.any(df <= 2):
+        raise ValueError("Student-t degrees of freedom must exceed 2 for a finite volatility")
+    # Scale that gives a Student-t variable the requested standard deviation
+    return np.sqrt((df - 2.0) / df)
+
+def _student_t_pdf(x, df):
+    from scipy.special import gammaln
+    log_norm = gammaln((df + 1.0) / 2.0) - gammaln(df / 2.0) - 0.5 * np.log(df * math.pi)
+    return np.exp(log_norm - (df + 1.0) / 2.0 * np.log1p(x * x / df))
+
+def parametric_var_es(mu, sigma, confidence_levels, positions=1.0, distribution='normal', df=None,
+                      horizon=1.0):
+    """
+    Value at Risk and Expected Shortfall for normal or Student-t returns.
+
+    A position p with return r loses -p * r, so short positions (p < 0)
+    are handled too. Returns over the horizon have mean mu * horizon and
+    standard deviation sigma * sqrt(horizon) (square-root-of-time for the
+    Student-t case). With Student-t returns sigma is still the standard
+    deviation, so the two distributions can be compared at the same
+    volatility.
+
+    Parameters:
+    mu: Mean return per period
+    sigma: Standard deviation of returns per period
+    confidence_levels: Confidence levels in (0, 1), shape (L,)
+    positions: Position values; broadcast against mu, sigma and df
+    distribution: 'normal' or 'student_t'
+    df: Student-t degrees of freedom (> 2)
+    horizon: Number of periods
+
+    Returns:
+    dict: 'var' and 'es' arrays shaped broadcast(positions, mu, sigma, df) + (L,),
+          as positive losses in the units of positions
+    """
+    levels = _confidence_levels(confidence_levels)
+    mu, sigma, positions = (np.asarray(x, dtype=float)[..., None] for x in (mu, sigma, positions))
+    if np.any(sigma < 0):
+        raise ValueError("sigma must be non-negative")
+    mean = mu * horizon
+    scale = sigma * math.sqrt(horizon)
+
+    if distribution == 'normal':
+        z = _norm_ppf(levels)
+        tail = norm_pdf(z) / (1.0 - levels)
+    elif distribution == 'student_t':
+        if df is None:
+            raise ValueError("df is required for the Student-t distribution")
+        from scipy.special import stdtrit
+        df = np.asarray(df, dtype=float)[..., None]
+        scale = scale * _student_t_scale(df)
+        z = stdtrit(df, levels)
+        tail = _student_t_pdf(z, df) / (1.0 - levels) * (df + z * z) / (df - 1.0)
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+
+    exposure = np.abs(positions) * scale
+    return {
+        'var': exposure * z - positions * mean,
+        'es': exposure * tail - positions * mean
+    }
+
+def loss_exceedance_probability(thresholds, mu, sigma, positions=1.0, distribution='normal', df=None,
+                                horizon=1.0):
+    """
+    Probability that a position loses more than each threshold.
+
+    Parameters mirror parametric_var_es; thresholds (shape (T,)) are
+    positive losses in the units of positions.
+
+    Returns:
+    ndarray: Probabilities shaped broadcast(positions, mu, sigma, df) + (T,)
+    """
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+    mu, sigma, positions = (np.asarray(x, dtype=float)[..., None] for x in (mu, sigma, positions))
+    mean_loss = -positions * mu * horizon
+    exposure = np.abs(positions) * sigma * math.sqrt(horizon)
+    if distribution == 'normal':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 1.0 - norm_cdf((thresholds - mean_loss) / exposure)
+    if distribution == 'student_t':
+        if df is None:
+            raise ValueError("df is required for the Student-t distribution")
+        from scipy.special import stdtr
+        df = np.asarray(df, dtype=float)[..., None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 1.0 - stdtr(df, (thresholds - mean_loss) / (exposure * _student_t_scale(df)))
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+def position_pnl(returns, positions):
+    """
+    P&L of each position per observation.
+
+    Parameters:
+    returns: Return history, shape (n,) or (n, assets)
+    positions: Scalar exposures, shape (P,), for 1-D returns; holdings,
+               shape (P, assets), for 2-D returns
+
+    Returns:
+    ndarray: P&L of shape (n, P)
+    """
+    returns = np.asarray(returns, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if returns.ndim == 1:
+        # Scalar exposures to one return series
+        return returns[:, None] * np.atleast_1d(positions)[None, :]
+    if returns.ndim == 2:
+        # Holdings in several assets: one row of positions per portfolio
+        return returns @ np.atleast_2d(positions).T
+    raise ValueError("returns must be 1-D (one series) or 2-D (observations x assets)")
+
+def _tail_var_es(losses, levels):
+    """Historical VaR/ES along axis -2 of losses (..., n, P), for every level at once."""
+    n = losses.shape[-2]
+    if n == 0:
+        raise ValueError("returns must not be empty")
+    # Worst losses first; the mean of the worst k is a cumulative sum divided by k
+    worst = -np.sort(-losses, axis=-2)
+    tail_counts = np.maximum(np.floor(n * (1.0 - levels) + 1e-9).astype(int), 1)
+    tail_means = np.cumsum(worst, axis=-2) / np.arange(1, n + 1)[:, None]
+    var = np.take(worst, tail_counts - 1, axis=-2)
+    es = np.take(tail_means, tail_counts - 1, axis=-2)
+    # (..., L, P) -> (..., P, L)
+    return np.swapaxes(var, -1, -2), np.swapaxes(es, -1, -2)
+
+def historical_var_es(returns, confidence_levels, positions=1.0):
+    """
+    Historical-simulation VaR and ES.
+
+    At confidence c over n observations, the tail is the k = floor(n(1-c))
+    worst losses (at least one): VaR is the smallest of them and ES their
+    mean. Every level is read off a single sort.
+
+    Parameters:
+    returns: Return history, shape (n,) or (n, assets)
+    confidence_levels: Confidence levels in (0, 1), shape (L,)
+    positions: Scalar exposures, shape (P,), for 1-D returns; holdings,
+               shape (P, assets), for 2-D returns
+
+    Returns:
+    dict: 'var' and 'es' arrays of shape (P, L), as positive losses
+    """
+    levels = _confidence_levels(confidence_levels)
+    var, es = _tail_var_es(-position_pnl(returns, positions), levels)
+    return {'var': var, 'es': es}
+
+def bootstrap_var_es(returns, confidence_levels, positions=1.0, n_resamples=1000, seed=None):
+    """
+    Bootstrap estimates of historical VaR and ES, with standard errors.
+
+    Each resample draws n observations with replacement from the history
+    (whole rows, so cross-asset dependence is kept). Resamples are
+    processed in chunks to bound memory.
+
+    Parameters:
+    returns, confidence_levels, positions: As for historical_var_es
+    n_resamples: Number of bootstrap resamples
+    seed: Seed for reproducible results
+
+    Returns:
+    dict: 'var', 'es', 'var_standard_error' and 'es_standard_error' arrays
+          of shape (P, L)
+    """
+    levels = _confidence_levels(confidence_levels)
+    if n_resamples < 2:
+        raise ValueError("n_resamples must be at least 2")
+    losses = -position_pnl(returns, positions)
+    n, n_positions = losses.shape
+    rng = np.random.default_rng(seed)
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // max(n * n_positions, 1))
+
+    var_sum = np.zeros((n_positions, len(levels)))
+    es_sum = np.zeros_like(var_sum)
+    var_sq = np.zeros_like(var_sum)
+    es_sq = np.zeros_like(var_sum)
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        var, es = _tail_var_es(losses[rng.integers(0, n, size=(size, n))], levels)
+        var_sum += var.sum(axis=0)
+        es_sum += es.sum(axis=0)
+        var_sq += (var * var).sum(axis=0)
+        es_sq += (es * es).sum(axis=0)
+
+    def mean_and_error(total, total_sq):
+        mean = total / n_resamples
+        variance = np.maximum(total_sq / n_resamples - mean * mean, 0.0) * n_resamples / (n_resamples - 1)
+        return mean, np.sqrt(variance)
+
+    var, var_error = mean_and_error(var_sum, var_sq)
+    es, es_error = mean_and_error(es_sum, es_sq)
+    return {'var': var, 'es': es, 'var_standard_error': var_error, 'es_standard_error': es_error}
+
+def var_es(method, confidence_levels, positions=1.0, returns=None, mu=None, sigma=None, df=None,
+           horizon=1.0, n_resamples=1000, seed=None):
+    """
+    VaR and ES by any method in RISK_METHODS.
+
+    'normal' and 'student_t' need mu and sigma (and df); 'historical' and
+    'bootstrap' need a return history. See the per-method functions for
+    shapes.
+
+    Returns:
+    dict: 'var' and 'es' (plus standard errors for 'bootstrap')
+    """
+    if method in ('normal', 'student_t'):
+        if mu is None or sigma is None:
+            raise ValueError(f"mu and sigma are required for the {method} method")
+        return parametric_var_es(mu, sigma, confidence_levels, positions, method, df, horizon)
+    if method in ('historical', 'bootstrap'):
+        if returns is None:
+            raise ValueError(f"returns are required for the {method} method")
+        if horizon != 1.0:
+            raise ValueError("Historical methods use the horizon of the returns themselves")
+        if method == 'historical':
+            return historical_var_es(returns, confidence_levels, positions)
+        return bootstrap_var_es(returns, confidence_levels, positions, n_resamples, seed)
+    raise ValueError(f"Unknown method: {method}")
+
+def normal_mixture_var_es(weights, means, stds, confidence_levels, tolerance=1e-10, max_iterations=200):
+    """
+    VaR and ES of a P&L distributed as a finite mixture of normals.
+
+    The VaR at each level solves P(loss > v) = 1 - c by bisection, for all
+    levels at once; ES then follows in closed form from the partial
+    expectations of each normal component.
+
+    Parameters:
+    weights: Component probabilities, shape (K,); renormalized to sum to one
+    means: Component P&L means, shape (K,)
+    stds: Component P&L standard deviations (> 0), shape (K,)
+    confidence_levels: Confidence levels in (0, 1), shape (L,)
+
+    Returns:
+    dict: 'var' and 'es' arrays of shape (L,), as positive losses, and
+          'loss_probability', the probability of any loss
+    """
+    levels = _confidence_levels(confidence_levels)
+    weights, means, stds = (np.asarray(x, dtype=float) for x in (weights, means, stds))
+    if np.any(stds <= 0):
+        raise ValueError("component standard deviations must be positive")
+    weights = weights / weights.sum()
+    # Loss components
+    loss_means = -means
+
+    def tail_probability(v):
+        return (weights * (1.0 - norm_cdf((v[:, None] - loss_means) / stds))).sum(axis=1)
+
+    lo = np.full(len(levels), np.min(loss_means - 40 * stds))
+    hi = np.full(len(levels), np.max(loss_means + 40 * stds))
+    target = 1.0 - levels
+    for _ in range(max_iterations):
+        mid = 0.5 * (lo + hi)
+        above = tail_probability(mid) > target
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+        if np.max(hi - lo) < tolerance:
+            break
+    var = 0.5 * (lo + hi)
+
+    a = (var[:, None] - loss_means) / stds
+    partial = weights * (loss_means * (1.0 - norm_cdf(a)) + stds * norm_pdf(a))
+    es = partial.sum(axis=1) / target
+    loss_probability = float((weights * norm_cdf(loss_means / stds)).sum())
+    return {'var': var, 'es': es, 'loss_probability': loss_probability}
@@ -0,0 +1,165 @@
+import math
+
+import numpy as np
+
+PROCESS_TYPES = ['brownian', 'gbm', 'ou']
+
+def _validate(process, n_steps, T):
+    if process not in PROCESS_TYPES:
+        raise ValueError(f"Unknown process: {process}")
+    if n_steps <= 0 or T <= 0:
+        raise ValueError("n_steps and T must be positive")
+
+def simulate_paths(process, n_paths, n_steps, T=1.0, x0=None, mu=0.0, sigma=1.0,
+                   theta=1.0, long_run_mean=0.0, rng=None):
+    """
+    Simulate a batch of paths as one (n_paths, n_steps + 1) array.
+
+    Parameters:
+    process: 'brownian' (X = x0 + mu t + sigma W), 'gbm' (dS = mu S dt + sigma S dW)
+             or 'ou' (dX = theta (long_run_mean - X) dt + sigma dW)
+    n_paths: Number of paths
+    n_steps: Number of time steps
+    T: Time horizon
+    x0: Starting value (defaults to 0, or 1 for GBM)
+    mu: Drift
+    sigma: Volatility
+    theta: OU mean-reversion speed
+    long_run_mean: OU long-run mean
+    rng: numpy.random.Generator (a fresh default_rng() if None)
+
+    Returns:
+    ndarray: Paths including the starting value in column 0
+    """
+    _validate(process, n_steps, T)
+    rng = np.random.default_rng() if rng is None else rng
+    if x0 is None:
+        x0 = 1.0 if process == 'gbm' else 0.0
+    dt = T / n_steps
+
+    paths = np.empty((n_paths, n_steps + 1))
+    paths[:, 0] = x0
+    z = rng.standard_normal((n_paths, n_steps))
+
+    if process == 'brownian':
+        z *= sigma * math.sqrt(dt)
+        z += mu * dt
+        np.cumsum(z, axis=1, out=paths[:, 1:])
+        paths[:, 1:] += x0
+    elif process == 'gbm':
+        # Exact log-space solution from Ito's lemma
+        z *= sigma * math.sqrt(dt)
+        z += (mu - 0.5 * sigma**2) * dt
+        np.cumsum(z, axis=1, out=paths[:, 1:])
+        np.exp(paths[:, 1:], out=paths[:, 1:])
+        paths[:, 1:] *= x0
+    else:
+        # Exact OU transition: X(t+dt) = m + (X(t) - m) e^{-theta dt} + noise
+        decay = math.exp(-theta * dt)
+        noise_sd = sigma * math.sqrt((1.0 - decay**2) / (2.0 * theta)) if theta > 0 else sigma * math.sqrt(dt)
+        z *= noise_sd
+        for i in range(n_steps):
+            paths[:, i + 1] = long_run_mean + (paths[:, i] - long_run_mean) * decay + z[:, i]
+    return paths
+
+def iter_path_chunks(process, n_paths, n_steps, chunk_size=10_000, seed=None, **params):
+    """
+    Yield paths in chunks of at most chunk_size rows.
+
+    Each chunk draws from its own child seed, so the concatenated output is
+    the same for a given seed regardless of how the caller consumes it.
+
+    Yields:
+    ndarray: (rows, n_steps + 1) path chunks
+    """
+    n_chunks = max(math.ceil(n_paths / chunk_size), 1)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        rows = min(chunk_size, n_paths - i * chunk_size)
+        yield simulate_paths(process, rows, n_steps, rng=np.random.default_rng(child), **params)
+
+def simulate_to_memmap(filename, process, n_paths, n_steps, chunk_size=10_000, seed=None, **params):
+    """
+    Write a large simulation to a .npy file chunk by chunk.
+
+    The result can be reopened with np.load(filename, mmap_mode='r') without
+    reading it all into memory.
+
+    Returns:
+    numpy.memmap: The written (n_paths, n_steps + 1) array, opened read-only
+    """
+    out = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float64, shape=(n_paths, n_steps + 1))
+    row = 0
+    for chunk in iter_path_chunks(process, n_paths, n_steps, chunk_size, seed, **params):
+        out[row:row + chunk.shape[0]] = chunk
+        row += chunk.shape[0]
+    out.flush()
+    del out
+    return np.load(filename, mmap_mode='r')
+
+def path_statistics(process, n_paths, n_steps, T=1.0, chunk_size=10_000, seed=None,
+                    level=None, **params):
+    """
+    Compute summary statistics over a simulation without keeping the paths.
+
+    Statistics are accumulated chunk by chunk (Chan's parallel update for the
+    mean and variance), so memory is O(chunk_size * n_steps).
+
+    Parameters:
+    process: One of PROCESS_TYPES
+    n_paths: Number of paths
+    n_steps: Number of time steps
+    T: Time horizon
+    chunk_size: Paths per chunk
+    seed: Seed for reproducible results
+    level: Optional level for first-hitting-time statistics
+    **params: Process parameters passed to simulate_paths
+
+    Returns:
+    dict: times, mean and variance at each time, the mean/variance of the
+          terminal quadratic variation, and (if level is given) the fraction
+          of paths that hit the level and their mean hitting time
+    """
+    _validate(process, n_steps, T)
+    times = np.linspace(0.0, T, n_steps + 1)
+    count = 0
+    mean = np.zeros(n_steps + 1)
+    m2 = np.zeros(n_steps + 1)
+    qv_sum = 0.0
+    qv_sq_sum = 0.0
+    hits = 0
+    hit_time_sum = 0.0
+
+    for chunk in iter_path_chunks(process, n_paths, n_steps, chunk_size, seed, T=T, **params):
+        rows = chunk.shape[0]
+        chunk_mean = chunk.mean(axis=0)
+        chunk_m2 = ((chunk - chunk_mean)**2).sum(axis=0)
+        delta = chunk_mean - mean
+        total = count + rows
+        mean += delta * rows / total
+        m2 += chunk_m2 + delta**2 * count * rows / total
+        count = total
+
+        qv = (np.diff(chunk, axis=1)**2).sum(axis=1)
+        qv_sum += qv.sum()
+        qv_sq_sum += (qv * qv).sum()
+
+        if level is not None:
+            start = chunk[0, 0]
+            crossed = chunk >= level if level >= start else chunk <= level
+            hit = crossed.any(axis=1)
+            hits += int(hit.sum())
+            hit_time_sum += times[crossed[hit].argmax(axis=1)].sum()
+
+    qv_mean = qv_sum / count
+    stats = {
+        'times': times,
+        'mean': mean,
+        'variance': m2 / max(count - 1, 1),
+        'quadratic_variation_mean': qv_mean,
+        'quadratic_variation_variance': max(qv_sq_sum / count - qv_mean**2, 0.0),
+        'n_paths': count
+    }
+    if level is not None:
+        stats['hit_probability'] = hits / count
+        stats['mean_hitting_time'] = hit_time_sum / hits if hits else None
+    return stats
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The application imports its packages relative to src/, as uvicorn does when started from there
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
@@ -0,0 +1,121 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from services import compression
+from services.compression import CompressionMiddleware, choose_encoding
+
+BODY = b'{"values":[' + b','.join(b'%d' % i for i in range(1000)) + b']}'
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip', 'gzip'),
+    ('br;q=0.5, gzip;q=0.8', 'gzip'),
+    ('*', 'br'),
+    ('br;q=0, *;q=0.1', 'gzip'),
+    ('identity', None),
+    ('gzip;q=bogus', None),
+    ('', None),
+])
+def test_choose_encoding(header, expected):
+    pytest.importorskip('brotli')
+    assert choose_encoding(header) == expected
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert choose_encoding('br, gzip;q=0.5') == 'gzip'
+    assert choose_encoding('br') is None
+
+def _app():
+    app = FastAPI()
+
+    @app.get('/large')
+    async def large():
+        return Response(BODY, media_type='application/json', headers={'ETag': '"abc"', 'Vary': 'Origin'})
+
+    @app.get('/small')
+    async def small():
+        return Response(b'{"ok":true}', media_type='application/json', headers={'ETag': '"abc"'})
+
+    @app.get('/events')
+    async def events():
+        return Response(BODY, media_type='text/event-stream')
+
+    @app.get('/encoded')
+    async def encoded():
+        return Response(gzip.compress(BODY), media_type='application/json', headers={'Content-Encoding': 'gzip'})
+
+    @app.get('/stream')
+    async def stream():
+        async def lines():
+            for i in range(3):
+                yield b'{"line":%d}\n' % i
+        return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+@pytest.fixture(scope='module')
+def client():
+    return TestClient(_app())
+
+def test_large_response_is_gzipped_with_weak_etag_and_vary(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.content == BODY
+    assert response.headers['etag'] == 'W/"abc"'
+    assert response.headers['vary'] == 'Origin, Accept-Encoding'
+    assert int(response.headers['content-length']) < len(BODY)
+
+def test_large_response_is_brotli_encoded_when_preferred(client):
+    # httpx decodes br whenever the brotli package is installed
+    pytest.importorskip('brotli')
+    response = client.get('/large', headers={'Accept-Encoding': 'br'})
+    assert response.headers['content-encoding'] == 'br'
+    assert response.content == BODY
+
+@pytest.mark.parametrize('path', ['/small', '/events', '/encoded'])
+def test_small_event_stream_and_pre_encoded_bodies_pass_through(client, path):
+    response = client.get(path, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers.get('content-encoding') == ('gzip' if path == '/encoded' else None)
+    assert 'W/' not in response.headers.get('etag', '')
+
+def test_no_accept_encoding_means_identity(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+    assert response.content == BODY
+    assert response.headers['etag'] == '"abc"'
+
+def test_streamed_chunks_are_flushed_as_they_are_produced():
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client never disconnects; StreamingResponse cancels this once the body is sent
+        await asyncio.Event().wait()
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/stream', 'raw_path': b'/stream', 'query_string': b'',
+             'headers': [(b'accept-encoding', b'gzip')], 'http_version': '1.1', 'scheme': 'http',
+             'server': ('test', 80), 'client': ('127.0.0.1', 0), 'root_path': ''}
+    asyncio.run(_app()(scope, receive, send))
+
+    start = sent[0]
+    assert dict(start['headers'])[b'content-encoding'] == b'gzip'
+    assert b'content-length' not in dict(start['headers'])
+
+    # Every chunk decodes to the lines sent so far, without waiting for the end of the stream
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoded = [decoder.decompress(m['body']) for m in sent[1:] if m['type'] == 'http.response.body']
+    assert decoded[:3] == [b'{"line":0}\n', b'{"line":1}\n', b'{"line":2}\n']
+    assert b''.join(decoded) + decoder.flush() == b'{"line":0}\n{"line":1}\n{"line":2}\n'
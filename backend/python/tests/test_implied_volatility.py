@@ -0,0 +1,32 @@
+import numpy as np
+
+from utils.black_scholes import black_scholes_price, black_scholes_vega
+from utils.implied_volatility import implied_volatility
+
+def test_recovers_volatility_across_a_surface():
+    strikes, maturities = np.meshgrid(np.linspace(60.0, 160.0, 11), [0.05, 0.25, 1.0, 3.0])
+    sigmas = 0.1 + 0.4 * np.random.default_rng(5).random(strikes.shape)
+    for option_type in ('call', 'put'):
+        prices = black_scholes_price(100.0, strikes, maturities, 0.03, sigmas, q=0.01, option_type=option_type)
+        result = implied_volatility(prices, 100.0, strikes, maturities, 0.03, q=0.01, option_type=option_type)
+        assert result['converged'].all()
+        repriced = black_scholes_price(100.0, strikes, maturities, 0.03, result['implied_volatility'], q=0.01,
+                                       option_type=option_type)
+        np.testing.assert_allclose(repriced, prices, atol=1e-8)
+        # Far from the money at short maturities the price barely depends on volatility
+        informative = black_scholes_vega(100.0, strikes, maturities, 0.03, sigmas, q=0.01) > 1e-2
+        np.testing.assert_allclose(result['implied_volatility'][informative], sigmas[informative], atol=1e-6)
+
+def test_mixed_calls_and_puts_in_one_batch():
+    option_type = np.array(['call', 'put', 'call', 'put'])
+    strikes = np.array([90.0, 90.0, 110.0, 110.0])
+    prices = np.array([black_scholes_price(100.0, k, 0.5, 0.02, 0.35, option_type=t)
+                       for k, t in zip(strikes, option_type)])
+    result = implied_volatility(prices, 100.0, strikes, 0.5, 0.02, option_type=option_type)
+    np.testing.assert_allclose(result['implied_volatility'], 0.35, atol=1e-6)
+
+def test_prices_outside_no_arbitrage_bounds_are_nan():
+    # Below intrinsic value, above the spot, and expired
+    result = implied_volatility([5.0, 120.0, 10.0], 100.0, [90.0, 100.0, 100.0], [1.0, 1.0, 0.0], 0.0)
+    assert np.isnan(result['implied_volatility']).all()
+    assert not result['converged'].any()
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from services.ingestion import content_id, load_store, run_ingestion, write_store
+
+def _problem(question, title='Problem'):
+    return {'title': title, 'type': 'probability', 'difficulty': 'easy', 'question': question}
+
+def _write_source(path, *questions):
+    path.write_text(''.join(json.dumps(_problem(q)) + '\n' for q in questions), encoding='utf-8')
+
+@pytest.fixture
+def layout(tmp_path):
+    sources = tmp_path / 'sources'
+    sources.mkdir()
+    store = tmp_path / 'store.jsonl'
+    manifest = tmp_path / 'manifest.json'
+
+    def ingest():
+        return run_ingestion(str(sources), str(store), str(manifest))
+
+    def questions():
+        return sorted(p['question'] for p in load_store(str(store)))
+
+    return sources, store, manifest, ingest, questions
+
+def test_unchanged_sources_are_skipped_and_ids_are_content_derived(layout):
+    sources, store, _, ingest, questions = layout
+    _write_source(sources / 'a.jsonl', 'Roll two dice.', 'Flip a coin.')
+    assert ingest() == {'scanned': 1, 'changed': 1, 'added': 2, 'removed': 0}
+    assert ingest() == {'scanned': 1, 'changed': 0, 'added': 0, 'removed': 0}
+
+    ids = {p['question']: p['id'] for p in load_store(str(store))}
+    assert ids['Flip a coin.'] == content_id(_problem('Flip a coin.'))
+
+    # Editing one problem keeps the other's id and swaps the edited one
+    _write_source(sources / 'a.jsonl', 'Roll two dice.', 'Flip three coins.')
+    assert ingest() == {'scanned': 1, 'changed': 1, 'added': 1, 'removed': 1}
+    assert questions() == ['Flip three coins.', 'Roll two dice.']
+    assert {p['question']: p['id'] for p in load_store(str(store))}['Roll two dice.'] == ids['Roll two dice.']
+
+def test_duplicates_across_files_are_stored_once(layout):
+    sources, _, manifest, ingest, questions = layout
+    _write_source(sources / 'a.jsonl', 'Roll two dice.')
+    _write_source(sources / 'b.jsonl', 'roll  TWO dice', 'Flip a coin.')
+    ingest()
+    assert questions() == ['Flip a coin.', 'Roll two dice.']
+
+    # Both files are recorded as containing the shared problem
+    files = json.loads(manifest.read_text())['files']
+    shared = content_id(_problem('Roll two dice.'))
+    assert shared in files['a.jsonl']['ids'] and shared in files['b.jsonl']['ids']
+
+@pytest.mark.parametrize('change', ['delete', 'edit'])
+def test_shared_problem_survives_losing_its_first_source(layout, change):
+    sources, _, _, ingest, questions = layout
+    _write_source(sources / 'a.jsonl', 'Roll two dice.')
+    _write_source(sources / 'b.jsonl', 'Roll two dice.', 'Flip a coin.')
+    ingest()
+
+    if change == 'delete':
+        (sources / 'a.jsonl').unlink()
+    else:
+        _write_source(sources / 'a.jsonl', 'Draw a card.')
+    result = ingest()
+    assert result['removed'] == 0
+    assert 'Roll two dice.' in questions()
+
+    # Once the last file containing it goes, so does the problem
+    (sources / 'b.jsonl').unlink()
+    ingest()
+    assert 'Roll two dice.' not in questions()
+
+def test_hand_written_problems_are_not_claimed_by_sources(layout):
+    sources, store, _, ingest, _ = layout
+    write_store([{'id': 1, **_problem('Roll two dice.'), 'solution': '', 'description': ''}], str(store))
+    _write_source(sources / 'a.jsonl', 'Roll two dice.', 'Flip a coin.')
+    ingest()
+    (sources / 'a.jsonl').unlink()
+    ingest()
+    assert [p['id'] for p in load_store(str(store))] == [1]
+
+def test_old_manifest_triggers_a_full_rescan(layout):
+    sources, _, manifest, ingest, questions = layout
+    _write_source(sources / 'a.jsonl', 'Roll two dice.')
+    _write_source(sources / 'b.jsonl', 'Roll two dice.')
+    ingest()
+
+    # A version 1 manifest only credited the first file with the shared problem
+    files = json.loads(manifest.read_text())['files']
+    files['b.jsonl']['ids'] = []
+    manifest.write_text(json.dumps({'files': files}))
+    assert ingest()['changed'] == 2
+
+    (sources / 'a.jsonl').unlink()
+    ingest()
+    assert questions() == ['Roll two dice.']
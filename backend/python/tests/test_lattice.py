@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from utils.black_scholes import black_scholes_price
+from utils.lattice import lattice_price
+
+# Hull, Options, Futures and Other Derivatives: American put, S = K = 50, r = 10%,
+# sigma = 40%, five months; 4.283 from a 500-step tree
+HULL_PUT = dict(S=50.0, K=50.0, T=5 / 12, r=0.1, sigma=0.4)
+
+def test_american_put_matches_hull():
+    assert lattice_price(**HULL_PUT, steps=500) == pytest.approx(4.283, abs=1e-3)
+
+@pytest.mark.parametrize('kwargs', [
+    dict(method='binomial', smoothing=True, richardson=True),
+    dict(method='trinomial'),
+    dict(method='trinomial', smoothing=True),
+])
+def test_american_put_converges_for_every_method(kwargs):
+    assert lattice_price(**HULL_PUT, steps=200, **kwargs) == pytest.approx(4.284, abs=3e-3)
+
+def test_european_prices_match_black_scholes():
+    strikes = np.array([80.0, 90.0, 100.0, 110.0, 120.0])
+    for option_type in ('call', 'put'):
+        tree = lattice_price(100.0, strikes, 1.0, 0.05, 0.2, q=0.02, option_type=option_type,
+                             american=False, steps=400, smoothing=True, richardson=True)
+        exact = black_scholes_price(100.0, strikes, 1.0, 0.05, 0.2, q=0.02, option_type=option_type)
+        np.testing.assert_allclose(tree, exact, atol=2e-3)
+
+def test_american_call_without_dividends_is_european():
+    american = lattice_price(100.0, 100.0, 1.0, 0.05, 0.2, option_type='call', steps=400, smoothing=True)
+    assert american == pytest.approx(black_scholes_price(100.0, 100.0, 1.0, 0.05, 0.2), abs=2e-3)
+
+def test_early_exercise_premium_is_non_negative():
+    strikes = np.linspace(70.0, 130.0, 13)
+    american = lattice_price(100.0, strikes, 1.0, 0.05, 0.3, option_type='put', steps=200)
+    european = lattice_price(100.0, strikes, 1.0, 0.05, 0.3, option_type='put', american=False, steps=200)
+    assert np.all(american >= european - 1e-12)
+    assert np.all(american >= np.maximum(strikes - 100.0, 0.0) - 1e-12)
+
+def test_batch_matches_single_contracts():
+    S = np.array([90.0, 100.0, 110.0])
+    option_type = np.array(['call', 'put', 'put'])
+    batch = lattice_price(S, 100.0, 0.5, 0.03, 0.25, option_type=option_type, steps=100)
+    single = [lattice_price(s, 100.0, 0.5, 0.03, 0.25, option_type=t, steps=100) for s, t in zip(S, option_type)]
+    np.testing.assert_allclose(batch, single, rtol=1e-12)
+
+@pytest.mark.parametrize('kwargs', [dict(steps=1), dict(method='quadrinomial')])
+def test_invalid_settings_raise_value_error(kwargs):
+    with pytest.raises(ValueError):
+        lattice_price(**HULL_PUT, **kwargs)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from utils.market_data import COLUMNS, MarketDataCache, SyntheticFetcher
+
+class RecordingFetcher:
+    """SyntheticFetcher that records each requested range and can rescale prices like a split."""
+
+    def __init__(self):
+        self.inner = SyntheticFetcher(seed=1)
+        self.calls = []
+        self.split = 1.0
+
+    def __call__(self, ticker, start, end):
+        self.calls.append((str(start), str(end)))
+        frame = self.inner(ticker, start, end)
+        for column in ('Open', 'High', 'Low', 'Close'):
+            frame[column] = frame[column] / self.split
+        return frame
+
+@pytest.fixture
+def fetcher():
+    return RecordingFetcher()
+
+@pytest.fixture
+def cache(tmp_path, fetcher):
+    return MarketDataCache(str(tmp_path), fetcher)
+
+def test_returns_the_fetchers_bars_for_the_range(cache):
+    frame = cache.get('abc', '2020-01-01', '2020-03-01')
+    expected = SyntheticFetcher(seed=1)('ABC', np.datetime64('2020-01-01'), np.datetime64('2020-03-01'))
+    for column in ('Date',) + COLUMNS:
+        np.testing.assert_array_equal(frame[column], expected[column])
+
+def test_only_missing_ranges_are_fetched(cache, fetcher):
+    cache.get('ABC', '2020-02-01', '2020-03-01')
+    fetcher.calls.clear()
+    assert cache.missing_ranges('ABC', '2020-01-01', '2020-04-01') == [
+        (np.datetime64('2020-01-01'), np.datetime64('2020-02-01')),
+        (np.datetime64('2020-03-01'), np.datetime64('2020-04-01')),
+    ]
+    frame = cache.get('ABC', '2020-01-01', '2020-04-01')
+    # The later gap is widened back to the last stored bar (Friday 2020-02-28) to check its basis
+    assert fetcher.calls == [('2020-01-01', '2020-02-01'), ('2020-02-28', '2020-04-01')]
+    assert np.all(np.diff(frame['Date']) > np.timedelta64(0, 'D'))
+
+    fetcher.calls.clear()
+    cache.get('ABC', '2020-01-15', '2020-03-15')
+    assert fetcher.calls == []
+
+def test_corporate_action_refetches_instead_of_mixing_bases(cache, fetcher):
+    before = cache.get('ABC', '2020-01-01', '2020-02-01')['Close'].copy()
+    fetcher.split = 2.0
+    frame = cache.get('ABC', '2020-01-01', '2020-03-01')
+    assert fetcher.calls[-1] == ('2020-01-01', '2020-03-01')
+    # Every bar, including the ones cached before the split, is on the new basis
+    np.testing.assert_allclose(frame['Close'][:len(before)], before / 2.0)
+    returns = np.diff(np.log(frame['Close']))
+    assert np.max(np.abs(returns)) < 0.2
+
+def test_cache_is_shared_across_instances(tmp_path, fetcher):
+    MarketDataCache(str(tmp_path), fetcher).get('ABC', '2020-01-01', '2020-02-01')
+    fetcher.calls.clear()
+    MarketDataCache(str(tmp_path), fetcher).get('ABC', '2020-01-01', '2020-02-01')
+    assert fetcher.calls == []
+
+@pytest.mark.parametrize('ticker', ['../etc', 'a/b', '..', '', 'A' * 30, 'AB C'])
+def test_rejects_tickers_that_are_not_symbols(cache, ticker):
+    with pytest.raises(ValueError):
+        cache.get(ticker, '2020-01-01', '2020-02-01')
+
+@pytest.mark.parametrize('ticker', ['BRK-B', '^GSPC', 'EURUSD=X', '0700.HK'])
+def test_accepts_exchange_symbols(cache, ticker):
+    assert len(cache.get(ticker, '2020-01-01', '2020-01-10')['Date']) > 0
@@ -0,0 +1,85 @@
+import pytest
+
+from services.mental_math_session import MentalMathSession
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _batch(n, rng):
+    # Problem k of every batch is "k + 1", answer k + 1
+    return [{'question': f'{k} + 1', 'answer': k + 1} for k in range(n)]
+
+@pytest.fixture
+def session():
+    clock = FakeClock()
+    session = MentalMathSession(_batch, seed=0, duration=60, lookahead=3, clock=clock)
+    session.clock = clock
+    return session
+
+def test_top_up_keeps_lookahead_problems_outstanding_without_answers(session):
+    problems = session.top_up()
+    assert [p['id'] for p in problems] == [0, 1, 2]
+    assert all(set(p) == {'id', 'question'} for p in problems)
+    assert session.top_up() == []
+
+    session.submit(0, 1)
+    assert [p['id'] for p in session.top_up()] == [3]
+
+def test_answers_are_scored_in_order(session):
+    session.top_up()
+    assert session.submit(0, '1')['correct']
+    result = session.submit(1, 5)
+    assert result == {'id': 1, 'correct': False, 'answer': 2, 'score': 1, 'answered': 2}
+    assert session.summary() == {'score': 1, 'answered': 2, 'accuracy': 0.5, 'duration': 60}
+
+@pytest.mark.parametrize('problem_id', [1, 99, None])
+def test_out_of_order_or_unknown_ids_are_rejected(session, problem_id):
+    session.top_up()
+    with pytest.raises(ValueError, match='Expected an answer to problem 0'):
+        session.submit(problem_id, 1)
+    assert session.answered == 0
+
+@pytest.mark.parametrize('answer', [None, 'twelve', [1]])
+def test_unparseable_answer_leaves_the_problem_pending(session, answer):
+    session.top_up()
+    with pytest.raises(ValueError, match='answer must be a number'):
+        session.submit(0, answer)
+    assert session.submit(0, 1)['correct']
+
+def test_each_problem_can_only_be_answered_once(session):
+    session.top_up()
+    session.submit(0, 1)
+    with pytest.raises(ValueError):
+        session.submit(0, 1)
+
+def test_no_answers_after_the_deadline(session):
+    session.top_up()
+    session.clock.now = 59.0
+    assert session.remaining == pytest.approx(1.0)
+    session.clock.now = 60.0
+    assert session.finished
+    with pytest.raises(ValueError, match='Session is over'):
+        session.submit(0, 1)
+
+def test_websocket_session_scores_on_the_server():
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app).websocket_connect('/ws/mental-math') as socket:
+        assert socket.receive_json()['type'] == 'start'
+        problems = socket.receive_json()['problems']
+        assert problems and all('answer' not in p for p in problems)
+
+        socket.send_json({'type': 'answer', 'id': problems[0]['id'], 'answer': 'x'})
+        assert socket.receive_json() == {'type': 'error', 'message': 'answer must be a number'}
+
+        socket.send_json({'type': 'answer', 'id': problems[0]['id'], 'answer': 0.5})
+        result = socket.receive_json()
+        assert result['type'] == 'result' and result['id'] == problems[0]['id']
+        assert not result['correct'] and result['answered'] == 1
+        assert len(result['problems']) == 1
+        assert all('answer' not in p for p in result['problems'])
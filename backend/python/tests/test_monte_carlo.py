@@ -0,0 +1,66 @@
+from math import exp, log, sqrt
+
+import pytest
+
+from utils.black_scholes import black_scholes_price, norm_cdf_scalar
+from utils.monte_carlo import monte_carlo_price
+
+MARKET = dict(S=100.0, K=100.0, T=1.0, r=0.05, sigma=0.2, q=0.01)
+
+def _down_and_in_call(S, K, T, r, sigma, q, barrier):
+    """Continuously monitored down-and-in call for barrier <= K (Reiner and Rubinstein)."""
+    lam = (r - q + 0.5 * sigma ** 2) / sigma ** 2
+    y = log(barrier ** 2 / (S * K)) / (sigma * sqrt(T)) + lam * sigma * sqrt(T)
+    return (S * exp(-q * T) * (barrier / S) ** (2 * lam) * norm_cdf_scalar(y)
+            - K * exp(-r * T) * (barrier / S) ** (2 * lam - 2) * norm_cdf_scalar(y - sigma * sqrt(T)))
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+def test_european_price_is_within_sampling_error_of_black_scholes(option_type):
+    result = monte_carlo_price(**MARKET, option_type=option_type, n_paths=50_000, n_steps=1,
+                               control_variate=False, seed=1)
+    exact = black_scholes_price(**MARKET, option_type=option_type)
+    assert abs(result['price'] - exact) < 4 * result['standard_error']
+
+def test_control_variate_makes_the_european_price_exact():
+    result = monte_carlo_price(**MARKET, n_paths=10_000, n_steps=1, seed=1)
+    assert result['price'] == pytest.approx(black_scholes_price(**MARKET))
+    assert result['standard_error'] == pytest.approx(0.0, abs=1e-12)
+
+def test_discretely_monitored_barrier_matches_the_continuous_formula():
+    barrier = 90.0
+    exact = black_scholes_price(**MARKET) - _down_and_in_call(**MARKET, barrier=barrier)
+    result = monte_carlo_price(**MARKET, payoff='down-and-out', barrier=barrier, n_paths=100_000, seed=1)
+    assert abs(result['price'] - exact) < 4 * result['standard_error']
+
+def test_knock_in_plus_knock_out_is_the_vanilla_option():
+    kwargs = dict(MARKET, barrier=120.0, n_paths=20_000, n_steps=50, control_variate=False, seed=3)
+    knock_out = monte_carlo_price(payoff='up-and-out', **kwargs)['price']
+    knock_in = monte_carlo_price(payoff='up-and-in', **kwargs)['price']
+    vanilla = monte_carlo_price(payoff='european', **{k: v for k, v in kwargs.items() if k != 'barrier'})['price']
+    assert knock_out + knock_in == pytest.approx(vanilla, rel=1e-12)
+
+def test_asian_call_is_cheaper_than_european():
+    asian = monte_carlo_price(**MARKET, payoff='asian', n_paths=20_000, n_steps=50, seed=2)
+    assert asian['price'] < black_scholes_price(**MARKET)
+
+def test_results_are_reproducible_and_independent_of_worker_count():
+    kwargs = dict(MARKET, payoff='asian', n_paths=8_000, n_steps=20, chunk_size=2_000, seed=7)
+    serial = monte_carlo_price(**kwargs)
+    assert monte_carlo_price(**kwargs) == serial
+    assert monte_carlo_price(**kwargs, n_workers=2)['price'] == serial['price']
+
+def test_convergence_trace_reports_every_chunk():
+    result = monte_carlo_price(**MARKET, payoff='asian', n_paths=10_000, n_steps=10, chunk_size=3_000, seed=0)
+    assert [point['paths'] for point in result['convergence']] == [3_000, 6_000, 9_000, 10_000]
+    assert result['convergence'][-1]['price'] == result['price']
+    assert result['n_paths'] == 10_000
+
+@pytest.mark.parametrize('kwargs, message', [
+    (dict(payoff='lookback'), 'Unknown payoff'),
+    (dict(option_type='straddle'), 'option_type'),
+    (dict(payoff='up-and-out'), 'barrier is required'),
+    (dict(n_paths=0), 'must be positive'),
+])
+def test_invalid_arguments_raise_value_error(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        monte_carlo_price(**MARKET, **kwargs)
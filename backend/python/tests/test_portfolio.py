@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from utils.portfolio import (
+    constrained_mean_variance, covariance_matrix, efficient_frontier, parse_constraints
+)
+
+RETURNS = np.array([0.06, 0.08, 0.10, 0.12, 0.15])
+COV = covariance_matrix(
+    [0.10, 0.14, 0.18, 0.22, 0.30],
+    [[1.0, 0.3, 0.2, 0.1, 0.0],
+     [0.3, 1.0, 0.4, 0.2, 0.1],
+     [0.2, 0.4, 1.0, 0.5, 0.3],
+     [0.1, 0.2, 0.5, 1.0, 0.6],
+     [0.0, 0.1, 0.3, 0.6, 1.0]]
+)
+
+def _closed_form(risk_aversion):
+    """Fully invested mean-variance weights with no other constraints."""
+    inv_mu = np.linalg.solve(COV, RETURNS)
+    inv_one = np.linalg.solve(COV, np.ones(len(RETURNS)))
+    eta = (inv_mu.sum() - risk_aversion) / inv_one.sum()
+    return (inv_mu - eta * inv_one) / risk_aversion
+
+@pytest.mark.parametrize('risk_aversion', [1.0, 4.0, 20.0])
+def test_unconstrained_matches_closed_form(risk_aversion):
+    constraints = parse_constraints([], len(RETURNS), long_only=False)
+    result = constrained_mean_variance(RETURNS, COV, risk_aversion, constraints, tolerance=1e-10)
+    assert result['converged']
+    np.testing.assert_allclose(result['weights'], _closed_form(risk_aversion), atol=1e-6)
+
+def test_constraints_hold_and_match_a_general_solver():
+    from scipy.optimize import minimize
+
+    text = ["No single asset can exceed 30% of the portfolio",
+            "At least 20% must be in low-risk assets (1 and 2)",
+            "Maximum 40% in high-risk assets (4 and 5)"]
+    constraints = parse_constraints(text, len(RETURNS))
+    result = constrained_mean_variance(RETURNS, COV, 2.0, constraints, tolerance=1e-9)
+    w = result['weights']
+    assert result['converged']
+    assert w.sum() == pytest.approx(1.0, abs=1e-6)
+    assert np.all(w >= -1e-6) and np.all(w <= 0.3 + 1e-6)
+    assert w[[0, 1]].sum() >= 0.2 - 1e-6
+    assert w[[3, 4]].sum() <= 0.4 + 1e-6
+
+    reference = minimize(
+        lambda x: 0.5 * 2.0 * x @ COV @ x - RETURNS @ x, np.full(5, 0.2), method='SLSQP',
+        bounds=[(0.0, 0.3)] * 5,
+        constraints=[{'type': 'eq', 'fun': lambda x: x.sum() - 1.0},
+                     {'type': 'ineq', 'fun': lambda x: x[0] + x[1] - 0.2},
+                     {'type': 'ineq', 'fun': lambda x: 0.4 - x[3] - x[4]}],
+        options={'ftol': 1e-12, 'maxiter': 500}
+    )
+    np.testing.assert_allclose(w, reference.x, atol=1e-4)
+
+@pytest.mark.parametrize('max_iterations', [1, 3, 10])
+def test_weights_are_feasible_even_when_the_iteration_cap_is_hit(max_iterations):
+    text = ["No single asset can exceed 30% of the portfolio",
+            "At least 20% must be in low-risk assets (1 and 2)",
+            "Maximum 40% in high-risk assets (4 and 5)"]
+    constraints = parse_constraints(text, len(RETURNS))
+    result = constrained_mean_variance(RETURNS, COV, 2.0, constraints, max_iterations=max_iterations)
+    w = result['weights']
+    assert not result['converged']
+    assert w.sum() == pytest.approx(1.0, abs=1e-12)
+    assert np.all(w >= 0.0) and np.all(w <= 0.3)
+    assert w[[0, 1]].sum() >= 0.2 - 1e-12
+    assert w[[3, 4]].sum() <= 0.4 + 1e-12
+
+def test_transaction_costs_keep_weights_near_current_holdings():
+    current = np.full(5, 0.2)
+    free = constrained_mean_variance(RETURNS, COV, 3.0)
+    costly = constrained_mean_variance(RETURNS, COV, 3.0, transaction_costs=np.full(5, 0.05),
+                                       current_weights=current)
+    assert np.abs(costly['weights'] - current).sum() < np.abs(free['weights'] - current).sum()
+    assert costly['transaction_cost'] == pytest.approx(0.05 * np.abs(costly['weights'] - current).sum())
+
+def test_warm_started_frontier_matches_cold_solves_in_fewer_iterations():
+    risk_aversions = np.linspace(1.0, 10.0, 10)
+    warm = efficient_frontier(RETURNS, COV, risk_aversions, warm_start=True)
+    cold = efficient_frontier(RETURNS, COV, risk_aversions, warm_start=False)
+    for w, c in zip(warm, cold):
+        np.testing.assert_allclose(w['weights'], c['weights'], atol=1e-5)
+    assert sum(p['iterations'] for p in warm) < sum(p['iterations'] for p in cold)
+    # Less risk aversion, more risk
+    volatilities = [p['volatility'] for p in warm]
+    assert all(a >= b - 1e-9 for a, b in zip(volatilities, volatilities[1:]))
+
+@pytest.mark.parametrize('text', ["Keep it balanced", "Exactly 30% in asset (9)", "Around 30% in assets (1 and 2)"])
+def test_unparseable_constraints_raise_value_error(text):
+    with pytest.raises(ValueError):
+        parse_constraints([text], len(RETURNS))
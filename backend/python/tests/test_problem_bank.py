@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+from collections import Counter
+
+import pytest
+
+from services.problem_bank import ProblemBank, fcntl
+from services.problem_generator import ProblemGenerator
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="ProblemBank needs POSIX record locks")
+
+KEYS = [('option_pricing', 'easy'), ('option_pricing', 'hard'), ('mental_math', None)]
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = ProblemBank(str(tmp_path / 'bank.dat'), KEYS, capacity=4, low_water=1, high_water=3)
+    yield bank
+    bank.close()
+
+def test_pops_in_push_order_and_counts_hits_and_misses(bank):
+    assert bank.push_many(('option_pricing', 'easy'), [{'n': 1}, {'n': 2}]) == 2
+    assert bank.pop('option_pricing', 'easy') == {'n': 1}
+    assert bank.pop('option_pricing', 'easy') == {'n': 2}
+    assert bank.pop('option_pricing', 'easy') is None
+    assert (bank.hits, bank.misses) == (2, 1)
+
+def test_pops_only_the_requested_bank(bank):
+    bank.push_many(('option_pricing', 'hard'), [{'n': 1}])
+    # Another difficulty having problems does not turn a miss into a hit
+    assert bank.pop('option_pricing', 'easy') is None
+    assert bank.pop('mental_math') is None
+    assert bank.pop('option_pricing', 'hard') == {'n': 1}
+    assert bank.pop('unknown', 'easy') is None
+    assert bank.misses == 2
+
+def test_capacity_and_refill_marks(bank):
+    assert bank.push_many(('mental_math', None), [{'n': i} for i in range(6)]) == 4
+    assert bank.counts()[('mental_math', None)] == 4
+    assert bank.refill_needed() == {('option_pricing', 'easy'): 3, ('option_pricing', 'hard'): 3}
+    # The ring buffer wraps around after pops
+    bank.pop('mental_math')
+    bank.push_many(('mental_math', None), [{'n': 6}])
+    assert [bank.pop('mental_math')['n'] for _ in range(4)] == [1, 2, 3, 6]
+
+def test_oversized_problems_are_skipped(tmp_path):
+    bank = ProblemBank(str(tmp_path / 'bank.dat'), KEYS, capacity=4, slot_bytes=64, low_water=1, high_water=3)
+    try:
+        assert bank.push_many(('mental_math', None), [{'text': 'x' * 100}, {'n': 1}]) == 1
+        assert bank.pop('mental_math') == {'n': 1}
+    finally:
+        bank.close()
+
+def test_a_locked_bank_is_a_miss_rather_than_a_wait(bank):
+    bank.push_many(('mental_math', None), [{'n': 1}])
+    with bank._mutex:
+        assert bank.pop('mental_math') is None
+    assert bank.pop('mental_math') == {'n': 1}
+
+def _pop_in_child(path, queue):
+    bank = ProblemBank(path, KEYS, capacity=4, low_water=1, high_water=3)
+    queue.put(bank.pop('option_pricing', 'easy'))
+    bank.close()
+
+def test_bank_is_shared_across_processes(tmp_path, bank):
+    bank.push_many(('option_pricing', 'easy'), [{'n': 1}])
+    queue = multiprocessing.get_context('fork').Queue()
+    child = multiprocessing.get_context('fork').Process(target=_pop_in_child, args=(bank.path, queue))
+    child.start()
+    child.join(10)
+    assert queue.get(timeout=1) == {'n': 1}
+    assert bank.counts()[('option_pricing', 'easy')] == 0
+
+def test_a_different_layout_resets_the_file(tmp_path, bank):
+    bank.push_many(('mental_math', None), [{'n': 1}])
+    other = ProblemBank(bank.path, KEYS, capacity=8, low_water=1, high_water=3)
+    try:
+        assert other.counts()[('mental_math', None)] == 0
+    finally:
+        other.close()
+
+def test_refuses_symlinks(tmp_path):
+    target = tmp_path / 'target.dat'
+    target.write_bytes(b'')
+    os.symlink(target, tmp_path / 'link.dat')
+    with pytest.raises(OSError):
+        ProblemBank(str(tmp_path / 'link.dat'), KEYS)
+
+def test_resolve_matches_the_on_demand_type_mix():
+    generator = ProblemGenerator()
+    counts = Counter(generator.resolve()[0] for _ in range(6000))
+    share = 1 / len(generator.problem_types)
+    for problem_type in generator.problem_types:
+        assert counts[problem_type] / 6000 == pytest.approx(share, abs=0.03)
+    assert generator.resolve('mental_math', 'hard') == ('mental_math', None)
+    assert generator.resolve('option_pricing', None, seed=5) == generator.resolve('option_pricing', None, seed=5)
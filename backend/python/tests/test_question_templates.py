@@ -0,0 +1,60 @@
+import json
+import re
+
+import pytest
+
+from services.problem_generator import ProblemGenerator
+from services.question_templates import COMPACT_DECIMALS, QUESTION_TEMPLATES, render_question, to_wire
+
+GENERATOR = ProblemGenerator()
+CASES = [(problem_type, difficulty, seed)
+         for problem_type in ('option_pricing', 'portfolio_optimization', 'probability', 'stochastic_processes')
+         for difficulty in ('easy', 'medium', 'hard')
+         for seed in range(5)]
+
+def _client_render(template, params):
+    """Plain placeholder substitution, as the frontend renders compact problems."""
+    def fill(text, values):
+        return re.sub(r'\{(\w+)\}', lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0), text)
+
+    rows = template.get('rows', {})
+    values = {
+        name: '\n'.join(fill(rows[name], {str(i): cell for i, cell in enumerate(row)}) for row in value)
+        if name in rows else value
+        for name, value in params.items()
+    }
+    return fill(template['text'], values)
+
+@pytest.mark.parametrize('problem_type, difficulty, seed', CASES)
+def test_compact_problem_renders_to_the_full_question(problem_type, difficulty, seed):
+    problem = GENERATOR.generate_problem(problem_type, difficulty, seed=seed, cache=False)
+    full = to_wire(problem)
+    compact = to_wire(problem, compact=True)
+
+    assert 'template' not in full and 'template_params' not in full
+    assert 'question' not in compact
+    assert compact['template'] in QUESTION_TEMPLATES
+    # Both the backend renderer and plain client-side substitution reproduce the question
+    assert render_question(compact['template'], compact['template_params']) == full['question']
+    templates = json.loads(json.dumps(QUESTION_TEMPLATES))
+    assert _client_render(templates[compact['template']], compact['template_params']) == full['question']
+
+def test_compact_parameters_are_rounded():
+    problem = {'question': 'q', 'template': 't', 'template_params': {},
+               'parameters': {'S': 100.123456789, 'weights': [0.1234567891, 2], 'name': 'x'}}
+    wire = to_wire(problem, compact=True)
+    assert wire['parameters'] == {'S': round(100.123456789, COMPACT_DECIMALS),
+                                  'weights': [round(0.1234567891, COMPACT_DECIMALS), 2], 'name': 'x'}
+    # The source problem (possibly a cached entry) is left untouched
+    assert problem['parameters']['S'] == 100.123456789
+
+def test_problems_without_a_template_pass_through():
+    problem = {'question': 'What is 2 + 2?', 'answer': 4}
+    assert to_wire(problem) is problem
+    assert to_wire(problem, compact=True) is problem
+
+def test_templates_only_use_named_placeholders():
+    for template in QUESTION_TEMPLATES.values():
+        for text in [template['text'], *template.get('rows', {}).values()]:
+            for placeholder in re.findall(r'\{([^}]*)\}', text):
+                assert re.fullmatch(r'\w+', placeholder), placeholder
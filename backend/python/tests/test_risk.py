@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from utils.risk import (
+    bootstrap_var_es, historical_var_es, normal_mixture_var_es, parametric_var_es, var_es
+)
+
+# Standard normal quantiles and expected shortfalls (e.g. the Basel 97.5% ES multiplier 2.3378)
+NORMAL_TABLE = [
+    (0.95, 1.6449, 2.0627),
+    (0.975, 1.9600, 2.3378),
+    (0.99, 2.3263, 2.6652),
+]
+
+# Quantiles and expected shortfalls of a standard Student-t (unit scale, not unit variance)
+STUDENT_T_TABLE = [
+    (3, 0.99, 4.5407, 7.0031),
+    (4, 0.95, 2.1318, 3.2029),
+    (4, 0.99, 3.7469, 5.2206),
+    (5, 0.99, 3.3649, 4.4524),
+]
+
+def test_normal_matches_published_values():
+    levels = [c for c, _, _ in NORMAL_TABLE]
+    result = parametric_var_es(0.0, 1.0, levels)
+    np.testing.assert_allclose(result['var'], [v for _, v, _ in NORMAL_TABLE], atol=1e-4)
+    np.testing.assert_allclose(result['es'], [e for _, _, e in NORMAL_TABLE], atol=1e-4)
+
+def test_normal_scales_with_position_mean_and_horizon():
+    result = parametric_var_es(0.001, 0.02, [0.99], positions=[1e6, -1e6], horizon=10)
+    scale = 0.02 * np.sqrt(10) * 1e6
+    drift = 0.001 * 10 * 1e6
+    np.testing.assert_allclose(result['var'][:, 0], [2.326348 * scale - drift, 2.326348 * scale + drift], rtol=1e-6)
+    np.testing.assert_allclose(result['es'][:, 0], [2.665214 * scale - drift, 2.665214 * scale + drift], rtol=1e-6)
+
+@pytest.mark.parametrize('df, level, var, es', STUDENT_T_TABLE)
+def test_student_t_matches_published_values(df, level, var, es):
+    # sigma is the standard deviation; this one gives the standard t its unit scale
+    sigma = np.sqrt(df / (df - 2.0))
+    result = parametric_var_es(0.0, sigma, [level], distribution='student_t', df=df)
+    assert result['var'][0] == pytest.approx(var, abs=1e-4)
+    assert result['es'][0] == pytest.approx(es, abs=1e-4)
+
+def test_historical_matches_hand_sorted_sample():
+    returns = np.array([0.012, -0.031, 0.004, -0.008, 0.021, -0.054, 0.017, -0.002, 0.009, -0.019,
+                        0.006, -0.027, 0.015, 0.001, -0.011, 0.024, -0.043, 0.003, -0.005, 0.010])
+    # Worst losses, by hand: 0.054, 0.043, 0.031, 0.027, 0.019, ...
+    result = historical_var_es(returns, [0.9, 0.95, 0.8], positions=[1.0, -2.0])
+    # 90%: the worst 2 of 20; 95%: the worst 1; 80%: the worst 4
+    np.testing.assert_allclose(result['var'][0], [0.043, 0.054, 0.027])
+    np.testing.assert_allclose(result['es'][0], [(0.054 + 0.043) / 2, 0.054, (0.054 + 0.043 + 0.031 + 0.027) / 4])
+    # Short twice the series: losses come from the best returns 0.024, 0.021, 0.017, 0.015
+    np.testing.assert_allclose(result['var'][1], [0.042, 0.048, 0.030])
+    np.testing.assert_allclose(result['es'][1], [0.045, 0.048, (0.048 + 0.042 + 0.034 + 0.030) / 4])
+
+def test_historical_with_asset_holdings():
+    returns = np.array([[0.01, -0.02], [-0.03, 0.01], [0.02, 0.00], [-0.01, -0.01]])
+    result = historical_var_es(returns, [0.75], positions=[[1.0, 1.0]])
+    # Portfolio P&L: -0.01, -0.02, 0.02, -0.02; the worst one is a loss of 0.02
+    assert result['var'][0, 0] == pytest.approx(0.02)
+    assert result['es'][0, 0] == pytest.approx(0.02)
+
+def test_bootstrap_is_reproducible_and_centred_on_historical():
+    returns = np.random.default_rng(7).standard_normal(500) * 0.01
+    first = bootstrap_var_es(returns, [0.95], n_resamples=400, seed=3)
+    second = bootstrap_var_es(returns, [0.95], n_resamples=400, seed=3)
+    np.testing.assert_array_equal(first['es'], second['es'])
+    historical = historical_var_es(returns, [0.95])
+    assert abs(first['var'][0, 0] - historical['var'][0, 0]) < 3 * first['var_standard_error'][0, 0]
+    assert first['es_standard_error'][0, 0] > 0
+
+def test_mixture_matches_simulation():
+    weights, means, stds = [0.7, 0.25, 0.05], [0.5, -0.2, -2.0], [0.4, 0.6, 1.5]
+    levels = [0.95, 0.99]
+    result = normal_mixture_var_es(weights, means, stds, levels)
+
+    rng = np.random.default_rng(11)
+    n = 2_000_000
+    component = rng.choice(3, size=n, p=weights)
+    losses = -(np.take(means, component) + np.take(stds, component) * rng.standard_normal(n))
+    for i, level in enumerate(levels):
+        var = np.quantile(losses, level)
+        assert result['var'][i] == pytest.approx(var, abs=0.02)
+        assert result['es'][i] == pytest.approx(losses[losses >= var].mean(), abs=0.02)
+    assert result['loss_probability'] == pytest.approx((losses > 0).mean(), abs=2e-3)
+
+def test_single_component_mixture_is_normal():
+    result = normal_mixture_var_es([1.0], [0.0], [1.0], [0.975, 0.99])
+    np.testing.assert_allclose(result['var'], [1.959964, 2.326348], atol=1e-6)
+    np.testing.assert_allclose(result['es'], [2.337803, 2.665214], atol=1e-6)
+
+@pytest.mark.parametrize('kwargs, message', [
+    (dict(method='normal'), 'mu and sigma'),
+    (dict(method='historical'), 'returns are required'),
+    (dict(method='historical', returns=[0.01, -0.02], horizon=10), 'horizon'),
+    (dict(method='student_t', mu=0.0, sigma=1.0, df=2), 'degrees of freedom'),
+    (dict(method='normal', mu=0.0, sigma=1.0, confidence_levels=[1.0]), 'confidence levels'),
+    (dict(method='monte_carlo'), 'Unknown method'),
+])
+def test_invalid_requests_raise_value_error(kwargs, message):
+    kwargs.setdefault('confidence_levels', [0.99])
+    with pytest.raises(ValueError, match=message):
+        var_es(**kwargs)
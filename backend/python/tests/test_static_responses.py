@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.static_responses import StaticResponse
+
+@pytest.fixture
+def served():
+    data = {'items': [1, 2, 3]}
+    builds = []
+
+    def build():
+        builds.append(1)
+        return data
+
+    response = StaticResponse(build)
+    app = FastAPI()
+
+    @app.get('/items')
+    async def items(request: Request):
+        return response.respond(request)
+
+    return TestClient(app), response, data, builds
+
+def test_body_is_serialized_once_and_tagged(served):
+    client, _, data, builds = served
+    first = client.get('/items')
+    second = client.get('/items')
+    assert first.status_code == second.status_code == 200
+    assert first.json() == data
+    assert first.headers['etag'] == second.headers['etag']
+    assert first.headers['etag'].startswith('"') and first.headers['etag'].endswith('"')
+    assert first.headers['cache-control'] == 'public, max-age=300'
+    assert len(builds) == 1
+
+@pytest.mark.parametrize('header', ['{etag}', 'W/{etag}', '"other", {etag}', '*'])
+def test_matching_if_none_match_gets_a_bodyless_304(served, header):
+    client, _, _, builds = served
+    etag = client.get('/items').headers['etag']
+    response = client.get('/items', headers={'If-None-Match': header.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+    assert len(builds) == 1
+
+def test_stale_etag_gets_the_full_body(served):
+    client, _, data, _ = served
+    response = client.get('/items', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.json() == data
+
+def test_invalidate_rebuilds_with_a_new_etag(served):
+    client, response, data, builds = served
+    old = client.get('/items').headers['etag']
+    data['items'].append(4)
+    response.invalidate()
+
+    fresh = client.get('/items', headers={'If-None-Match': old})
+    assert fresh.status_code == 200
+    assert json.loads(fresh.content) == {'items': [1, 2, 3, 4]}
+    assert fresh.headers['etag'] != old
+    assert len(builds) == 2
@@ -1,8 +1,7 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Box, Typography, TextField, Button, Paper, CircularProgress, Alert } from '@mui/material';
 import { useTheme } from '@mui/material/styles';
-import axios from 'axios';
-import { getMentalMathUrl } from '../config/api';
+import { getMentalMathSessionUrl } from '../config/api';
 
 function MentalMath() {
     const theme = useTheme();
@@ -15,57 +14,111 @@ function MentalMath() {
     const [error, setError] = useState(null);
     const [gameOver, setGameOver] = useState(false);
 
-    const fetchNewProblem = async () => {
-        try {
-            setLoading(true);
-            setError(null);
-            const response = await axios.get(getMentalMathUrl());
-            if (response.data.status === 'success' && response.data.problem) {
-                setCurrentProblem(response.data.problem);
-            } else {
-                setError('Failed to load problem');
-            }
-        } catch (error) {
-            console.error('Error fetching problem:', error);
-            setError('Failed to connect to server');
-        } finally {
-            setLoading(false);
+    // The server sends problems ahead of time and keeps the answers; we only queue questions
+    const socket = useRef(null);
+    const problemQueue = useRef([]);
+    // An answer is in flight: the current problem stays until the server scores it
+    const awaitingResult = useRef(false);
+
+    const closeSocket = () => {
+        if (socket.current) {
+            socket.current.onclose = null;
+            socket.current.close();
+            socket.current = null;
+        }
+    };
+
+    const showNextProblem = () => {
+        setCurrentProblem(problemQueue.current.length > 0 ? problemQueue.current[0] : null);
+    };
+
+    const handleMessage = (event) => {
+        const message = JSON.parse(event.data);
+        switch (message.type) {
+            case 'start':
+                setTimeLeft(message.duration);
+                setIsActive(true);
+                break;
+            case 'problems':
+                problemQueue.current = problemQueue.current.concat(message.problems);
+                setLoading(false);
+                showNextProblem();
+                break;
+            case 'result':
+                awaitingResult.current = false;
+                setScore(message.score);
+                setError(null);
+                // Only a scored answer moves the queue on, so it always matches the server's
+                problemQueue.current = problemQueue.current.slice(1).concat(message.problems);
+                showNextProblem();
+                break;
+            case 'end':
+                setScore(message.score);
+                setIsActive(false);
+                setCurrentProblem(null);
+                setGameOver(true);
+                closeSocket();
+                break;
+            case 'error':
+                // The answer was not accepted; the same problem is still outstanding
+                awaitingResult.current = false;
+                setError(message.message);
+                break;
+            default:
+                break;
         }
     };
 
-    const startGame = async () => {
+    const startGame = () => {
+        closeSocket();
         setIsActive(true);
         setScore(0);
         setTimeLeft(120);
         setGameOver(false);
-        await fetchNewProblem();
+        setError(null);
+        setLoading(true);
+        problemQueue.current = [];
+        awaitingResult.current = false;
+
+        const ws = new WebSocket(getMentalMathSessionUrl());
+        ws.onmessage = handleMessage;
+        ws.onerror = () => {
+            setError('Failed to connect to server');
+            setLoading(false);
+        };
+        ws.onclose = () => {
+            setIsActive(false);
+            setLoading(false);
+        };
+        socket.current = ws;
     };
 
-    const checkAnswer = async () => {
-        if (!currentProblem) return;
+    const checkAnswer = () => {
+        const problem = problemQueue.current[0];
+        if (!problem || awaitingResult.current || !socket.current || socket.current.readyState !== WebSocket.OPEN) return;
 
-        const userNum = parseInt(userAnswer);
-        if (userNum === currentProblem.answer) {
-            setScore(prev => prev + 1);
+        const answer = Number(userAnswer.trim());
+        if (userAnswer.trim() === '' || !Number.isFinite(answer)) {
+            setError('Please enter a number');
+            return;
         }
+        awaitingResult.current = true;
+        socket.current.send(JSON.stringify({ type: 'answer', id: problem.id, answer }));
         setUserAnswer('');
-        await fetchNewProblem();
     };
 
     useEffect(() => {
         let interval = null;
         if (isActive && timeLeft > 0) {
             interval = setInterval(() => {
-                setTimeLeft(time => time - 1);
+                setTimeLeft(time => Math.max(time - 1, 0));
             }, 1000);
-        } else if (timeLeft === 0) {
-            setIsActive(false);
-            setCurrentProblem(null);
-            setGameOver(true);
         }
         return () => clearInterval(interval);
     }, [isActive, timeLeft]);
 
+    useEffect(() => closeSocket, []);
+
     const handleKeyPress = (event) => {
         if (event.key === 'Enter' && userAnswer) {
             checkAnswer();
@@ -3,11 +3,31 @@ export const API_BASE_URL = 'http://localhost:8000';
 
 const API_URL = import.meta.env.VITE_API_URL;
 
-export const generateProblemUrl = (problemType, difficulty) =>
-  `${API_BASE_URL}/problems/generate?problem_type=${problemType}&difficulty=${difficulty}`;
+export const generateProblemUrl = (problemType, difficulty, compact = false) =>
+  `${API_BASE_URL}/problems/generate?problem_type=${problemType}&difficulty=${difficulty}${compact ? '&compact=true' : ''}`;
 
-export const getPracticeProblemsUrl = () =>
-  `${API_BASE_URL}/problems/practice`;
+export const getTemplatesUrl = () =>
+  `${API_BASE_URL}/problems/templates`;
+
+export const getSolutionUrl = (problemId) =>
+  `${API_BASE_URL}/problems/${encodeURIComponent(problemId)}/solution`;
+
+export const getPracticeProblemsUrl = (params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+  ).toString();
+  return `${API_BASE_URL}/problems/practice${query ? `?${query}` : ''}`;
+};
 
 export const getMentalMathUrl = () =>
-  `${API_BASE_URL}/problems/mental-math`; 
\ No newline at end of file
+  `${API_BASE_URL}/problems/mental-math`; 
+
+export const getMentalMathSessionUrl = () =>
+  `${API_BASE_URL.replace(/^http/, 'ws')}/ws/mental-math`;
+
+export const getProblemStreamUrl = (params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+  ).toString();
+  return `${API_BASE_URL}/problems/stream${query ? `?${query}` : ''}`;
+};
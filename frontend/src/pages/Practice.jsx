@@ -14,33 +14,59 @@ import {
 } from '@mui/material';
 import { getPracticeProblemsUrl } from '../config/api';
 
+const PAGE_SIZE = 30;
+const CONNECTION_ERROR = 'Failed to connect to the server. Make sure the backend is running on http://localhost:8000';
+
 function Practice() {
   const [problems, setProblems] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [selectedProblem, setSelectedProblem] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchProblems();
   }, []);
 
+  const fetchPage = async (cursor) => {
+    let response;
+    try {
+      response = await fetch(getPracticeProblemsUrl({ limit: PAGE_SIZE, cursor }));
+    } catch (err) {
+      // fetch only rejects on network failure; its own message ("Failed to fetch") says nothing useful
+      throw new Error(CONNECTION_ERROR);
+    }
+    const data = await response.json();
+    if (data.status !== 'success') {
+      throw new Error(data.message || 'Failed to fetch problems');
+    }
+    setNextCursor(data.next_cursor);
+    return data.problems;
+  };
+
   const fetchProblems = async () => {
     setLoading(true);
     setError(null);
     try {
-      const response = await fetch(getPracticeProblemsUrl());
-      const data = await response.json();
-      if (data.status === 'success') {
-        setProblems(data.problems);
-      } else {
-        setError(data.message || 'Failed to fetch problems');
-      }
+      setProblems(await fetchPage(null));
     } catch (err) {
-      setError('Failed to connect to the server. Make sure the backend is running on http://localhost:8000');
+      setError(err.message || CONNECTION_ERROR);
     }
     setLoading(false);
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setProblems((prev) => prev.concat(page));
+    } catch (err) {
+      setError(err.message || 'Failed to fetch problems');
+    }
+    setLoadingMore(false);
+  };
+
   if (loading) {
     return (
       <Box sx={{ display: 'flex', justifyContent: 'center', mt: 4 }}>
@@ -147,6 +173,13 @@ function Practice() {
               </Card>
             </Grid>
           ))}
+          {nextCursor !== null && (
+            <Grid item xs={12} sx={{ textAlign: 'center' }}>
+              <Button variant="outlined" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </Button>
+            </Grid>
+          )}
         </Grid>
       )}
     </Box>
@@ -11,12 +11,15 @@ import {
   CircularProgress,
   Alert,
 } from '@mui/material';
-import { generateProblemUrl } from '../config/api';
+import { generateProblemUrl, getSolutionUrl } from '../config/api';
+import { questionText } from '../utils/templates';
 
 function ProblemGenerator() {
   const [problemType, setProblemType] = useState('');
   const [difficulty, setDifficulty] = useState('');
   const [problem, setProblem] = useState(null);
+  const [solution, setSolution] = useState(null);
+  const [solutionLoading, setSolutionLoading] = useState(false);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
 
@@ -33,11 +36,12 @@ function ProblemGenerator() {
   const generateProblem = async () => {
     setLoading(true);
     setError(null);
+    setSolution(null);
     try {
-      const response = await fetch(generateProblemUrl(problemType, difficulty));
+      const response = await fetch(generateProblemUrl(problemType, difficulty, true));
       const data = await response.json();
       if (data.status === 'success') {
-        setProblem(data.problem);
+        setProblem({ ...data.problem, question: await questionText(data.problem) });
       } else {
         setError(data.message || 'Failed to generate problem');
       }
@@ -47,6 +51,23 @@ function ProblemGenerator() {
     setLoading(false);
   };
 
+  // Solutions are computed on the server the first time anyone asks for them
+  const showSolution = async () => {
+    setSolutionLoading(true);
+    try {
+      const response = await fetch(getSolutionUrl(problem.id));
+      const data = await response.json();
+      if (data.status === 'success') {
+        setSolution(data.solution);
+      } else {
+        setError(data.message || 'Failed to load the solution');
+      }
+    } catch (err) {
+      setError('Failed to connect to the server. Make sure the backend is running on http://localhost:8000');
+    }
+    setSolutionLoading(false);
+  };
+
   return (
     <Box>
       <Typography variant="h4" gutterBottom>
@@ -116,6 +137,24 @@ function ProblemGenerator() {
               <pre>{JSON.stringify(problem.parameters, null, 2)}</pre>
             </Box>
           )}
+          {problem.id && !solution && (
+            <Button variant="outlined" sx={{ mt: 2 }} onClick={showSolution} disabled={solutionLoading}>
+              {solutionLoading ? <CircularProgress size={24} /> : 'Show Solution'}
+            </Button>
+          )}
+          {solution && (
+            <Box sx={{ mt: 2 }}>
+              <Typography variant="subtitle2" gutterBottom>
+                Reference Solution:
+              </Typography>
+              <pre>{JSON.stringify(solution.answers, null, 2)}</pre>
+              {solution.notes.map((note) => (
+                <Typography key={note} variant="body2" color="text.secondary">
+                  {note}
+                </Typography>
+              ))}
+            </Box>
+          )}
         </Paper>
       )}
     </Box>
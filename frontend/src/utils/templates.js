@@ -0,0 +1,47 @@
+import { getTemplatesUrl } from '../config/api';
+
+let templatesPromise = null;
+
+// Templates only change with a backend release, so fetch them once per page load
+export const loadTemplates = () => {
+  if (!templatesPromise) {
+    templatesPromise = fetch(getTemplatesUrl())
+      .then((response) => response.json())
+      .then((data) => {
+        if (data.status !== 'success') {
+          throw new Error(data.message || 'Failed to load question templates');
+        }
+        return data.templates;
+      })
+      .catch((err) => {
+        templatesPromise = null;
+        throw err;
+      });
+  }
+  return templatesPromise;
+};
+
+const fill = (text, values) =>
+  text.replace(/\{(\w+)\}/g, (match, key) => (key in values ? String(values[key]) : match));
+
+// Mirrors render_question in the backend: row placeholders take a list of
+// positional rows, joined with newlines
+export const renderQuestion = (template, params) => {
+  const rows = template.rows || {};
+  const values = Object.fromEntries(
+    Object.entries(params).map(([name, value]) => [
+      name,
+      name in rows ? value.map((row) => fill(rows[name], row)).join('\n') : value,
+    ])
+  );
+  return fill(template.text, values);
+};
+
+// Problems from compact responses carry a template instead of the question text
+export const questionText = async (problem) => {
+  if (problem.question !== undefined || !problem.template) {
+    return problem.question;
+  }
+  const templates = await loadTemplates();
+  return renderQuestion(templates[problem.template], problem.template_params);
+};